@@ -1,21 +1,27 @@
 import os
+import logging
+import threading
+import httpx
 from langchain_groq import ChatGroq
+from core.llm import creer_chat_groq, creer_client_http
+from core.telemetrie_llm import config_llm
 from langgraph.prebuilt import create_react_agent
-from langchain_core.messages import HumanMessage
-from agent.tools import get_donnees_projet, outil_dimensionnement, outil_rentabilite
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from agent.cache import cle_reponse, lire_reponse, enregistrer_reponse
+from agent.contexte import contexte_execution, charger_instantane_projet
+from agent.tools import get_donnees_projet, outil_dimensionnement, outil_rentabilite, outil_comparatif
 
-def creer_agent():
-    """Crée et retourne l'agent LangGraph configuré avec Groq"""
-
-    llm = ChatGroq(
-        model="llama-3.3-70b-versatile",
-        api_key=os.getenv("GROQ_API_KEY"),
-        temperature=0.1
-    )
+logger = logging.getLogger(__name__)
 
-    outils = [get_donnees_projet, outil_dimensionnement, outil_rentabilite]
+# ==============================
+# CONSTANTES
+# ==============================
+MODELE_AGENT = "llama-3.3-70b-versatile"
+TEMPERATURE_AGENT = 0.1
+VERSION_PROMPT = "2"  # À incrémenter à chaque modification de PROMPT_SYSTEME ou des outils (invalide le cache)
+OUTILS_AGENT = (get_donnees_projet, outil_dimensionnement, outil_rentabilite, outil_comparatif)
 
-    system_prompt = """Tu es un expert en dimensionnement de systèmes photovoltaïques off-grid.
+PROMPT_SYSTEME = """Tu es un expert en dimensionnement de systèmes photovoltaïques off-grid.
 
 Ton rôle est d'analyser les données fournies et de produire un dimensionnement précis et professionnel.
 
@@ -26,7 +32,9 @@ Voici comment tu dois procéder :
 4. Si l'utilisateur a des batteries, utilise leur tension. Sinon propose 48V par défaut
 5. Appelle outil_dimensionnement avec les bons paramètres
 6. Appelle outil_rentabilite avec la puissance installée obtenue
-7. Rédige un rapport structuré en français avec :
+7. Appelle outil_comparatif UNE SEULE FOIS avec toutes les puissances de panneaux
+   et tensions de batterie à comparer (ne rappelle pas outil_dimensionnement pour chaque variante)
+8. Rédige un rapport structuré en français avec :
    - Le résumé de la consommation analysée
    - Le dimensionnement recommandé (panneaux, batterie, onduleur)
    - Le tableau comparatif pour différentes puissances de panneaux
@@ -36,23 +44,167 @@ Voici comment tu dois procéder :
 Sois précis, professionnel et pédagogique dans tes explications.
 Utilise toujours les unités correctes (Wc, kWc, Ah, kWh, V)."""
 
-    agent = create_react_agent(
-        model=llm,
-        tools=outils,
-        prompt=system_prompt
-    )
+PROMPT_RECOMMANDATIONS = """Tu es un expert en systèmes photovoltaïques off-grid.
+On te fournit un rapport de dimensionnement déjà calculé : ne recalcule rien et ne répète pas les chiffres.
+Rédige uniquement la section « Recommandations » : 3 à 6 puces courtes, concrètes et professionnelles
+(choix des composants, installation, maintenance, optimisation de la consommation, points d'attention du rapport).
+Réponds en français, en Markdown, sans titre."""
+
+
+# ==============================
+# FABRIQUE D'AGENTS (PROCESSUS)
+# ==============================
+# Client LLM et graphe compilé construits une fois par processus, partagés
+# entre sessions Streamlit (threads) : une question ne paie que l'inférence.
+_verrou = threading.Lock()
+_http_client = None
+_clients_llm = {}
+_agents = {}
+
 
-    return agent
+def _client_http() -> httpx.Client:
+    """Pool de connexions HTTP commun à tous les clients Groq (keep-alive)."""
+    global _http_client
+    if _http_client is None:
+        _http_client = creer_client_http(timeout=httpx.Timeout(60.0, connect=10.0))
+    return _http_client
+
+
+def _client_llm(modele: str, temperature: float) -> ChatGroq:
+    cle = (modele, temperature)
+    if cle not in _clients_llm:
+        _clients_llm[cle] = creer_chat_groq(modele, temperature, http_client=_client_http())
+    return _clients_llm[cle]
+
+
+def obtenir_agent(
+    modele: str = MODELE_AGENT,
+    temperature: float = TEMPERATURE_AGENT,
+    outils: tuple = OUTILS_AGENT,
+):
+    """
+    Retourne l'agent compilé pour (modèle, température, jeu d'outils).
+    Construit au premier appel, puis réutilisé ; sûr entre threads.
+    """
+    cle = (modele, temperature, tuple(o.name for o in outils))
+    agent = _agents.get(cle)
+    if agent is not None:
+        return agent
+
+    with _verrou:
+        if cle not in _agents:
+            logger.info("Compilation de l'agent %s (température %s, %d outils)", modele, temperature, len(outils))
+            _agents[cle] = create_react_agent(
+                model=_client_llm(modele, temperature),
+                tools=list(outils),
+                prompt=PROMPT_SYSTEME
+            )
+        return _agents[cle]
+
+
+def prechauffer_agent() -> bool:
+    """
+    Construit l'agent par défaut au démarrage de l'application.
+    Sans clé API, l'agent sera construit (et l'erreur affichée) à la première question.
+    """
+    if not os.getenv("GROQ_API_KEY"):
+        logger.info("GROQ_API_KEY absente : préchauffage de l'agent ignoré")
+        return False
+    try:
+        obtenir_agent()
+        return True
+    except Exception as e:
+        logger.warning("Préchauffage de l'agent impossible : %s", e)
+        return False
+
+
+def vider_cache_agents() -> None:
+    """Oublie les agents et clients construits (changement de clé API, tests)."""
+    global _http_client
+    with _verrou:
+        _agents.clear()
+        _clients_llm.clear()
+        if _http_client is not None:
+            _http_client.close()
+            _http_client = None
+
+
+def creer_agent():
+    """Retourne l'agent LangGraph configuré avec Groq (instance partagée du processus)."""
+    return obtenir_agent()
 
 
 def lancer_analyse(message_utilisateur: str) -> str:
     """
     Lance l'agent avec le message de l'utilisateur
-    et retourne la réponse complète
+    et retourne la réponse complète.
+    Les outils partagent un instantané du projet et leurs résultats le temps de l'exécution.
+    """
+    cle, instantane = cle_cache_reponse(message_utilisateur)
+    reponse = lire_reponse(cle)
+    if reponse is not None:
+        return reponse
+
+    agent = obtenir_agent()
+
+    with contexte_execution(instantane):
+        resultat = agent.invoke(
+            {"messages": [HumanMessage(content=message_utilisateur)]},
+            config=config_llm("agent"),
+        )
+
+    reponse = resultat["messages"][-1].content
+    if reponse:
+        enregistrer_reponse(cle, reponse)
+    return reponse
+
+
+def rediger_recommandations(rapport: str, modele: str = MODELE_AGENT) -> str:
+    """
+    Seule partie rédigée par le LLM dans le rapport instantané (export.rapport_texte) :
+    un appel unique, sans outils, à partir du rapport déjà calculé.
+    """
+    message = _client_llm(modele, TEMPERATURE_AGENT).invoke([
+        SystemMessage(content=PROMPT_RECOMMANDATIONS),
+        HumanMessage(content=rapport),
+    ], config=config_llm("recommandations"))
+    return message.content
+
+
+def cle_cache_reponse(question: str, modele: str = MODELE_AGENT) -> tuple[str, dict]:
+    """
+    Clé du cache de réponses pour la question sur l'état actuel du projet.
+    Retourne aussi l'instantané lu, à transmettre à contexte_execution (lecture unique).
+    """
+    instantane = charger_instantane_projet()
+    return cle_reponse(question, instantane, modele, VERSION_PROMPT), instantane
+
+
+def diffuser_analyse(message_utilisateur: str, agent=None):
+    """
+    Exécute l'agent en diffusion (LangGraph stream, modes messages + updates).
+
+    Génère des événements au fil de l'eau :
+    - {"type": "texte", "contenu": str}                       fragment de réponse (token)
+    - {"type": "outil", "nom": str, "etat": "appel"}          l'agent demande un outil
+    - {"type": "outil", "nom": str, "etat": "termine"}        résultat de l'outil reçu
+    Une erreur en cours de route est levée après les événements déjà émis :
+    l'appelant conserve le texte partiel.
     """
-    agent = creer_agent()
+    agent = agent or obtenir_agent()
+    entree = {"messages": [HumanMessage(content=message_utilisateur)]}
 
-    resultat = agent.invoke({
-        "messages": [HumanMessage(content=message_utilisateur)]})
+    for mode, donnees in agent.stream(entree, config=config_llm("agent"), stream_mode=["messages", "updates"]):
+        if mode == "messages":
+            fragment, _ = donnees
+            # Seuls les tokens du modèle sont diffusés (pas les ToolMessage)
+            if isinstance(fragment, AIMessage) and isinstance(fragment.content, str) and fragment.content:
+                yield {"type": "texte", "contenu": fragment.content}
+            continue
 
-    return resultat["messages"][-1].content
\ No newline at end of file
+        for noeud, mise_a_jour in donnees.items():
+            for msg in (mise_a_jour or {}).get("messages", []):
+                for appel in getattr(msg, "tool_calls", None) or []:
+                    yield {"type": "outil", "nom": appel["name"], "etat": "appel"}
+                if noeud == "tools" and getattr(msg, "name", None):
+                    yield {"type": "outil", "nom": msg.name, "etat": "termine"}
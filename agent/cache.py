@@ -0,0 +1,73 @@
+import hashlib
+import json
+import logging
+import time
+import unicodedata
+from config import DUREE_CACHE_REPONSES_S, TAILLE_MAX_CACHE_REPONSES
+from core.storage import get_db
+
+logger = logging.getLogger(__name__)
+
+
+# ==============================
+# CLÉ DE CACHE
+# ==============================
+def normaliser_question(question: str) -> str:
+    """Casse, espaces et ponctuation finale ignorés : « Optimise  ma config ? » == « optimise ma config »."""
+    texte = unicodedata.normalize("NFC", question).casefold()
+    return " ".join(texte.split()).rstrip(" ?!.")
+
+
+def cle_reponse(question: str, instantane: dict, modele: str, version_prompt: str) -> str:
+    """Empreinte stable de (question normalisée, instantané du projet, modèle, version du prompt)."""
+    contenu = json.dumps(
+        {
+            "question": normaliser_question(question),
+            "projet": instantane,
+            "modele": modele,
+            "prompt": version_prompt,
+        },
+        sort_keys=True,
+        default=str,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(contenu.encode("utf-8")).hexdigest()
+
+
+# ==============================
+# LECTURE / ÉCRITURE
+# ==============================
+# Table cache_reponses_agent de la base du projet : vidée par trigger
+# à chaque écriture sur les données du projet (voir core/storage.py).
+def lire_reponse(cle: str, duree_max_s: float = DUREE_CACHE_REPONSES_S) -> str | None:
+    """Réponse en cache encore valide, ou None. Une lecture rafraîchit sa position LRU."""
+    maintenant = time.time()
+    with get_db() as conn:
+        conn.execute("DELETE FROM cache_reponses_agent WHERE cree_le < ?", (maintenant - duree_max_s,))
+        row = conn.execute("SELECT reponse FROM cache_reponses_agent WHERE cle = ?", (cle,)).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE cache_reponses_agent SET dernier_acces = ? WHERE cle = ?", (maintenant, cle))
+    logger.info("Réponse de l'agent servie depuis le cache (%s)", cle[:12])
+    return row["reponse"]
+
+
+def enregistrer_reponse(cle: str, reponse: str, taille_max: int = TAILLE_MAX_CACHE_REPONSES) -> None:
+    """Met une réponse en cache puis évince les moins récemment utilisées au-delà de taille_max."""
+    maintenant = time.time()
+    with get_db() as conn:
+        conn.execute("""
+            INSERT OR REPLACE INTO cache_reponses_agent (cle, reponse, cree_le, dernier_acces)
+            VALUES (?, ?, ?, ?)
+        """, (cle, reponse, maintenant, maintenant))
+        conn.execute("""
+            DELETE FROM cache_reponses_agent WHERE cle NOT IN (
+                SELECT cle FROM cache_reponses_agent ORDER BY dernier_acces DESC LIMIT ?
+            )
+        """, (taille_max,))
+
+
+def vider_cache_reponses() -> None:
+    """Supprime toutes les réponses en cache du projet."""
+    with get_db() as conn:
+        conn.execute("DELETE FROM cache_reponses_agent")
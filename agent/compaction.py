@@ -0,0 +1,99 @@
+import json
+import logging
+from config import BUDGET_TOKENS_OUTIL, NB_EQUIPEMENTS_DETAILLES, DECIMALES_OUTIL, CARACTERES_PAR_TOKEN
+
+logger = logging.getLogger(__name__)
+
+# ==============================
+# CONSTANTES
+# ==============================
+# Colonnes techniques inutiles au rapport : jamais envoyées au LLM
+CLES_EXCLUES = {"id", "created_at", "updated_at", "profil_horaire_wh"}
+
+
+# ==============================
+# COMPACTION
+# ==============================
+def compacter(valeur, decimales: int = DECIMALES_OUTIL):
+    """
+    Forme compacte d'un résultat d'outil :
+    champs None et colonnes techniques supprimés, flottants arrondis (500.0 -> 500).
+    """
+    if isinstance(valeur, dict):
+        return {
+            cle: compacter(v, decimales)
+            for cle, v in valeur.items()
+            if v is not None and cle not in CLES_EXCLUES and v != {}
+        }
+    if isinstance(valeur, (list, tuple)):
+        return [compacter(v, decimales) for v in valeur]
+    if isinstance(valeur, float):
+        arrondi = round(valeur, decimales)
+        return int(arrondi) if arrondi.is_integer() else arrondi
+    return valeur
+
+
+def tableau(lignes: list[dict]) -> dict:
+    """Liste d'enregistrements homogènes -> {colonnes, lignes} (noms de colonnes transmis une fois)."""
+    if not lignes:
+        return {"colonnes": [], "lignes": []}
+    colonnes = list(lignes[0])
+    return {"colonnes": colonnes, "lignes": [[ligne.get(c) for c in colonnes] for ligne in lignes]}
+
+
+def estimer_tokens(valeur) -> int:
+    """Tokens estimés du résultat tel que sérialisé dans le ToolMessage (JSON)."""
+    texte = valeur if isinstance(valeur, str) else json.dumps(valeur, ensure_ascii=False, default=str)
+    return round(len(texte) / CARACTERES_PAR_TOKEN)
+
+
+# ==============================
+# ÉQUIPEMENTS
+# ==============================
+def _equipement_compact(equipement: dict) -> dict:
+    compact = {
+        "nom": equipement["nom"],
+        "puissance_w": equipement["puissance_w"],
+        "heures_par_jour": equipement["heures_par_jour"],
+        "quantite": equipement["quantite"],
+        "conso_jour_wh": equipement["conso_jour_wh"],
+    }
+    if equipement.get("plage_horaire"):
+        compact["plage_horaire"] = equipement["plage_horaire"]
+    if (equipement.get("facteur_demarrage") or 1) > 1:
+        compact["facteur_demarrage"] = equipement["facteur_demarrage"]
+    return compact
+
+
+def agreger_equipements(equipements: list, nb_detailles: int = NB_EQUIPEMENTS_DETAILLES) -> list:
+    """
+    Les nb_detailles plus gros consommateurs en détail, les autres regroupés
+    dans une ligne « autres » : puissance installée totale (puissance_totale_w, quantités
+    incluses, à ne pas multiplier par quantite) et consommation cumulées.
+    """
+    tries = sorted(equipements, key=lambda e: e["conso_jour_wh"], reverse=True)
+    detailles = [_equipement_compact(e) for e in tries[:nb_detailles]]
+    reste = tries[nb_detailles:]
+    if reste:
+        detailles.append({
+            "nom": f"autres ({len(reste)} équipements)",
+            "puissance_totale_w": sum(e["puissance_w"] * e["quantite"] for e in reste),
+            "quantite": sum(e["quantite"] for e in reste),
+            "conso_jour_wh": sum(e["conso_jour_wh"] for e in reste),
+        })
+    return detailles
+
+
+def sous_budget(construire, nb_detailles: int = NB_EQUIPEMENTS_DETAILLES, budget: int = BUDGET_TOKENS_OUTIL) -> dict:
+    """
+    construire(nb_detailles) -> résultat compact.
+    Réduit le nombre d'équipements détaillés jusqu'à tenir dans le budget de tokens.
+    """
+    resultat = construire(nb_detailles)
+    while estimer_tokens(resultat) > budget and nb_detailles > 1:
+        nb_detailles = max(1, nb_detailles // 2)
+        resultat = construire(nb_detailles)
+    tokens = estimer_tokens(resultat)
+    if tokens > budget:
+        logger.warning("Résultat d'outil au-delà du budget : %d tokens estimés (budget %d)", tokens, budget)
+    return resultat
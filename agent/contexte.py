@@ -0,0 +1,173 @@
+import copy
+import inspect
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from agent.compaction import estimer_tokens
+from core.storage import (
+    get_equipements,
+    get_localisation,
+    get_composants,
+    get_parametres,
+    get_consommation_moyenne,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# ==============================
+# INSTANTANÉ DU PROJET
+# ==============================
+def charger_instantane_projet() -> dict:
+    """Lit en une fois toutes les données projet utilisées par les outils."""
+    return {
+        "equipements": get_equipements(),
+        "localisation": get_localisation(),
+        "composants": get_composants(),
+        "parametres": get_parametres(),
+        "moyenne_factures": get_consommation_moyenne(),
+    }
+
+
+# ==============================
+# CONTEXTE D'EXÉCUTION
+# ==============================
+class ContexteExecution:
+    """
+    État d'une exécution de l'agent (une question) :
+    - instantané du projet chargé une seule fois, au premier outil qui en a besoin
+    - résultats d'outils mémoïsés par arguments
+    - chronométrage de chaque appel d'outil
+    Les outils peuvent être appelés en parallèle par LangGraph : mémo protégé par verrou,
+    calculs exécutés hors verrou.
+    """
+
+    def __init__(self, instantane: dict | None = None):
+        self._verrou = threading.RLock()
+        self._instantane = instantane
+        self._resultats = {}
+        self.appels = []
+
+    @property
+    def instantane(self) -> dict:
+        with self._verrou:
+            if self._instantane is None:
+                debut = time.perf_counter()
+                self._instantane = charger_instantane_projet()
+                logger.debug("Instantané projet chargé en %.1f ms", (time.perf_counter() - debut) * 1000)
+            return self._instantane
+
+    def executer(self, nom: str, arguments: dict, calcul):
+        """Résultat mémoïsé de l'outil `nom` pour ces arguments, chronométré."""
+        cle = (nom, json.dumps(_normaliser(arguments), sort_keys=True, default=str))
+        debut = time.perf_counter()
+        # Verrou limité à la consultation du mémo : les calculs d'outils différents
+        # s'exécutent en parallèle ; un appel identique en cours est attendu, pas relancé.
+        with self._verrou:
+            futur = self._resultats.get(cle)
+            en_cache = futur is not None
+            if not en_cache:
+                futur = self._resultats[cle] = Future()
+        if not en_cache:
+            try:
+                futur.set_result(calcul())
+            except BaseException as e:
+                with self._verrou:
+                    del self._resultats[cle]  # un nouvel appel réessaiera
+                futur.set_exception(e)
+                raise
+        resultat = futur.result()
+        self.appels.append({
+            "outil": nom,
+            "arguments": arguments,
+            "duree_ms": round((time.perf_counter() - debut) * 1000, 2),
+            "cache": en_cache,
+            "tokens": estimer_tokens(resultat),
+        })
+        # Copie : l'agent ne doit pas pouvoir altérer le résultat mémoïsé
+        return copy.deepcopy(resultat)
+
+    def rapport(self) -> dict:
+        """Synthèse des appels d'outils : nombre, succès du cache, temps et tokens, total et par outil."""
+        par_outil = {}
+        for appel in self.appels:
+            stats = par_outil.setdefault(appel["outil"], {"appels": 0, "cache": 0, "duree_ms": 0.0, "tokens": 0})
+            stats["appels"] += 1
+            stats["cache"] += appel["cache"]
+            stats["tokens"] += appel["tokens"]
+            stats["duree_ms"] = round(stats["duree_ms"] + appel["duree_ms"], 2)
+        return {
+            "nb_appels": len(self.appels),
+            "nb_cache": sum(a["cache"] for a in self.appels),
+            "duree_outils_ms": round(sum(a["duree_ms"] for a in self.appels), 2),
+            "tokens_outils": sum(a["tokens"] for a in self.appels),
+            "par_outil": par_outil,
+        }
+
+
+def _normaliser(valeur):
+    """Entiers et flottants confondus (500 == 500.0) pour la clé de mémoïsation."""
+    if isinstance(valeur, dict):
+        return {k: _normaliser(v) for k, v in valeur.items()}
+    if isinstance(valeur, (list, tuple)):
+        return [_normaliser(v) for v in valeur]
+    if isinstance(valeur, int) and not isinstance(valeur, bool):
+        return float(valeur)
+    return valeur
+
+
+_contexte_courant: ContextVar[ContexteExecution | None] = ContextVar("contexte_agent", default=None)
+
+
+@contextmanager
+def contexte_execution(instantane: dict | None = None):
+    """
+    Ouvre un contexte pour une exécution de l'agent.
+    instantane : données projet déjà lues par l'appelant (sinon lues au premier outil).
+
+    Usage :
+        with contexte_execution() as contexte:
+            agent.invoke(...)
+        contexte.rapport()
+    """
+    contexte = ContexteExecution(instantane)
+    jeton = _contexte_courant.set(contexte)
+    try:
+        yield contexte
+    finally:
+        _contexte_courant.reset(jeton)
+        logger.info("Outils de l'agent : %s", contexte.rapport())
+
+
+def contexte_actif() -> ContexteExecution | None:
+    return _contexte_courant.get()
+
+
+def donnees_projet() -> dict:
+    """Instantané du contexte courant, ou lecture directe hors exécution de l'agent."""
+    contexte = contexte_actif()
+    return contexte.instantane if contexte else charger_instantane_projet()
+
+
+def outil_memoise(fonction):
+    """
+    Mémoïse un outil dans le contexte d'exécution courant (sans effet hors contexte).
+    À placer sous @tool, qui lit la signature et la docstring de la fonction.
+    """
+    signature = inspect.signature(fonction)
+
+    @wraps(fonction)
+    def enveloppe(*args, **kwargs):
+        contexte = contexte_actif()
+        if contexte is None:
+            return fonction(*args, **kwargs)
+        # Arguments normalisés : f() et f(valeur_par_defaut) partagent le même résultat
+        arguments = signature.bind(*args, **kwargs)
+        arguments.apply_defaults()
+        return contexte.executer(fonction.__name__, dict(arguments.arguments), lambda: fonction(*args, **kwargs))
+    return enveloppe
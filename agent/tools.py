@@ -1,34 +1,51 @@
 from langchain.tools import tool
 from config import TARIF_KWH_DEFAULT_FCFA, PUISSANCE_PANNEAU_DEFAULT_WC, TENSION_BATTERIE_DEFAULT_V
-from core.storage import get_equipements, get_localisation, get_composants, get_parametres, get_consommation_moyenne
 from core.sizing import (
     calculer_dimensionnement_complet,
-    calculer_rentabilite
+    calculer_rentabilite,
+    resoudre_consommation
 )
+from core.balayage import balayer_dimensionnement
+from agent.contexte import donnees_projet, outil_memoise
+from agent.compaction import compacter, tableau, agreger_equipements, sous_budget
+
+# ==============================
+# CONSTANTES
+# ==============================
+PUISSANCES_COMPARATIF_WC = [400, 450, 500, 550]
+TENSIONS_COMPARATIF_V = [12, 24, 48]
+COLONNES_COMPARATIF = [
+    "puissance_panneau_wc", "tension_batterie_v", "nombre_panneaux",
+    "puissance_installee_kwc", "capacite_batterie_ah", "capacite_batterie_kwh",
+]
 
 @tool
+@outil_memoise
 def get_donnees_projet(input: str = "") -> dict:
     """
     Récupère toutes les données du projet depuis la base de données :
     équipements saisis par l'utilisateur, localisation et composants disponibles.
     Appelle cet outil en premier avant tout calcul.
     """
-    equipements = get_equipements()
-    localisation = get_localisation()
-    composants = get_composants()
-    moyenne_factures = get_consommation_moyenne()
+    projet = donnees_projet()
+    equipements = projet["equipements"]
+    localisation = projet["localisation"]
+    composants = projet["composants"]
+    moyenne_factures = projet["moyenne_factures"]
 
-    return {
-        "equipements": equipements,
+    # Forme compacte : gros consommateurs détaillés, les autres agrégés, sous budget de tokens
+    return sous_budget(lambda nb_detailles: compacter({
+        "equipements": agreger_equipements(equipements, nb_detailles),
         "localisation": localisation,
         "composants": composants,
         "nombre_equipements": len(equipements),
         "consommation_totale_wh": sum(e["conso_jour_wh"] for e in equipements),
         "moyenne_factures": moyenne_factures,
-    }
+    }))
 
 
 @tool
+@outil_memoise
 def outil_dimensionnement(puissance_panneau_wc: float = PUISSANCE_PANNEAU_DEFAULT_WC, tension_batterie_v: float = TENSION_BATTERIE_DEFAULT_V) -> dict:
     """
     Calcule le dimensionnement complet du système PV off-grid.
@@ -38,8 +55,9 @@ def outil_dimensionnement(puissance_panneau_wc: float = PUISSANCE_PANNEAU_DEFAUL
     - puissance_panneau_wc : puissance unitaire du panneau en Wc (défaut 500)
     - tension_batterie_v   : tension du parc batterie en V (12, 24 ou 48)
     """
-    equipements = get_equipements()
-    localisation = get_localisation()
+    projet = donnees_projet()
+    equipements = projet["equipements"]
+    localisation = projet["localisation"]
 
     if not localisation:
         return {"erreur": "Aucune localisation trouvée dans la base de données."}
@@ -47,26 +65,27 @@ def outil_dimensionnement(puissance_panneau_wc: float = PUISSANCE_PANNEAU_DEFAUL
     hsp = localisation["hsp_moyen"]
 
     if equipements:
-        return calculer_dimensionnement_complet(
+        return compacter(calculer_dimensionnement_complet(
             equipements=equipements,
             hsp=hsp,
             puissance_panneau_wc=puissance_panneau_wc,
             tension_batterie_v=tension_batterie_v
-        )
+        ))
 
-    moyenne = get_consommation_moyenne()
+    moyenne = projet["moyenne_factures"]
     if moyenne:
-        return calculer_dimensionnement_complet(
+        return compacter(calculer_dimensionnement_complet(
             conso_journaliere_kwh=moyenne["consommation_journaliere_moyenne_kwh"],
             hsp=hsp,
             puissance_panneau_wc=puissance_panneau_wc,
             tension_batterie_v=tension_batterie_v
-        )
+        ))
 
     return {"erreur": "Aucune donnée de consommation trouvée (ni équipements ni factures)."}
 
 
 @tool
+@outil_memoise
 def outil_rentabilite(puissance_installee_kwc: float, tarif_kwh: float = TARIF_KWH_DEFAULT_FCFA) -> dict:
     """
     Calcule l'étude de rentabilité sur 10 ans.
@@ -75,15 +94,57 @@ def outil_rentabilite(puissance_installee_kwc: float, tarif_kwh: float = TARIF_K
     - puissance_installee_kwc : puissance totale installée en kWc
     - tarif_kwh               : prix du kWh en FCFA (défaut 150)
     """
-    localisation = get_localisation()
+    projet = donnees_projet()
+    localisation = projet["localisation"]
     if not localisation:
         return {"erreur": "Localisation manquante."}
 
-    parametres = get_parametres()
+    parametres = projet["parametres"]
     production_annuelle = localisation["irradiation_annuelle_kwh"] * puissance_installee_kwc
 
-    return calculer_rentabilite(
+    return compacter(calculer_rentabilite(
         prix_total_installation=float(parametres["prix_total_installation"]),
         production_annuelle_kwh=production_annuelle,
         tarif_kwh=tarif_kwh
-    )
\ No newline at end of file
+    ))
+
+
+@tool
+@outil_memoise
+def outil_comparatif(
+    puissances_panneau_wc: list[float] | None = None,
+    tensions_batterie_v: list[float] | None = None
+) -> dict:
+    """
+    Tableau comparatif du dimensionnement pour plusieurs puissances de panneaux
+    et tensions de batterie, calculé en un seul appel (toutes les combinaisons).
+    Utilise-le au lieu d'appeler outil_dimensionnement pour chaque variante.
+
+    Paramètres :
+    - puissances_panneau_wc : puissances unitaires à comparer en Wc (défaut 400, 450, 500, 550)
+    - tensions_batterie_v   : tensions du parc batterie à comparer en V (défaut 12, 24, 48)
+    """
+    projet = donnees_projet()
+    localisation = projet["localisation"]
+    if not localisation:
+        return {"erreur": "Aucune localisation trouvée dans la base de données."}
+
+    equipements = projet["equipements"]
+    moyenne = projet["moyenne_factures"]
+    conso_kwh = moyenne["consommation_journaliere_moyenne_kwh"] if moyenne and not equipements else None
+    try:
+        conso_j_wh, _, source, _ = resoudre_consommation(equipements, conso_kwh)
+        grille = balayer_dimensionnement(
+            {"hsp": localisation["hsp_moyen"], "conso_journaliere_wh": conso_j_wh},
+            puissance_panneau_wc=puissances_panneau_wc or PUISSANCES_COMPARATIF_WC,
+            tension_batterie_v=tensions_batterie_v or TENSIONS_COMPARATIF_V,
+        )
+    except ValueError as e:
+        return {"erreur": str(e)}
+
+    return compacter({
+        "hsp_utilise": localisation["hsp_moyen"],
+        "consommation_journaliere_wh": conso_j_wh,
+        "source_consommation": source,
+        "comparatif": tableau(grille[COLONNES_COMPARATIF].to_dict("records")),
+    })
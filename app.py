@@ -6,6 +6,7 @@ load_dotenv(dotenv_path=Path(__file__).parent / ".env", override=True)
 
 from ui.style import get_css
 from core.storage import initialiser_stockage
+from agent.agent import prechauffer_agent
 
 st.set_page_config(
     page_title="Raana",
@@ -17,6 +18,15 @@ st.set_page_config(
 st.markdown(get_css(), unsafe_allow_html=True)
 initialiser_stockage()
 
+
+@st.cache_resource(show_spinner=False)
+def _prechauffer_agent() -> bool:
+    # Une seule fois par processus : l'agent compilé est partagé entre sessions
+    return prechauffer_agent()
+
+
+_prechauffer_agent()
+
 if "page_active" not in st.session_state:
     st.session_state.page_active = "Factures"
 
@@ -110,7 +120,8 @@ from core.storage import (
     get_consommation_moyenne, get_module_pv,
     get_onduleur, get_batterie, get_strings
 )
-from core.sizing import calculer_dimensionnement_complet
+from core.pipeline import PipelineDimensionnement
+from core.resultats import DimensionnementResult
 
 factures = get_factures()
 equipements = get_equipements()
@@ -212,11 +223,14 @@ else:
             show_pulse = "dim" not in st.session_state
             if show_pulse:
                 st.markdown("<div class='btn-pulse'>", unsafe_allow_html=True)
+            if "pipeline_dim" not in st.session_state:
+                st.session_state.pipeline_dim = PipelineDimensionnement()
+            pipeline = st.session_state.pipeline_dim
             if st.button("⚡ Lancer l'analyse", type="primary", use_container_width=True):
                 with st.spinner("Calcul en cours..."):
                     try:
                         if equipements:
-                            dim = calculer_dimensionnement_complet(
+                            dim = pipeline.calculer(
                                 hsp=localisation["hsp_moyen"],
                                 equipements=equipements,
                                 module=module,
@@ -225,7 +239,7 @@ else:
                                 batterie_unitaire=batterie_u
                             )
                         else:
-                            dim = calculer_dimensionnement_complet(
+                            dim = pipeline.calculer(
                                 hsp=localisation["hsp_moyen"],
                                 conso_journaliere_kwh=moyenne["consommation_journaliere_moyenne_kwh"],
                                 module=module,
@@ -233,13 +247,17 @@ else:
                                 strings=strings,
                                 batterie_unitaire=batterie_u
                             )
-                        st.session_state.dim = dim
+                        st.session_state.dim = DimensionnementResult.from_dict(dim)
+                        st.session_state.rapport_pipeline = pipeline.rapport()
                         st.success("✅ Analyse terminée !")
                         st.rerun()
                     except Exception as e:
                         st.error(f"❌ Erreur : {e}")
             if show_pulse:
                 st.markdown("</div>", unsafe_allow_html=True)
+            if st.session_state.get("rapport_pipeline", {}).get("reutilisees"):
+                reutilisees = st.session_state.rapport_pipeline["reutilisees"]
+                st.caption(f"♻️ {len(reutilisees)} étape(s) réutilisée(s) sans recalcul : {', '.join(reutilisees)}")
 
         afficher_metriques_dimensionnement()
 
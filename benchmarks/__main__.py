@@ -0,0 +1,49 @@
+import argparse
+import json
+import logging
+import sys
+from config import BASELINE_BENCH_PATH, SEUIL_REGRESSION_BENCH
+from benchmarks.charges import CHARGES, executer_charges
+from benchmarks.mesure import charger_baseline, enregistrer_baseline, comparer
+
+
+def main(arguments: list = None) -> int:
+    """python -m benchmarks [--charges ...] [--seuil 0.25] [--enregistrer]"""
+    parser = argparse.ArgumentParser(description="Benchmarks des chemins critiques (dimensionnement, stockage, export)")
+    parser.add_argument("--charges", nargs="+", choices=list(CHARGES), help="Charges à mesurer (défaut : toutes)")
+    parser.add_argument("--baseline", default=BASELINE_BENCH_PATH, help="Fichier JSON de référence")
+    parser.add_argument("--seuil", type=float, default=SEUIL_REGRESSION_BENCH,
+                        help="Ralentissement toléré de la médiane (0.25 = +25 %%)")
+    parser.add_argument("--enregistrer", action="store_true", help="Remplacer la référence par ce run")
+    parser.add_argument("--sortie", help="Écrire aussi les mesures de ce run dans ce fichier JSON")
+    args = parser.parse_args(arguments)
+
+    logging.basicConfig(level=logging.ERROR)
+    logging.getLogger("streamlit").setLevel(logging.ERROR)  # stockage hors session Streamlit
+    resultats = executer_charges(args.charges)
+
+    for nom, mesure in resultats.items():
+        print(f"{nom:<30} médiane {mesure['mediane_ms']:>10.3f} ms   p95 {mesure['p95_ms']:>10.3f} ms   "
+              f"{mesure['ops_par_seconde'] or 0:>12,.0f} ops/s   pic {mesure['memoire_pic_ko']:>9,.0f} Ko")
+    if args.sortie:
+        enregistrer_baseline(args.sortie, resultats)
+
+    baseline = charger_baseline(args.baseline)
+    if args.enregistrer or baseline is None:
+        # Première exécution : la référence est créée, sans comparaison
+        enregistrer_baseline(args.baseline, {**(baseline or {}), **resultats})
+        print(f"Référence enregistrée : {args.baseline}")
+        return 0
+
+    regressions = comparer(resultats, baseline, args.seuil)
+    for r in regressions:
+        print(f"❌ Régression {r['charge']} : {r['mediane_ms']} ms contre {r['reference_ms']} ms "
+              f"(+{r['ecart']:.0%}, seuil +{args.seuil:.0%})")
+    if not regressions:
+        print(f"✅ Aucune régression au-delà de +{args.seuil:.0%}")
+    print(json.dumps({"regressions": len(regressions)}))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+import os
+import json
+import shutil
+import tempfile
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+import fitz
+import numpy as np
+from benchmarks.faux_groq import Scenario, demarrer_faux_groq
+from benchmarks.mesure import mesurer
+from core import storage
+from core.facture_extractor import extraire_donnees_facture, valider_et_enrichir
+from core.sizing import calculer_dimensionnement_complet, calculer_configuration_strings, calculer_rentabilite
+from export.pdf_generator import generer_pdf_dimensionnement
+
+# ==============================
+# CHARGES DE TRAVAIL FIXES
+# ==============================
+# Données générées avec une graine fixe : les mesures restent comparables d'un run à l'autre.
+GRAINE = 1234
+NB_SITES = 1000
+NB_FACTURES = 10_000
+NB_FACTURES_LLM = 16
+NB_THREADS_LLM = 4
+
+MODULE = {"puissance_crete_wc": 450, "voc_v": 49.5, "isc_a": 11.6, "vmp_v": 41.2, "imp_a": 10.9,
+          "longueur_m": 1.903, "largeur_m": 1.134}
+STRINGS = [
+    {"numero_string": 1, "voc_max_v": 500, "vmppt_min_v": 120, "vmppt_max_v": 450, "imax_a": 22},
+    {"numero_string": 2, "voc_max_v": 500, "vmppt_min_v": 120, "vmppt_max_v": 450, "imax_a": 22},
+]
+BATTERIE = {"tension_v": 12.0, "capacite_ah": 200.0}
+ONDULEUR = {"tension_demarrage_batterie_v": 48.0}
+LOCALISATION = {"ville": "Lomé, Togo", "latitude": 6.13, "longitude": 1.22,
+                "irradiation_annuelle_kwh": 1900, "hsp_moyen": 5.2, "production_annuelle_kwh": 1500}
+
+
+def _sites() -> list:
+    rng = np.random.default_rng(GRAINE)
+    sites = []
+    for _ in range(NB_SITES):
+        nb = int(rng.integers(3, 15))
+        puissances = rng.integers(10, 1500, nb)
+        heures = rng.uniform(0.5, 12, nb).round(1)
+        quantites = rng.integers(1, 4, nb)
+        sites.append({
+            "hsp": round(float(rng.uniform(4, 6.5)), 2),
+            "equipements": [
+                {"puissance_w": float(p), "quantite": int(q), "conso_jour_wh": float(p * h * q)}
+                for p, h, q in zip(puissances, heures, quantites)
+            ],
+        })
+    return sites
+
+
+@contextmanager
+def _environnement(**variables):
+    """Variables d'environnement le temps d'une charge, valeurs précédentes restaurées ensuite."""
+    anciennes = {nom: os.environ.get(nom) for nom in variables}
+    os.environ.update(variables)
+    try:
+        yield
+    finally:
+        for nom, valeur in anciennes.items():
+            if valeur is None:
+                os.environ.pop(nom, None)
+            else:
+                os.environ[nom] = valeur
+
+
+@contextmanager
+def _dossier_temporaire():
+    dossier = tempfile.mkdtemp(prefix="bench_")
+    try:
+        yield dossier
+    finally:
+        shutil.rmtree(dossier, ignore_errors=True)
+
+
+@contextmanager
+def preparer_dimensionnement():
+    sites = _sites()
+
+    def executer():
+        for site in sites:
+            calculer_dimensionnement_complet(
+                hsp=site["hsp"], equipements=site["equipements"], module=MODULE,
+                strings=STRINGS, batterie_unitaire=BATTERIE, onduleur=ONDULEUR,
+            )
+    yield executer
+
+
+@contextmanager
+def preparer_solveur_strings():
+    nb_panneaux = np.random.default_rng(GRAINE).integers(1, 60, NB_SITES).tolist()
+
+    def executer():
+        for n in nb_panneaux:
+            calculer_configuration_strings(n, MODULE, STRINGS)
+    yield executer
+
+
+@contextmanager
+def preparer_stockage():
+    """Lectures SQLite d'un rerun complet de la page Analyse (base temporaire)."""
+    with _dossier_temporaire() as dossier, _environnement(DB_PATH=os.path.join(dossier, "bench.db")):
+        yield _charge_stockage()
+
+
+def _charge_stockage():
+    storage.initialiser_stockage()
+    for i, e in enumerate(_sites()[0]["equipements"]):
+        storage.ajouter_equipement(f"Appareil {i}", e["puissance_w"], 4, e["quantite"], e["conso_jour_wh"])
+    storage.sauvegarder_localisation(LOCALISATION["ville"], LOCALISATION["latitude"], LOCALISATION["longitude"],
+                                     1900, 5.2, 1500)
+    storage.sauvegarder_module_pv(**MODULE)
+    storage.sauvegarder_batterie(**BATTERIE)
+    storage.sauvegarder_onduleur(48.0, 2)
+    for s in STRINGS:
+        storage.sauvegarder_strings(**s)
+
+    def executer():
+        storage.get_factures()
+        storage.get_equipements()
+        storage.get_localisation()
+        storage.get_module_pv()
+        storage.get_onduleur()
+        storage.get_batterie()
+        storage.get_strings()
+        storage.get_consommation_moyenne()
+        storage.get_parametres()
+    return executer
+
+
+@contextmanager
+def preparer_pdf():
+    site = _sites()[0]
+    dim = calculer_dimensionnement_complet(
+        hsp=site["hsp"], equipements=site["equipements"], module=MODULE,
+        strings=STRINGS, batterie_unitaire=BATTERIE, onduleur=ONDULEUR,
+    )
+    rentabilite = calculer_rentabilite(3_000_000, 1900 * dim["puissance_installee_kwc"])
+    parametres = {"tarif_kwh": 150, "prix_total_installation": 3_000_000}
+
+    def executer():
+        generer_pdf_dimensionnement(dim, LOCALISATION, rentabilite, None, parametres)
+    yield executer
+
+
+@contextmanager
+def preparer_validation_factures():
+    rng = np.random.default_rng(GRAINE)
+    factures = [
+        {
+            "periode": "01/2025", "duree_jours": int(d), "consommation_kwh": float(c),
+            "puissance_souscrite_kva": 6, "montant_ttc": float(c * 120), "fournisseur": "CEET",
+        }
+        for d, c in zip(rng.integers(28, 62, NB_FACTURES), rng.uniform(50, 2000, NB_FACTURES).round(1))
+    ]
+
+    def executer():
+        for f in factures:
+            valider_et_enrichir(f, "facture.pdf")
+    yield executer
+
+
+@contextmanager
+def preparer_extraction_factures_llm():
+    """
+    Extraction de factures PDF de bout en bout (texte, appel LLM, validation) en parallèle,
+    contre le faux serveur Groq local sans latence : mesure le coût propre du pipeline.
+    """
+    facture = {"periode": "Mars 2025", "duree_jours": 30, "consommation_kwh": 300, "montant_ttc": 45000,
+               "puissance_souscrite_kva": 3, "fournisseur": "CEET", "usage": "Domestique"}
+    serveur = demarrer_faux_groq(Scenario(regles=[{"reponse": f"```json\n{json.dumps(facture)}\n```"}]))
+    variables = {"GROQ_BASE_URL": serveur.url, "GROQ_API_KEY": os.getenv("GROQ_API_KEY") or "cle-factice"}
+    try:
+        with _dossier_temporaire() as dossier, _environnement(**variables):
+            chemin = os.path.join(dossier, "facture.pdf")
+            doc = fitz.open()
+            doc.new_page().insert_text((72, 72), "Facture CEET - Mars 2025 - Consommation 300 kWh - 45000 FCFA")
+            doc.save(chemin)
+            doc.close()
+
+            def executer():
+                with ThreadPoolExecutor(max_workers=NB_THREADS_LLM) as pool:
+                    list(pool.map(lambda _: extraire_donnees_facture(chemin, "facture.pdf"), range(NB_FACTURES_LLM)))
+            yield executer
+    finally:
+        serveur.shutdown()
+        serveur.server_close()
+
+
+# nom → (préparation (gestionnaire de contexte → fonction mesurée), répétitions, opérations par exécution)
+CHARGES = {
+    "dimensionnement_complet": (preparer_dimensionnement, 10, NB_SITES),
+    "solveur_strings": (preparer_solveur_strings, 20, NB_SITES),
+    "stockage_rerun_analyse": (preparer_stockage, 50, 1),
+    "generer_pdf_dimensionnement": (preparer_pdf, 10, 1),
+    "valider_et_enrichir": (preparer_validation_factures, 10, NB_FACTURES),
+    "extraction_factures_llm": (preparer_extraction_factures_llm, 5, NB_FACTURES_LLM),
+}
+
+
+def executer_charges(noms: list = None) -> dict:
+    """Mesure les charges demandées (toutes par défaut) → {nom: mesure}."""
+    noms = noms or list(CHARGES)
+    inconnues = set(noms) - set(CHARGES)
+    if inconnues:
+        raise ValueError(f"Charge inconnue : {', '.join(sorted(inconnues))}")
+
+    resultats = {}
+    for nom in noms:
+        preparer, repetitions, operations = CHARGES[nom]
+        # Chaque préparation restaure l'environnement et libère ses ressources en sortie
+        with preparer() as executer:
+            resultats[nom] = mesurer(executer, repetitions, operations=operations)
+    return resultats
@@ -0,0 +1,357 @@
+import argparse
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# ==============================
+# CONSTANTES
+# ==============================
+# Chemins servis : client Groq (base_url + /openai/v1/...) et clients OpenAI (base_url + /v1/...)
+CHEMINS_COMPLETIONS = {"/openai/v1/chat/completions", "/v1/chat/completions"}
+REPONSE_PAR_DEFAUT = "Réponse factice du serveur local."
+PORT_DEFAUT = 8765
+
+
+# ==============================
+# SCÉNARIO
+# ==============================
+def empreinte_requete(requete: dict) -> str:
+    """Clé d'un échange enregistré : modèle + messages (sans température ni options de transport)."""
+    contenu = json.dumps({"model": requete.get("model"), "messages": requete.get("messages")}, sort_keys=True)
+    return hashlib.sha256(contenu.encode("utf-8")).hexdigest()
+
+
+def _texte_requete(requete: dict) -> str:
+    """Texte de tous les messages (parties image ignorées), pour les règles « si_contient »."""
+    morceaux = []
+    for message in requete.get("messages", []):
+        contenu = message.get("content") or ""
+        if isinstance(contenu, list):
+            contenu = " ".join(p.get("text", "") for p in contenu if isinstance(p, dict))
+        morceaux.append(contenu)
+    return "\n".join(morceaux)
+
+
+class Scenario:
+    """
+    Réponses du faux serveur, dans l'ordre de priorité :
+    1. échanges enregistrés (JSONL {"requete", "reponse"}) rejoués à l'identique
+    2. règles scriptées : {"si_contient": "...", "si_modele": "...", "reponse": "...", "tool_calls": [...]}
+       (première règle dont le texte figure dans les messages et, si précisé, pour ce modèle ;
+       sans condition = toujours)
+    3. REPONSE_PAR_DEFAUT
+    Latence, erreurs 5xx et 429 tirées avec une graine fixe : runs reproductibles.
+    """
+
+    def __init__(
+        self,
+        regles: list = None,
+        enregistrements: dict = None,
+        latence_ms: float = 0.0,
+        gigue_ms: float = 0.0,
+        taux_erreur: float = 0.0,
+        taux_429: float = 0.0,
+        graine: int = 0,
+    ):
+        if not (0 <= taux_erreur <= 1 and 0 <= taux_429 <= 1):
+            raise ValueError("Taux d'erreur invalide (attendu entre 0 et 1)")
+        self.regles = regles or []
+        self.enregistrements = enregistrements or {}
+        self.latence_ms = latence_ms
+        self.gigue_ms = gigue_ms
+        self.taux_erreur = taux_erreur
+        self.taux_429 = taux_429
+        self._rng = random.Random(graine)
+        self._verrou = threading.Lock()
+
+    @classmethod
+    def depuis_fichier(cls, chemin: str, **options) -> "Scenario":
+        """Fichier JSON {"regles": [...], "latence_ms": ..., ...} ou JSONL d'échanges enregistrés."""
+        chemin = Path(chemin)
+        if chemin.suffix == ".jsonl":
+            return cls(enregistrements=charger_enregistrements(chemin), **options)
+        config = json.loads(chemin.read_text(encoding="utf-8"))
+        return cls(**{**config, **options})
+
+    def tirer_incident(self) -> str | None:
+        """'429', 'erreur' ou None pour la prochaine requête."""
+        with self._verrou:
+            tirage = self._rng.random()
+        if tirage < self.taux_429:
+            return "429"
+        if tirage < self.taux_429 + self.taux_erreur:
+            return "erreur"
+        return None
+
+    def latence_s(self) -> float:
+        with self._verrou:
+            gigue = self._rng.uniform(-self.gigue_ms, self.gigue_ms) if self.gigue_ms else 0.0
+        return max(0.0, self.latence_ms + gigue) / 1000
+
+    def repondre(self, requete: dict) -> dict:
+        """Réponse chat.completion complète (format OpenAI/Groq) pour la requête."""
+        enregistree = self.enregistrements.get(empreinte_requete(requete))
+        if enregistree is not None:
+            return enregistree
+
+        texte = _texte_requete(requete)
+        regle = next((r for r in self.regles if r.get("si_contient", "") in texte
+                      and r.get("si_modele", requete.get("model")) == requete.get("model")), None)
+        contenu = regle["reponse"] if regle else REPONSE_PAR_DEFAUT
+        tool_calls = [
+            {"id": f"call_{uuid.uuid4().hex[:12]}", "type": "function",
+             "function": {"name": appel["name"], "arguments": json.dumps(appel.get("args", {}))}}
+            for appel in (regle or {}).get("tool_calls", [])
+        ]
+        message = {"role": "assistant", "content": contenu if not tool_calls else (contenu or None)}
+        if tool_calls:
+            message["tool_calls"] = tool_calls
+
+        tokens_prompt = max(1, len(texte) // 4)
+        tokens_reponse = max(1, len(contenu or "") // 4)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": requete.get("model", "faux-modele"),
+            "choices": [{
+                "index": 0,
+                "message": message,
+                "finish_reason": "tool_calls" if tool_calls else "stop",
+            }],
+            "usage": {
+                "prompt_tokens": tokens_prompt,
+                "completion_tokens": tokens_reponse,
+                "total_tokens": tokens_prompt + tokens_reponse,
+            },
+        }
+
+
+def charger_enregistrements(chemin: Path) -> dict:
+    enregistrements = {}
+    with open(chemin, encoding="utf-8") as f:
+        for ligne in f:
+            if ligne.strip():
+                echange = json.loads(ligne)
+                enregistrements[empreinte_requete(echange["requete"])] = echange["reponse"]
+    return enregistrements
+
+
+def _fragments_sse(reponse: dict):
+    """Découpe une réponse complète en chunks chat.completion.chunk (mode stream)."""
+    choix = reponse["choices"][0]
+    message = choix["message"]
+    base = {"id": reponse["id"], "object": "chat.completion.chunk",
+            "created": reponse["created"], "model": reponse["model"]}
+
+    yield {**base, "choices": [{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}]}
+    for mot in (message.get("content") or "").split(" "):
+        if mot:
+            yield {**base, "choices": [{"index": 0, "delta": {"content": mot + " "}, "finish_reason": None}]}
+    for i, appel in enumerate(message.get("tool_calls") or []):
+        yield {**base, "choices": [{"index": 0, "delta": {"tool_calls": [{**appel, "index": i}]}, "finish_reason": None}]}
+    yield {**base, "choices": [{"index": 0, "delta": {}, "finish_reason": choix["finish_reason"]}],
+           "x_groq": {"usage": reponse.get("usage")}}
+
+
+def _generation_json_invalide(requete: dict, reponse: dict) -> str | None:
+    """Contenu refusé par le mode JSON (response_format json_object) ; None s'il est valide ou hors mode JSON."""
+    if (requete.get("response_format") or {}).get("type") != "json_object":
+        return None
+    contenu = reponse["choices"][0]["message"].get("content") or ""
+    try:
+        return None if isinstance(json.loads(contenu), dict) else contenu
+    except json.JSONDecodeError:
+        return contenu
+
+
+# ==============================
+# SERVEUR HTTP
+# ==============================
+class _Gestionnaire(BaseHTTPRequestHandler):
+    server: "FauxServeurGroq"
+    protocol_version = "HTTP/1.1"
+    # En-têtes et corps écrits séparément : sans TCP_NODELAY, Nagle + ACK retardé ajoutent ~40 ms par requête
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        logger.debug("faux-groq : " + format, *args)
+
+    def _json(self, statut: int, corps: dict, entetes: dict = None) -> None:
+        donnees = json.dumps(corps, ensure_ascii=False).encode("utf-8")
+        self.send_response(statut)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(donnees)))
+        for cle, valeur in (entetes or {}).items():
+            self.send_header(cle, valeur)
+        self.end_headers()
+        self.wfile.write(donnees)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self._json(200, self.server.statistiques())
+        else:
+            self._json(404, {"error": {"message": "Chemin inconnu", "type": "not_found"}})
+
+    def do_POST(self):
+        # Corps toujours lu : sinon il polluerait la requête suivante de la connexion keep-alive
+        corps = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path not in CHEMINS_COMPLETIONS:
+            self._json(404, {"error": {"message": "Chemin inconnu", "type": "not_found"}})
+            return
+        requete = json.loads(corps or b"{}")
+        scenario = self.server.scenario
+        time.sleep(scenario.latence_s())
+
+        incident = scenario.tirer_incident()
+        if incident:
+            self.server.compter(incident)
+        if incident == "429":
+            self._json(429, {"error": {"message": "Rate limit reached (faux serveur)", "type": "tokens",
+                                       "code": "rate_limit_exceeded"}},
+                       {"retry-after-ms": str(self.server.retry_after_ms)})
+            return
+        if incident == "erreur":
+            self._json(500, {"error": {"message": "Erreur interne simulée", "type": "internal_server_error"}})
+            return
+
+        if self.server.amont:
+            reponse = self.server.relayer(requete, self.headers.get("Authorization"))
+        else:
+            reponse = scenario.repondre(requete)
+            generation = _generation_json_invalide(requete, reponse)
+            if generation is not None:
+                # Comme Groq en mode JSON : 400 avec le texte refusé dans failed_generation
+                self.server.compter("json_invalide")
+                self._json(400, {"error": {"message": "Failed to generate JSON (faux serveur)",
+                                           "type": "invalid_request_error", "code": "json_validate_failed",
+                                           "failed_generation": generation}})
+                return
+        self.server.compter("ok")
+
+        if not requete.get("stream"):
+            self._json(200, reponse)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for fragment in _fragments_sse(reponse):
+            self.wfile.write(f"data: {json.dumps(fragment, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+
+class FauxServeurGroq(ThreadingHTTPServer):
+    """
+    Serveur local compatible chat-completions (Groq/OpenAI), un thread par requête.
+    amont + fichier_enregistrement : mode enregistrement, les requêtes sont relayées
+    à l'API réelle et les échanges ajoutés au JSONL (rejouables ensuite via Scenario).
+    """
+    daemon_threads = True
+
+    def __init__(self, adresse: tuple, scenario: Scenario, amont: str = None,
+                 fichier_enregistrement: str = None, retry_after_ms: int = 100):
+        super().__init__(adresse, _Gestionnaire)
+        self.scenario = scenario
+        self.amont = amont.rstrip("/") if amont else None
+        self.fichier_enregistrement = fichier_enregistrement
+        self.retry_after_ms = retry_after_ms
+        self._verrou = threading.Lock()
+        self._compteurs = {"ok": 0, "429": 0, "erreur": 0, "json_invalide": 0}
+
+    @property
+    def url(self) -> str:
+        hote, port = self.server_address[:2]
+        return f"http://{hote}:{port}"
+
+    def compter(self, issue: str) -> None:
+        with self._verrou:
+            self._compteurs[issue] += 1
+
+    def remettre_a_zero(self) -> None:
+        """Remet les compteurs à zéro (entre deux runs de charge)."""
+        with self._verrou:
+            self._compteurs = dict.fromkeys(self._compteurs, 0)
+
+    def statistiques(self) -> dict:
+        with self._verrou:
+            return {"requetes": sum(self._compteurs.values()), **self._compteurs}
+
+    def relayer(self, requete: dict, autorisation: str) -> dict:
+        reponse = httpx.post(
+            f"{self.amont}/openai/v1/chat/completions",
+            json={**requete, "stream": False},
+            headers={"Authorization": autorisation or ""},
+            timeout=120,
+        )
+        reponse.raise_for_status()
+        corps = reponse.json()
+        if self.fichier_enregistrement:
+            with self._verrou, open(self.fichier_enregistrement, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"requete": {**requete, "stream": False}, "reponse": corps}, ensure_ascii=False) + "\n")
+        return corps
+
+
+def demarrer_faux_groq(scenario: Scenario = None, hote: str = "127.0.0.1", port: int = 0, **options) -> FauxServeurGroq:
+    """
+    Démarre le faux serveur dans un thread (port 0 = port libre) et le retourne.
+    Pointer l'application dessus : GROQ_BASE_URL=serveur.url ; arrêt : serveur.shutdown().
+    """
+    serveur = FauxServeurGroq((hote, port), scenario or Scenario(), **options)
+    threading.Thread(target=serveur.serve_forever, daemon=True, name="faux-groq").start()
+    logger.info("Faux serveur Groq à l'écoute sur %s", serveur.url)
+    return serveur
+
+
+def main(arguments: list = None) -> None:
+    """python -m benchmarks.faux_groq [--scenario fichier] [--latence-ms 300] [--taux-429 0.1] ..."""
+    parser = argparse.ArgumentParser(description="Faux serveur Groq/OpenAI (chat completions) pour tests de charge hors ligne")
+    parser.add_argument("--hote", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=PORT_DEFAUT)
+    parser.add_argument("--scenario", help="Règles JSON ou échanges enregistrés (.jsonl)")
+    parser.add_argument("--latence-ms", type=float, help="Latence ajoutée à chaque réponse")
+    parser.add_argument("--gigue-ms", type=float, help="Variation aléatoire de la latence (±)")
+    parser.add_argument("--taux-erreur", type=float, help="Proportion de réponses 500")
+    parser.add_argument("--taux-429", type=float, help="Proportion de réponses 429 (rate limit)")
+    parser.add_argument("--graine", type=int, help="Graine des tirages (latence, erreurs)")
+    parser.add_argument("--retry-after-ms", type=int, default=100, help="En-tête retry-after-ms des réponses 429")
+    parser.add_argument("--enregistrer", metavar="JSONL", help="Relayer vers --amont et enregistrer les échanges")
+    parser.add_argument("--amont", default="https://api.groq.com", help="API réelle utilisée avec --enregistrer")
+    args = parser.parse_args(arguments)
+
+    options = {cle: valeur for cle, valeur in {
+        "latence_ms": args.latence_ms, "gigue_ms": args.gigue_ms, "taux_erreur": args.taux_erreur,
+        "taux_429": args.taux_429, "graine": args.graine,
+    }.items() if valeur is not None}
+    scenario = Scenario.depuis_fichier(args.scenario, **options) if args.scenario else Scenario(**options)
+
+    logging.basicConfig(level=logging.INFO)
+    serveur = FauxServeurGroq(
+        (args.hote, args.port), scenario,
+        amont=args.amont if args.enregistrer else None,
+        fichier_enregistrement=args.enregistrer,
+        retry_after_ms=args.retry_after_ms,
+    )
+    print(f"Faux serveur Groq : {serveur.url}  (export GROQ_BASE_URL={serveur.url})")
+    try:
+        serveur.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        serveur.server_close()
+
+
+if __name__ == "__main__":
+    main()
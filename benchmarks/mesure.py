@@ -0,0 +1,95 @@
+import gc
+import json
+import logging
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+# ==============================
+# MESURE
+# ==============================
+def mesurer(fonction, repetitions: int, echauffement: int = 1, operations: int = 1) -> dict:
+    """
+    Chronomètre `fonction` sur `repetitions` exécutions (après échauffement).
+    operations : nombre d'opérations unitaires par exécution (ex: 1000 sites),
+    pour exprimer le débit en opérations par seconde.
+    La mémoire de pointe est mesurée sur une exécution séparée (tracemalloc
+    fausserait les temps).
+    """
+    if repetitions < 1:
+        raise ValueError(f"Nombre de répétitions invalide : {repetitions}")
+
+    for _ in range(echauffement):
+        fonction()
+
+    durees = []
+    gc_actif = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repetitions):
+            debut = time.perf_counter()
+            fonction()
+            durees.append(time.perf_counter() - debut)
+    finally:
+        if gc_actif:
+            gc.enable()
+
+    tracemalloc.start()
+    try:
+        fonction()
+        _, pic = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    durees.sort()
+    mediane = statistics.median(durees)
+    p95 = durees[min(len(durees) - 1, int(round(0.95 * (len(durees) - 1))))]
+    return {
+        "repetitions": repetitions,
+        "operations": operations,
+        "mediane_ms": round(mediane * 1000, 4),
+        "p95_ms": round(p95 * 1000, 4),
+        "ops_par_seconde": round(operations / mediane, 1) if mediane > 0 else None,
+        "memoire_pic_ko": round(pic / 1024, 1),
+    }
+
+
+# ==============================
+# RÉFÉRENCE (BASELINE)
+# ==============================
+def charger_baseline(chemin) -> dict | None:
+    chemin = Path(chemin)
+    if not chemin.exists():
+        return None
+    return json.loads(chemin.read_text(encoding="utf-8"))
+
+
+def enregistrer_baseline(chemin, resultats: dict) -> None:
+    chemin = Path(chemin)
+    chemin.parent.mkdir(parents=True, exist_ok=True)
+    chemin.write_text(json.dumps(resultats, ensure_ascii=False, indent=2, sort_keys=True), encoding="utf-8")
+
+
+def comparer(resultats: dict, baseline: dict, seuil: float) -> list:
+    """
+    Charges dont la médiane dépasse celle de la référence de plus de `seuil`
+    (0.25 = +25 %). Les charges absentes de la référence sont ignorées.
+    """
+    regressions = []
+    for nom, mesure in resultats.items():
+        reference = (baseline or {}).get(nom)
+        if not reference or not reference.get("mediane_ms"):
+            continue
+        ecart = mesure["mediane_ms"] / reference["mediane_ms"] - 1
+        if ecart > seuil:
+            regressions.append({
+                "charge": nom,
+                "mediane_ms": mesure["mediane_ms"],
+                "reference_ms": reference["mediane_ms"],
+                "ecart": round(ecart, 3),
+            })
+    return regressions
@@ -18,6 +18,71 @@ AUTONOMIE_DEFAULT_JOURS = 1             # Autonomie batterie par défaut (jours)
 # --- Onduleur ---
 FACTEUR_SECURITE_ONDULEUR = 1.25        # Surdimensionnement onduleur (+25%)
 HSP_EQUIVALENT_FACTURES = 8             # Heures d'utilisation estimées (mode factures)
+FACTEUR_SURCHARGE_ONDULEUR = 2.0        # Surcharge transitoire admissible (démarrage moteurs)
+
+# --- Profil de charge ---
+HEURE_LEVER_SOLEIL = 7                  # Début de la production PV (h)
+HEURE_COUCHER_SOLEIL = 18               # Fin de la production PV (h)
 
 # --- Économie ---
 TARIF_KWH_DEFAULT_FCFA = 150            # Tarif électricité par défaut (FCFA/kWh)
+
+# --- Monte Carlo (dimensionnement probabiliste) ---
+NB_SCENARIOS_MONTE_CARLO = 100_000      # Nombre de jours simulés
+GRAINE_MONTE_CARLO = 42                 # Graine du générateur aléatoire (reproductibilité)
+CV_HSP_JOURNALIER = 0.25                # Coefficient de variation journalier du HSP
+CV_CHARGE_JOURNALIERE = 0.15            # Coefficient de variation journalier de la consommation
+DERATING_PV_MIN = 0.85                  # Dégradation min des panneaux (salissure, vieillissement)
+DERATING_BATTERIE_MIN = 0.80            # Capacité résiduelle min de la batterie (vieillissement)
+DUREE_SEQUENCE_JOURS = 30               # Longueur d'une séquence simulée (état de charge continu)
+
+# --- Balayage paramétrique ---
+TAILLE_CACHE_BALAYAGE = 32              # Nombre de grilles conservées en cache
+
+# --- Économie long terme ---
+DUREE_PROJECTION_ANS = 25               # Horizon de la projection financière (années)
+DEGRADATION_PANNEAUX_ANNUELLE = 0.005   # Perte de production par an (0,5 %/an)
+INFLATION_TARIF_ANNUELLE = 0.03         # Hausse annuelle du tarif électricité
+INFLATION_COUTS_ANNUELLE = 0.03         # Hausse annuelle des coûts (O&M, remplacement)
+TAUX_ACTUALISATION = 0.08               # Taux d'actualisation (VAN, LCOE)
+TAUX_OM_ANNUEL = 0.01                   # Coût O&M annuel (fraction du coût d'installation)
+CYCLES_VIE_BATTERIE = 6000              # Durée de vie batterie lithium (cycles)
+CYCLES_BATTERIE_PAR_AN = 365            # Un cycle par jour en off-grid
+PRIX_BATTERIE_KWH_FCFA = 200_000        # Coût de remplacement du parc batterie (FCFA par kWh de capacité)
+
+# --- Catalogue de composants ---
+CATALOGUE_DB_PATH = "data/catalogue.db"  # Base partagée entre sessions (surchargeable via CATALOGUE_PATH)
+NB_RESULTATS_CATALOGUE = 50             # Nombre max de références proposées à l'écran
+
+# --- Dimensionnement par lots (CLI) ---
+TAILLE_LOT_BATCH = 500                  # Sites par lot envoyé à un processus
+
+# --- Benchmarks ---
+BASELINE_BENCH_PATH = "benchmarks/baseline.json"  # Référence des mesures de performance
+SEUIL_REGRESSION_BENCH = 0.25           # Ralentissement toléré (médiane) avant échec : +25 %
+
+# --- Cache des réponses de l'agent ---
+DUREE_CACHE_REPONSES_S = 7 * 24 * 3600  # Durée de validité d'une réponse en cache (s)
+TAILLE_MAX_CACHE_REPONSES = 100         # Réponses conservées par projet (les moins récemment lues sont évincées)
+
+# --- Sorties des outils de l'agent ---
+BUDGET_TOKENS_OUTIL = 800               # Taille max d'un résultat d'outil envoyé au LLM (tokens estimés)
+NB_EQUIPEMENTS_DETAILLES = 10           # Équipements détaillés ; les suivants sont regroupés dans « autres »
+DECIMALES_OUTIL = 2                     # Arrondi des nombres transmis au LLM
+CARACTERES_PAR_TOKEN = 3.5              # Estimation du nombre de tokens (JSON français, tokenizer Llama)
+
+# --- Télémétrie des appels LLM ---
+METRIQUES_LLM_PATH = "data/metriques_llm.jsonl"  # Appels LLM mesurés (une ligne JSON par appel)
+INTERVALLE_FLUSH_METRIQUES_S = 30       # Écriture des mesures en attente au plus tard toutes les 30 s
+TAILLE_MAX_TAMPON_METRIQUES = 200       # ... ou dès que ce nombre d'appels est en attente
+NB_MAX_DUREES_METRIQUES = 10_000        # Durées conservées par (pipeline, modèle) pour les p50/p95 (les plus récentes)
+# Prix Groq en USD par million de tokens (entrée, sortie) — coût estimé des appels
+TARIFS_LLM_USD_PAR_MTOKEN = {
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "llama-3.1-8b-instant": (0.05, 0.08),
+    "meta-llama/llama-4-scout-17b-16e-instruct": (0.11, 0.34),
+}
+
+# --- Export PDF ---
+TAILLE_MAX_CACHE_PDF_OCTETS = 32 * 1024 * 1024  # Rapports PDF gardés en mémoire (les moins récemment lus sont évincés)
+TAILLE_LOT_PORTEFEUILLE = 50                    # Rapports rendus par tâche du pool (export de portefeuille)
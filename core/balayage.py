@@ -0,0 +1,143 @@
+import logging
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from config import (
+    PERFORMANCE_RATIO_DEFAULT,
+    PUISSANCE_PANNEAU_DEFAULT_WC,
+    TENSION_BATTERIE_DEFAULT_V,
+    PROFONDEUR_DECHARGE_DEFAULT,
+    AUTONOMIE_DEFAULT_JOURS,
+    HSP_MIN,
+    HSP_MAX,
+    TAILLE_CACHE_BALAYAGE,
+)
+
+logger = logging.getLogger(__name__)
+
+# ==============================
+# CONSTANTES
+# ==============================
+PARAMETRES_BALAYABLES = (
+    "hsp",
+    "conso_journaliere_wh",
+    "puissance_panneau_wc",
+    "tension_batterie_v",
+    "autonomie_jours",
+    "performance_ratio",
+    "profondeur_decharge",
+)
+
+VALEURS_PAR_DEFAUT = {
+    "puissance_panneau_wc": PUISSANCE_PANNEAU_DEFAULT_WC,
+    "tension_batterie_v": TENSION_BATTERIE_DEFAULT_V,
+    "autonomie_jours": AUTONOMIE_DEFAULT_JOURS,
+    "performance_ratio": PERFORMANCE_RATIO_DEFAULT,
+    "profondeur_decharge": PROFONDEUR_DECHARGE_DEFAULT,
+}
+
+
+# ==============================
+# UTILITAIRES
+# ==============================
+def plage(minimum: float, maximum: float, nb_points: int) -> tuple:
+    """Construit une plage de valeurs régulièrement espacées (bornes incluses)."""
+    if nb_points < 1:
+        raise ValueError(f"Nombre de points invalide : {nb_points}")
+    return tuple(round(float(v), 6) for v in np.linspace(minimum, maximum, nb_points))
+
+
+def _normaliser_valeurs(nom: str, valeurs) -> tuple:
+    """Convertit une valeur ou une liste de valeurs en tuple de floats (clé de cache)."""
+    if nom not in PARAMETRES_BALAYABLES:
+        raise ValueError(f"Paramètre non balayable : {nom}")
+    if np.isscalar(valeurs):
+        valeurs = (valeurs,)
+    valeurs = tuple(float(v) for v in valeurs)
+    if not valeurs:
+        raise ValueError(f"Plage vide pour {nom}")
+    return valeurs
+
+
+def _valider_grille(grille: dict) -> None:
+    """Mêmes contrôles que core.sizing, appliqués à toute la grille."""
+    if "conso_journaliere_wh" not in grille:
+        raise ValueError("Consommation journalière requise (conso_journaliere_wh)")
+    if "hsp" not in grille:
+        raise ValueError("HSP requis")
+
+    def hors_plage(nom, condition):
+        return any(not condition(v) for v in grille[nom])
+
+    if hors_plage("hsp", lambda v: HSP_MIN <= v <= HSP_MAX):
+        raise ValueError(f"HSP invalide dans la grille (attendu entre {HSP_MIN} et {HSP_MAX})")
+    if hors_plage("conso_journaliere_wh", lambda v: v >= 0):
+        raise ValueError("Consommation invalide dans la grille")
+    if hors_plage("performance_ratio", lambda v: 0 < v <= 1):
+        raise ValueError("Performance Ratio invalide dans la grille")
+    if hors_plage("tension_batterie_v", lambda v: v > 0):
+        raise ValueError("Tension batterie invalide dans la grille")
+    if hors_plage("profondeur_decharge", lambda v: 0 < v <= 1):
+        raise ValueError("Profondeur de décharge invalide dans la grille")
+    if hors_plage("puissance_panneau_wc", lambda v: v > 0):
+        raise ValueError("Puissance panneau invalide dans la grille")
+
+
+# ==============================
+# CALCUL VECTORISÉ
+# ==============================
+@lru_cache(maxsize=TAILLE_CACHE_BALAYAGE)
+def _calculer_grille(definition: tuple) -> pd.DataFrame:
+    """
+    Évalue le produit cartésien de la grille par diffusion NumPy.
+    Reprend exactement les formules (et arrondis) de core.sizing.
+    """
+    noms = [nom for nom, _ in definition]
+    axes = np.meshgrid(*(np.asarray(valeurs) for _, valeurs in definition), indexing="ij", sparse=True)
+    p = dict(zip(noms, axes))
+
+    conso = p["conso_journaliere_wh"]
+    puissance_crete = np.round(conso / (p["hsp"] * p["performance_ratio"]), 2)
+    nb_panneaux = np.where(puissance_crete > 0, np.ceil(puissance_crete / p["puissance_panneau_wc"]), 0)
+    puissance_installee = nb_panneaux * p["puissance_panneau_wc"]
+    energie_stockee = conso * p["autonomie_jours"]
+    capacite_ah = np.round(energie_stockee / (p["tension_batterie_v"] * p["profondeur_decharge"]), 2)
+    capacite_kwh = np.round(energie_stockee / 1000, 2)
+
+    forme = np.broadcast_shapes(*(a.shape for a in axes))
+    colonnes = {nom: np.broadcast_to(p[nom], forme).ravel() for nom in noms}
+    colonnes.update({
+        "puissance_crete_necessaire_wc": np.broadcast_to(puissance_crete, forme).ravel(),
+        "nombre_panneaux": np.broadcast_to(nb_panneaux, forme).ravel().astype(np.int64),
+        "puissance_installee_kwc": np.round(np.broadcast_to(puissance_installee, forme).ravel() / 1000, 2),
+        "capacite_batterie_ah": np.broadcast_to(capacite_ah, forme).ravel(),
+        "capacite_batterie_kwh": np.broadcast_to(capacite_kwh, forme).ravel(),
+    })
+    return pd.DataFrame(colonnes)
+
+
+def balayer_dimensionnement(base: dict = None, **plages) -> pd.DataFrame:
+    """
+    Balaye le produit cartésien des paramètres de dimensionnement.
+
+    base   : valeurs fixes (ex: {"hsp": 5.2, "conso_journaliere_wh": 4500})
+    plages : listes de valeurs par paramètre balayé
+             (ex: performance_ratio=plage(0.6, 0.8, 50), tension_batterie_v=[12, 24, 48])
+
+    Retourne un tableau « tidy » : une ligne par point de grille, une colonne par
+    paramètre et par résultat — directement exploitable pour des heatmaps.
+    Les résultats sont mis en cache par définition de grille.
+    """
+    grille = dict(VALEURS_PAR_DEFAUT)
+    grille.update(base or {})
+    grille.update(plages)
+    grille = {nom: _normaliser_valeurs(nom, valeurs) for nom, valeurs in grille.items()}
+    _valider_grille(grille)
+
+    definition = tuple((nom, grille[nom]) for nom in PARAMETRES_BALAYABLES)
+    return _calculer_grille(definition).copy()
+
+
+def vider_cache_balayage() -> None:
+    """Vide le cache des grilles déjà évaluées."""
+    _calculer_grille.cache_clear()
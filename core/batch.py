@@ -0,0 +1,356 @@
+import argparse
+import hashlib
+import json
+import logging
+import math
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from pathlib import Path
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from config import TAILLE_LOT_BATCH, TARIF_KWH_DEFAULT_FCFA
+from core.catalogue import (
+    charger_index,
+    module_depuis_catalogue,
+    batterie_depuis_catalogue,
+    onduleur_depuis_catalogue,
+)
+from core.sizing import calculer_dimensionnement_complet, calculer_rentabilite
+from core.solar_data import get_solar_data
+
+logger = logging.getLogger(__name__)
+
+# ==============================
+# CONSTANTES
+# ==============================
+SCHEMA_RESULTATS = pa.schema([
+    ("site_id", pa.string()),
+    ("statut", pa.string()),
+    ("erreur", pa.string()),
+    ("hsp", pa.float64()),
+    ("source_hsp", pa.string()),
+    ("consommation_journaliere_kwh", pa.float64()),
+    ("puissance_crete_necessaire_wc", pa.float64()),
+    ("puissance_panneau_wc", pa.float64()),
+    ("nombre_panneaux", pa.int64()),
+    ("puissance_installee_kwc", pa.float64()),
+    ("capacite_batterie_ah", pa.float64()),
+    ("capacite_batterie_kwh", pa.float64()),
+    ("tension_batterie_v", pa.float64()),
+    ("nb_batteries_total", pa.int64()),
+    ("puissance_onduleur_kva", pa.float64()),
+    ("surface_champ_m2", pa.float64()),
+    ("panneaux_non_affectes", pa.int64()),
+    ("economies_annuelles", pa.float64()),
+    ("temps_retour_ans", pa.float64()),
+])
+
+FICHIER_PROGRESSION = "progression.json"
+
+
+# ==============================
+# LECTURE DES SITES
+# ==============================
+def lire_sites(chemin) -> pd.DataFrame:
+    """Charge le fichier de sites (CSV ou Parquet)."""
+    chemin = Path(chemin)
+    if chemin.suffix.lower() == ".parquet":
+        sites = pd.read_parquet(chemin)
+    else:
+        sites = pd.read_csv(chemin, sep=None, engine="python")
+
+    if "conso_journaliere_kwh" not in sites.columns:
+        raise ValueError("Colonne manquante : conso_journaliere_kwh")
+    if "hsp" not in sites.columns and not {"latitude", "longitude"} <= set(sites.columns):
+        raise ValueError("Fournissez soit la colonne hsp soit latitude et longitude.")
+    if "site_id" not in sites.columns:
+        sites.insert(0, "site_id", range(len(sites)))
+    sites["site_id"] = sites["site_id"].astype(str)
+    return sites
+
+
+def _valeur(site: dict, cle: str):
+    """Valeur renseignée d'une colonne, None si absente ou vide (NaN)."""
+    valeur = site.get(cle)
+    if valeur is None or (isinstance(valeur, float) and math.isnan(valeur)):
+        return None
+    return valeur
+
+
+# ==============================
+# DIMENSIONNEMENT D'UN SITE
+# ==============================
+@lru_cache(maxsize=4096)
+def _donnees_solaires(latitude: float, longitude: float) -> dict:
+    # Sites voisins (≈1 km) : une seule requête PVGIS par processus.
+    # Un échec lève une exception, que lru_cache ne mémorise pas : les sites suivants réessaient.
+    donnees = get_solar_data(latitude, longitude)
+    if donnees is None:
+        raise ValueError("Données PVGIS indisponibles")
+    return donnees
+
+
+def _composant(type_composant: str, reference) -> dict | None:
+    if reference is None:
+        return None
+    fiche = charger_index(type_composant).trouver(str(reference))
+    if fiche is None:
+        raise ValueError(f"Référence introuvable dans le catalogue ({type_composant}) : {reference}")
+    return fiche
+
+
+def _resoudre_ensoleillement(site: dict) -> tuple[float, float | None, str]:
+    """(hsp, irradiation annuelle, source) — le HSP saisi prime sur PVGIS."""
+    hsp = _valeur(site, "hsp")
+    if hsp is not None:
+        return float(hsp), _valeur(site, "irradiation_annuelle_kwh"), "saisi"
+
+    latitude, longitude = _valeur(site, "latitude"), _valeur(site, "longitude")
+    if latitude is None or longitude is None:
+        raise ValueError("HSP ou coordonnées manquants")
+    donnees = _donnees_solaires(round(float(latitude), 2), round(float(longitude), 2))
+    return donnees["hsp_moyen"], donnees["irradiation_annuelle_kwh"], "pvgis"
+
+
+def calculer_site(site: dict) -> tuple[dict, dict | None, dict]:
+    """
+    (dimensionnement, rentabilité ou None, ensoleillement {hsp, irradiation_annuelle_kwh, source})
+    d'une ligne de sites. Lève ValueError / KeyError / TypeError si la ligne est inexploitable.
+    """
+    hsp, irradiation, source_hsp = _resoudre_ensoleillement(site)
+
+    module = _composant("modules", _valeur(site, "reference_module"))
+    batterie = _composant("batteries", _valeur(site, "reference_batterie"))
+    fiche_onduleur = _composant("onduleurs", _valeur(site, "reference_onduleur"))
+    onduleur, strings = onduleur_depuis_catalogue(fiche_onduleur) if fiche_onduleur else (None, None)
+
+    parametres = {
+        cle: float(_valeur(site, cle))
+        for cle in ("puissance_panneau_wc", "tension_batterie_v")
+        if _valeur(site, cle) is not None
+    }
+    dim = calculer_dimensionnement_complet(
+        hsp=hsp,
+        conso_journaliere_kwh=float(site["conso_journaliere_kwh"]),
+        module=module_depuis_catalogue(module) if module else None,
+        batterie_unitaire=batterie_depuis_catalogue(batterie) if batterie else None,
+        onduleur=onduleur,
+        strings=strings,
+        **parametres,
+    )
+
+    rentabilite = None
+    prix = _valeur(site, "prix_total_installation")
+    if prix and irradiation and dim["puissance_installee_kwc"] > 0:
+        rentabilite = calculer_rentabilite(
+            prix_total_installation=float(prix),
+            production_annuelle_kwh=float(irradiation) * dim["puissance_installee_kwc"],
+            tarif_kwh=float(_valeur(site, "tarif_kwh") or TARIF_KWH_DEFAULT_FCFA),
+        )
+    return dim, rentabilite, {"hsp": hsp, "irradiation_annuelle_kwh": irradiation, "source": source_hsp}
+
+
+def dimensionner_site(site: dict) -> dict:
+    """
+    Dimensionne un site et retourne une ligne à plat (schéma SCHEMA_RESULTATS).
+    Une erreur sur un site est consignée dans la ligne sans interrompre le lot.
+    """
+    ligne = dict.fromkeys(SCHEMA_RESULTATS.names)
+    ligne["site_id"] = str(site["site_id"])
+    try:
+        dim, rentabilite, ensoleillement = calculer_site(site)
+
+        ligne.update({
+            "statut": "ok",
+            "hsp": ensoleillement["hsp"],
+            "source_hsp": ensoleillement["source"],
+            "consommation_journaliere_kwh": dim["consommation_journaliere_kwh"],
+            "puissance_crete_necessaire_wc": dim["puissance_crete_necessaire_wc"],
+            "puissance_panneau_wc": dim["puissance_panneau_wc"],
+            "nombre_panneaux": dim["nombre_panneaux"],
+            "puissance_installee_kwc": dim["puissance_installee_kwc"],
+            "capacite_batterie_ah": dim["batterie"]["capacite_ah"],
+            "capacite_batterie_kwh": dim["batterie"]["capacite_kwh"],
+            "tension_batterie_v": dim["batterie"]["tension_v"],
+            "puissance_onduleur_kva": dim["puissance_onduleur_recommandee_kva"],
+        })
+        if dim["configuration_batterie"]:
+            ligne["nb_batteries_total"] = dim["configuration_batterie"]["nb_batteries_total"]
+        if dim["surface_champ"]:
+            ligne["surface_champ_m2"] = dim["surface_champ"]["surface_totale_m2"]
+        if dim["configuration_strings"]:
+            ligne["panneaux_non_affectes"] = dim["configuration_strings"]["panneaux_non_affectes"]
+        if rentabilite:
+            ligne["economies_annuelles"] = rentabilite["economies_annuelles"]
+            ligne["temps_retour_ans"] = rentabilite["temps_retour_ans"]
+
+    except (ValueError, KeyError, TypeError) as e:
+        ligne["statut"] = "erreur"
+        ligne["erreur"] = str(e)
+    return ligne
+
+
+def dimensionner_lot(sites: list) -> pa.Table:
+    """Exécuté dans un processus du pool : un lot de sites → une table Arrow."""
+    return pa.Table.from_pylist([dimensionner_site(site) for site in sites], schema=SCHEMA_RESULTATS)
+
+
+# ==============================
+# REPRISE SUR INTERRUPTION
+# ==============================
+def _dossier_lots(sortie: Path) -> Path:
+    return sortie.with_name(sortie.name + ".parts")
+
+
+def _empreinte_fichier(chemin) -> str:
+    """Empreinte SHA-256 du contenu d'un fichier, lu par blocs."""
+    empreinte = hashlib.sha256()
+    with open(chemin, "rb") as f:
+        for bloc in iter(lambda: f.read(1 << 20), b""):
+            empreinte.update(bloc)
+    return empreinte.hexdigest()
+
+
+def _lire_progression(dossier: Path, taille_lot: int, nb_sites: int, entree: str) -> set:
+    """Lots déjà écrits lors d'une exécution précédente (même fichier d'entrée, même découpage)."""
+    chemin = dossier / FICHIER_PROGRESSION
+    if not chemin.exists():
+        return set()
+    progression = json.loads(chemin.read_text())
+    if progression.get("entree") != entree:
+        raise ValueError(
+            f"Reprise impossible : {dossier} provient d'un autre fichier d'entrée (supprimez-le)."
+        )
+    if progression.get("taille_lot") != taille_lot or progression.get("nb_sites") != nb_sites:
+        raise ValueError(
+            f"Reprise impossible : {dossier} provient d'un autre découpage "
+            f"(supprimez-le ou relancez avec --taille-lot {progression.get('taille_lot')})."
+        )
+    return {n for n in progression["lots_termines"] if (dossier / f"lot-{n:06d}.parquet").exists()}
+
+
+def _ecrire_progression(dossier: Path, taille_lot: int, nb_sites: int, entree: str, lots_termines: set) -> None:
+    temporaire = dossier / (FICHIER_PROGRESSION + ".tmp")
+    temporaire.write_text(json.dumps({
+        "entree": entree,
+        "taille_lot": taille_lot,
+        "nb_sites": nb_sites,
+        "lots_termines": sorted(lots_termines),
+    }))
+    os.replace(temporaire, dossier / FICHIER_PROGRESSION)
+
+
+def _ecrire_lot(dossier: Path, numero: int, table: pa.Table) -> None:
+    # Écriture atomique : un lot présent sur disque est toujours complet
+    temporaire = dossier / f"lot-{numero:06d}.parquet.tmp"
+    pq.write_table(table, temporaire)
+    os.replace(temporaire, dossier / f"lot-{numero:06d}.parquet")
+
+
+def _fusionner_lots(dossier: Path, nb_lots: int, sortie: Path) -> int:
+    """Fusion en flux : un seul lot en mémoire à la fois."""
+    nb_lignes = 0
+    with pq.ParquetWriter(sortie, SCHEMA_RESULTATS) as writer:
+        for numero in range(nb_lots):
+            table = pq.read_table(dossier / f"lot-{numero:06d}.parquet")
+            writer.write_table(table)
+            nb_lignes += table.num_rows
+    return nb_lignes
+
+
+# ==============================
+# EXÉCUTION
+# ==============================
+def executer_batch(
+    entree,
+    sortie,
+    nb_processus: int = None,
+    taille_lot: int = TAILLE_LOT_BATCH,
+    conserver_lots: bool = False,
+) -> dict:
+    """
+    Dimensionne tous les sites du fichier d'entrée et écrit le Parquet de sortie.
+
+    Colonnes d'entrée, une ligne par site :
+    - site_id (optionnel, sinon numéro de ligne)
+    - latitude + longitude (données PVGIS) ou hsp (+ irradiation_annuelle_kwh optionnelle)
+    - conso_journaliere_kwh
+    - optionnelles : puissance_panneau_wc, tension_batterie_v, reference_module,
+      reference_onduleur, reference_batterie (catalogue), prix_total_installation, tarif_kwh
+
+    Les lots sont répartis sur un pool de processus ; chaque lot terminé est écrit
+    dans <sortie>.parts/ et consigné dans progression.json avec l'empreinte du
+    fichier d'entrée : une exécution interrompue reprend là où elle s'était arrêtée. Les lots sont ensuite
+    fusionnés en flux dans le fichier de sortie.
+
+    Retourne un récapitulatif (sites, erreurs, lots repris, durée, débit).
+    """
+    if taille_lot < 1:
+        raise ValueError(f"Taille de lot invalide : {taille_lot}")
+
+    debut = time.perf_counter()
+    sortie = Path(sortie)
+    sites = lire_sites(entree)
+    enregistrements = sites.to_dict("records")
+    nb_sites = len(enregistrements)
+    nb_lots = math.ceil(nb_sites / taille_lot)
+
+    dossier = _dossier_lots(sortie)
+    dossier.mkdir(parents=True, exist_ok=True)
+    empreinte_entree = _empreinte_fichier(entree)
+    lots_termines = _lire_progression(dossier, taille_lot, nb_sites, empreinte_entree)
+    lots_repris = len(lots_termines)
+    a_traiter = [n for n in range(nb_lots) if n not in lots_termines]
+    logger.info("%d site(s), %d lot(s) dont %d déjà traité(s)", nb_sites, nb_lots, lots_repris)
+
+    if a_traiter:
+        with ProcessPoolExecutor(max_workers=nb_processus) as pool:
+            futures = {
+                pool.submit(dimensionner_lot, enregistrements[n * taille_lot:(n + 1) * taille_lot]): n
+                for n in a_traiter
+            }
+            for future in as_completed(futures):
+                numero = futures[future]
+                _ecrire_lot(dossier, numero, future.result())
+                lots_termines.add(numero)
+                _ecrire_progression(dossier, taille_lot, nb_sites, empreinte_entree, lots_termines)
+                logger.info("Lot %d/%d écrit (%d/%d)", numero + 1, nb_lots, len(lots_termines), nb_lots)
+
+    nb_lignes = _fusionner_lots(dossier, nb_lots, sortie)
+    nb_erreurs = pq.read_table(sortie, columns=["statut"]).column("statut").to_pylist().count("erreur")
+    if not conserver_lots:
+        shutil.rmtree(dossier)
+
+    duree = time.perf_counter() - debut
+    return {
+        "nb_sites": nb_lignes,
+        "nb_erreurs": nb_erreurs,
+        "nb_lots": nb_lots,
+        "lots_repris": lots_repris,
+        "duree_s": round(duree, 2),
+        "sites_par_seconde": round(nb_lignes / duree, 1) if duree > 0 else None,
+        "sortie": str(sortie),
+    }
+
+
+def main(arguments: list = None) -> None:
+    """python -m core.batch sites.csv resultats.parquet [--processus 8] [--taille-lot 500]"""
+    parser = argparse.ArgumentParser(description="Dimensionnement PV par lots (CSV/Parquet → Parquet)")
+    parser.add_argument("entree", help="Fichier de sites (.csv ou .parquet)")
+    parser.add_argument("sortie", help="Fichier Parquet de résultats")
+    parser.add_argument("--processus", type=int, default=None, help="Nombre de processus (défaut : tous les cœurs)")
+    parser.add_argument("--taille-lot", type=int, default=TAILLE_LOT_BATCH, help="Sites par lot")
+    parser.add_argument("--conserver-lots", action="store_true", help="Conserver les fichiers de lots après fusion")
+    args = parser.parse_args(arguments)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    recapitulatif = executer_batch(args.entree, args.sortie, args.processus, args.taille_lot, args.conserver_lots)
+    print(json.dumps(recapitulatif, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+import os
+import sqlite3
+import logging
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from config import CATALOGUE_DB_PATH
+
+logger = logging.getLogger(__name__)
+
+# ==============================
+# CONSTANTES
+# ==============================
+# Colonnes numériques indexées, par type de composant
+COLONNES_CATALOGUE = {
+    "modules": (
+        "puissance_crete_wc", "voc_v", "isc_a", "vmp_v", "imp_a", "longueur_m", "largeur_m",
+    ),
+    "onduleurs": (
+        "puissance_nominale_w", "tension_batterie_v", "nb_mppt",
+        "voc_max_v", "vmppt_min_v", "vmppt_max_v", "imax_a",
+    ),
+    "batteries": (
+        "tension_v", "capacite_ah",
+    ),
+}
+
+COLONNES_OBLIGATOIRES = {
+    "modules": ("puissance_crete_wc",),
+    "onduleurs": ("tension_batterie_v",),
+    "batteries": ("tension_v", "capacite_ah"),
+}
+
+
+def _verifier_type(type_composant: str) -> None:
+    if type_composant not in COLONNES_CATALOGUE:
+        raise ValueError(f"Type de composant invalide : {type_composant} (attendu : {', '.join(COLONNES_CATALOGUE)})")
+
+
+# ==============================
+# BASE PARTAGÉE
+# ==============================
+def _get_catalogue_path() -> Path:
+    """Base commune à toutes les sessions, contrairement aux données projet."""
+    path = Path(os.getenv("CATALOGUE_PATH", CATALOGUE_DB_PATH))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+@contextmanager
+def get_catalogue_db():
+    conn = sqlite3.connect(str(_get_catalogue_path()))
+    conn.row_factory = sqlite3.Row
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def initialiser_catalogue() -> None:
+    """Crée les tables du catalogue si elles n'existent pas encore."""
+    with get_catalogue_db() as conn:
+        for type_composant, colonnes in COLONNES_CATALOGUE.items():
+            definitions = ",\n".join(
+                f"{c} REAL{' NOT NULL' if c in COLONNES_OBLIGATOIRES[type_composant] else ''} CHECK({c} > 0)"
+                for c in colonnes
+            )
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS catalogue_{type_composant} (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    reference TEXT NOT NULL UNIQUE,
+                    fabricant TEXT,
+                    {definitions}
+                )
+            """)
+
+
+def importer_catalogue(type_composant: str, donnees: pd.DataFrame) -> int:
+    """
+    Importe (ou met à jour, par référence) des fiches techniques.
+    Colonnes attendues : reference, fabricant (optionnel) et les colonnes de COLONNES_CATALOGUE.
+    Retourne le nombre de références importées.
+    """
+    _verifier_type(type_composant)
+    colonnes = COLONNES_CATALOGUE[type_composant]
+    manquantes = {"reference", *COLONNES_OBLIGATOIRES[type_composant]} - set(donnees.columns)
+    if manquantes:
+        raise ValueError(f"Colonnes manquantes : {', '.join(sorted(manquantes))}")
+
+    donnees = donnees.reindex(columns=["reference", "fabricant", *colonnes])
+    donnees = donnees.dropna(subset=["reference"]).drop_duplicates("reference", keep="last")
+    lignes = [
+        tuple(None if pd.isna(v) else v for v in ligne)
+        for ligne in donnees.itertuples(index=False)
+    ]
+
+    initialiser_catalogue()
+    mises_a_jour = ", ".join(f"{c} = excluded.{c}" for c in ("fabricant", *colonnes))
+    with get_catalogue_db() as conn:
+        conn.executemany(f"""
+            INSERT INTO catalogue_{type_composant} (reference, fabricant, {', '.join(colonnes)})
+            VALUES ({', '.join('?' * (len(colonnes) + 2))})
+            ON CONFLICT(reference) DO UPDATE SET {mises_a_jour}
+        """, lignes)
+
+    vider_cache_catalogue()
+    logger.info("Catalogue %s : %d référence(s) importée(s)", type_composant, len(lignes))
+    return len(lignes)
+
+
+def importer_catalogue_csv(type_composant: str, chemin) -> int:
+    """Importe un fichier CSV de fiches techniques (séparateur , ou ;)."""
+    return importer_catalogue(type_composant, pd.read_csv(chemin, sep=None, engine="python"))
+
+
+# ==============================
+# INDEX EN MÉMOIRE
+# ==============================
+class IndexCatalogue:
+    """
+    Catalogue chargé en colonnes NumPy.
+    Chaque colonne numérique est triée une fois (argsort) : une plage [min, max]
+    se résout par dichotomie (np.searchsorted) en O(log n), puis les critères
+    suivants sont filtrés sur les seuls candidats restants.
+    """
+
+    def __init__(self, donnees: pd.DataFrame, colonnes: tuple):
+        self.colonnes = colonnes
+        self.references = donnees["reference"].to_numpy(dtype=object)
+        self.fabricants = donnees["fabricant"].to_numpy(dtype=object)
+        self.valeurs = {}
+        self._ordre = {}
+        self._tries = {}
+        for c in colonnes:
+            # Valeur non renseignée → NaN, rangée en fin de tri et jamais retenue
+            valeurs = donnees[c].to_numpy(dtype=float)
+            ordre = np.argsort(valeurs, kind="stable")
+            self.valeurs[c] = valeurs
+            self._ordre[c] = ordre
+            self._tries[c] = valeurs[ordre]
+
+    def __len__(self) -> int:
+        return len(self.references)
+
+    def _candidats(self, colonne: str, minimum, maximum) -> np.ndarray:
+        tries = self._tries[colonne]
+        debut = 0 if minimum is None else np.searchsorted(tries, minimum, side="left")
+        if maximum is None:
+            fin = len(tries) - np.isnan(tries).sum()
+        else:
+            fin = np.searchsorted(tries, maximum, side="right")
+        return self._ordre[colonne][debut:fin]
+
+    def rechercher(self, **criteres) -> np.ndarray:
+        """
+        Indices des composants satisfaisant tous les critères, triés par référence.
+        Critère : colonne=(min, max) — bornes incluses, None = non bornée — ou colonne=valeur.
+        Ex: rechercher(puissance_crete_wc=(400, 550), vmp_v=(38, 42))
+        """
+        bornes = {}
+        for colonne, critere in criteres.items():
+            if colonne not in self.valeurs:
+                raise ValueError(f"Critère inconnu : {colonne}")
+            minimum, maximum = critere if isinstance(critere, (tuple, list)) else (critere, critere)
+            bornes[colonne] = (minimum, maximum)
+
+        if not bornes:
+            return np.arange(len(self))
+
+        # Le critère le plus sélectif fixe les candidats, les autres filtrent
+        plages = {c: self._candidats(c, *b) for c, b in bornes.items()}
+        pivot = min(plages, key=lambda c: len(plages[c]))
+        indices = plages.pop(pivot)
+        for colonne in plages:
+            minimum, maximum = bornes[colonne]
+            valeurs = self.valeurs[colonne][indices]
+            garde = ~np.isnan(valeurs)
+            if minimum is not None:
+                garde &= valeurs >= minimum
+            if maximum is not None:
+                garde &= valeurs <= maximum
+            indices = indices[garde]
+        return np.sort(indices)
+
+    def trouver(self, reference: str) -> dict | None:
+        """Fiche d'une référence exacte (références triées : recherche dichotomique)."""
+        i = int(np.searchsorted(self.references, reference))
+        if i < len(self.references) and self.references[i] == reference:
+            return self.ligne(i)
+        return None
+
+    def ligne(self, indice: int) -> dict:
+        """Fiche technique d'un composant, au format des tables du projet."""
+        fiche = {"reference": self.references[indice], "fabricant": self.fabricants[indice]}
+        for c in self.colonnes:
+            valeur = self.valeurs[c][indice]
+            fiche[c] = None if np.isnan(valeur) else float(valeur)
+        return fiche
+
+    def lignes(self, indices) -> list:
+        return [self.ligne(int(i)) for i in indices]
+
+
+@lru_cache(maxsize=None)
+def charger_index(type_composant: str) -> IndexCatalogue:
+    """Index du catalogue, construit une fois par processus (invalidé à l'import)."""
+    _verifier_type(type_composant)
+    initialiser_catalogue()
+    colonnes = COLONNES_CATALOGUE[type_composant]
+    with get_catalogue_db() as conn:
+        donnees = pd.read_sql_query(
+            f"SELECT reference, fabricant, {', '.join(colonnes)} FROM catalogue_{type_composant} ORDER BY reference",
+            conn,
+        )
+    logger.debug("Index catalogue %s : %d référence(s)", type_composant, len(donnees))
+    return IndexCatalogue(donnees, colonnes)
+
+
+def vider_cache_catalogue() -> None:
+    charger_index.cache_clear()
+
+
+def rechercher_composants(type_composant: str, **criteres) -> list:
+    """Recherche dans le catalogue et retourne les fiches techniques correspondantes."""
+    index = charger_index(type_composant)
+    return index.lignes(index.rechercher(**criteres))
+
+
+# ==============================
+# CONVERSION VERS LES ENTRÉES DU DIMENSIONNEMENT
+# ==============================
+def module_depuis_catalogue(fiche: dict) -> dict:
+    """Fiche module → dict `module` de calculer_dimensionnement_complet / sauvegarder_module_pv."""
+    return {c: fiche.get(c) for c in COLONNES_CATALOGUE["modules"]}
+
+
+def batterie_depuis_catalogue(fiche: dict) -> dict:
+    """Fiche batterie → dict `batterie_unitaire`."""
+    return {"tension_v": fiche["tension_v"], "capacite_ah": fiche["capacite_ah"]}
+
+
+def onduleur_depuis_catalogue(fiche: dict) -> tuple[dict, list]:
+    """
+    Fiche onduleur → (onduleur, strings) du dimensionnement.
+    Les caractéristiques MPPT de la fiche sont reportées sur chaque entrée PV
+    (2 entrées au plus, comme le formulaire).
+    """
+    nb_strings = min(int(fiche.get("nb_mppt") or 1), 2)
+    onduleur = {"tension_demarrage_batterie_v": fiche["tension_batterie_v"], "nb_strings": nb_strings}
+    strings = [
+        {
+            "numero_string": i,
+            "voc_max_v": fiche.get("voc_max_v"),
+            "vmppt_min_v": fiche.get("vmppt_min_v"),
+            "vmppt_max_v": fiche.get("vmppt_max_v"),
+            "imax_a": fiche.get("imax_a"),
+        }
+        for i in range(1, nb_strings + 1)
+    ]
+    return onduleur, strings
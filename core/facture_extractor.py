@@ -1,12 +1,24 @@
 import os
+import re
 import json
 import base64
+import calendar
 import logging
-import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
 from pathlib import Path
+from groq import APIError, BadRequestError
 from langchain_groq import ChatGroq
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import AIMessage, HumanMessage
+from pydantic import BaseModel, ConfigDict, ValidationError, field_validator, model_validator
 import fitz
+import numpy as np
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from core.llm import client_groq_partage
+from core.telemetrie_llm import config_llm
+from config import TARIF_KWH_DEFAULT_FCFA
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +34,34 @@ MONTANT_MIN_FCFA = 1000
 MONTANT_MAX_FCFA = 2_000_000
 MODEL_VISION = "meta-llama/llama-4-scout-17b-16e-instruct"
 MODEL_TEXTE = "llama-3.3-70b-versatile"
+MODEL_RAPIDE = "llama-3.1-8b-instant"
+# Routage : du modèle le moins cher au plus capable, escalade seulement si le niveau échoue
+NIVEAUX_TEXTE = (MODEL_RAPIDE, MODEL_TEXTE)
+NIVEAUX_IMAGE = (MODEL_VISION,)
+# Plausibilité : montant / (kWh × tarif de référence) et durée vs période facturée
+RATIO_MONTANT_MIN = 0.3
+RATIO_MONTANT_MAX = 3.0
+TOLERANCE_DUREE_JOURS = 5   # par mois facturé
+# Extraction groupée : plusieurs PDF texte par requête
+NB_MAX_FACTURES_LOT = 12
+CARACTERES_MAX_LOT = 60_000
+# Découpage des PDF multi-factures et extraction parallèle
+NB_THREADS_EXTRACTION = 4
+NB_MAX_PAGES_IMAGE = 3      # pages scannées envoyées au modèle vision par facture
+DPI_SCAN = 200
+TAILLE_VIGNETTE = (48, 64)  # largeur, hauteur (px) pour comparer les mises en page
+SEUIL_SIMILARITE_PAGE = 0.9
+# Ancres d'en-tête de facture, par nature : une page de détail ou un talon de paiement n'en porte qu'une
+ANCRES_FACTURE = {
+    "numero": re.compile(r"facture\s*(n[°o]|num[ée]ro)", re.IGNORECASE),
+    "periode": re.compile(r"p[ée]riode\s+de\s+consommation", re.IGNORECASE),
+    "date": re.compile(r"date\s+de\s+facturation", re.IGNORECASE),
+    "montant": re.compile(r"montant\s+(total\s+)?(ttc|[àa]\s+payer)", re.IGNORECASE),
+}
+NUMERO_FACTURE = re.compile(r"factur\w*\s*(?:n[°o]\.?|num[ée]ro)\s*:?\s*([A-Z0-9][A-Z0-9/\-]{3,})", re.IGNORECASE)
+MOIS = {"janvier": 1, "fevrier": 2, "février": 2, "mars": 3, "avril": 4, "mai": 5, "juin": 6, "juillet": 7,
+        "aout": 8, "août": 8, "septembre": 9, "octobre": 10, "novembre": 11, "decembre": 12, "décembre": 12}
+PERIODE_TEXTE = re.compile(r"\b(" + "|".join(MOIS) + r")\s+(\d{4})\b", re.IGNORECASE)
 
 PROMPT_EXTRACTION = """Tu es un expert en lecture de factures d'électricité.
 
@@ -50,6 +90,56 @@ Règles importantes :
 - Une consommation mensuelle normale est entre 50 et 5000 kWh
 - Un montant de facture normal est entre 5000 et 500000 FCFA"""
 
+PROMPT_LOT = """
+
+Tu reçois {nb} factures distinctes, chacune entre « ===== FACTURE n ===== » et « ===== FIN FACTURE n ===== ».
+Traite chaque facture indépendamment, sans mélanger leurs informations.
+Réponds avec un objet JSON {{"factures": [...]}} contenant exactement {nb} objets, dans l'ordre,
+chacun au format ci-dessus avec en plus la clé "index" (numéro n de la facture)."""
+
+PROMPT_CORRECTION = """Ta réponse précédente n'est pas conforme au format attendu : {erreur}
+
+Renvoie UNIQUEMENT l'objet JSON corrigé, avec exactement les clés demandées."""
+
+
+# ==============================
+# SCHÉMA
+# ==============================
+class FactureExtraite(BaseModel):
+    """Champs attendus du LLM ; null (None) si l'information n'est pas visible."""
+    model_config = ConfigDict(extra="ignore", str_strip_whitespace=True)
+
+    periode: str | None = None
+    duree_jours: int | None = None
+    consommation_kwh: float | None = None
+    puissance_souscrite_kva: float | None = None
+    montant_ttc: float | None = None
+    fournisseur: str | None = None
+    usage: str | None = None
+
+    @field_validator("duree_jours", "consommation_kwh", "puissance_souscrite_kva", "montant_ttc", mode="before")
+    @classmethod
+    def _nombre(cls, valeur, info):
+        valeur = _convertir_nombre(valeur)
+        if info.field_name == "duree_jours" and isinstance(valeur, float):
+            return round(valeur)
+        return valeur
+
+
+class LotFactures(BaseModel):
+    """Réponse d'une extraction groupée ; chaque élément est validé séparément (FactureExtraite)."""
+    factures: list[dict]
+
+    @model_validator(mode="before")
+    @classmethod
+    def _tableau_nu(cls, valeur):
+        # Tableau renvoyé sans l'objet englobant, ou réduit à son seul élément par la réparation
+        if isinstance(valeur, list):
+            return {"factures": valeur}
+        if isinstance(valeur, dict) and "factures" not in valeur:
+            return {"factures": [valeur]}
+        return valeur
+
 
 # ==============================
 # UTILITAIRES
@@ -77,92 +167,234 @@ def _image_en_base64(chemin: Path) -> str:
         return base64.b64encode(f.read()).decode("utf-8")
 
 
-def _nettoyer_json(texte: str) -> str:
-    """Nettoie la réponse LLM pour extraire le JSON."""
-    if "```json" in texte:
-        texte = texte.split("```json")[1].split("```")[0]
-    elif "```" in texte:
-        texte = texte.split("```")[1].split("```")[0]
-    return texte.strip()
+def _convertir_nombre(valeur):
+    """
+    Nombre écrit en texte → float (« 166.707 FCFA » → 166707, « 1,5 kVA » → 1.5).
+    Valeur rendue telle quelle si la conversion échoue : le schéma la rejettera.
+    """
+    if not isinstance(valeur, str):
+        return valeur
+    if valeur.strip().lower() in {"", "null", "none", "n/a", "-"}:
+        return None
+    texte = re.sub(r"[^\d.,\-]", "", valeur)
+    if re.fullmatch(r"-?[1-9]\d{0,2}([.,])\d{3}(\1\d{3})*", texte):
+        texte = re.sub(r"[.,]", "", texte)  # séparateurs de milliers (« 0,500 » reste décimal)
+    elif "," in texte and "." in texte:
+        decimal = "," if texte.rfind(",") > texte.rfind(".") else "."
+        texte = texte.replace("." if decimal == "," else ",", "").replace(",", ".")
+    else:
+        texte = texte.replace(",", ".")
+    try:
+        return float(texte)
+    except ValueError:
+        return valeur
+
+
+def _reparer_json(texte: str) -> dict:
+    """
+    Réparation locale, sans appel LLM : balises de code, texte autour de l'objet (ou du tableau),
+    accolade finale manquante, virgules finales, guillemets typographiques, littéraux Python.
+    """
+    texte = texte.strip()
+    bloc = re.search(r"```(?:json)?\s*(.*?)(?:```|$)", texte, re.DOTALL)
+    if bloc:
+        texte = bloc.group(1).strip()
+    ouvrante = "[" if -1 < texte.find("[") < texte.find("{") or "{" not in texte else "{"
+    fermante = "]" if ouvrante == "[" else "}"
+    debut, fin = texte.find(ouvrante), texte.rfind(fermante)
+    if debut != -1:
+        texte = texte[debut:fin + 1] if fin > debut else texte[debut:] + fermante
+
+    try:
+        donnees = json.loads(texte)
+    except json.JSONDecodeError:
+        texte = re.sub(r",\s*([}\]])", r"\1", texte)
+        texte = texte.replace("\u201c", '"').replace("\u201d", '"')
+        texte = re.sub(r"(:\s*)(None|True|False)\b",
+                       lambda m: m.group(1) + {"None": "null", "True": "true", "False": "false"}[m.group(2)], texte)
+        if '"' not in texte:
+            texte = texte.replace("'", '"')
+        donnees = json.loads(texte)
+
+    if isinstance(donnees, list) and len(donnees) == 1:
+        donnees = donnees[0]
+    return donnees
+
+
+def _analyser_reponse(texte: str, schema: type[BaseModel] = FactureExtraite) -> dict:
+    """Réponse brute du LLM → champs validés par le schéma (JSONDecodeError / ValidationError sinon)."""
+    return schema.model_validate(_reparer_json(texte)).model_dump()
+
+
+def _generation_rejetee(erreur: BadRequestError) -> str | None:
+    """Texte généré par le modèle mais refusé par le mode JSON de Groq (code json_validate_failed)."""
+    corps = erreur.body if isinstance(erreur.body, dict) else {}
+    detail = corps.get("error", corps)
+    if isinstance(detail, dict) and detail.get("code") == "json_validate_failed":
+        return detail.get("failed_generation")
+    return None
+
+
+def _resumer_erreur(erreur: Exception) -> str:
+    """Message court et ciblé pour la relance (champs fautifs plutôt que trace complète)."""
+    if isinstance(erreur, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(p) for p in e['loc']) or 'réponse'} : {e['msg']}" for e in erreur.errors()[:5]
+        )
+    return f"JSON invalide ({erreur})"
 
 
 def _creer_llm(model: str) -> ChatGroq:
     """Crée une instance LLM avec la clé API."""
-    api_key = os.getenv("GROQ_API_KEY")
-    if not api_key:
+    if not os.getenv("GROQ_API_KEY"):
         raise RuntimeError("GROQ_API_KEY non définie dans les variables d'environnement")
-    return ChatGroq(model=model, api_key=api_key, temperature=0)
+    return client_groq_partage(model, temperature=0)
 
 
 # ==============================
 # EXTRACTION
 # ==============================
-def _extraire_depuis_image(chemin: Path) -> dict | None:
-    """Extrait les données d'une facture image."""
-    extension = chemin.suffix.lower().lstrip(".")
-    media_type = "image/png" if extension == "png" else "image/jpeg"
+def _interroger(model: str, message: HumanMessage, schema: type[BaseModel] = FactureExtraite) -> dict:
+    """
+    Appel en mode JSON puis validation par le schéma.
+    Une sortie invalide est d'abord réparée localement ; si elle reste invalide,
+    une seule relance ciblée (erreur précise, même conversation) est tentée.
+    """
+    llm = _creer_llm(model).bind(response_format={"type": "json_object"})
+    reponse = _appeler_mode_json(llm, [message])
+    try:
+        return _analyser_reponse(reponse.content, schema)
+    except (json.JSONDecodeError, ValidationError) as e:
+        erreur = _resumer_erreur(e)
+        logger.warning("Réponse d'extraction invalide (%s) — relance ciblée", erreur)
 
-    image_b64 = _image_en_base64(chemin)
-    llm = _creer_llm(MODEL_VISION)
+    correction = HumanMessage(content=PROMPT_CORRECTION.format(erreur=erreur))
+    reponse = _appeler_mode_json(llm, [message, reponse, correction])
+    return _analyser_reponse(reponse.content, schema)
 
-    message = HumanMessage(content=[
-        {"type": "text", "text": PROMPT_EXTRACTION},
-        {"type": "image_url", "image_url": {"url": f"data:{media_type};base64,{image_b64}"}}
-    ])
 
-    reponse = llm.invoke([message])
-    return json.loads(_nettoyer_json(reponse.content.strip()))
+def _appeler_mode_json(llm, messages: list) -> AIMessage:
+    """Appel LLM ; une génération refusée par le mode JSON est récupérée pour la réparation locale."""
+    try:
+        return llm.invoke(messages, config=config_llm("extraction"))
+    except BadRequestError as e:
+        texte = _generation_rejetee(e)
+        if texte is None:
+            raise
+        return AIMessage(content=texte)
 
 
-def _extraire_depuis_pdf(chemin: Path) -> dict | None:
-    """Extrait les données d'une facture PDF."""
-    doc = fitz.open(str(chemin))
-    texte = "".join(page.get_text() for page in doc)
-    doc.close()
+# ==============================
+# ROUTAGE PAR NIVEAUX
+# ==============================
+_verrou_routage = threading.Lock()
+_compteurs_routage: dict = {}
 
-    if not texte.strip():
-        # PDF scanné → conversion en image temporaire (une seule fois, pas de récursion)
-        logger.info("PDF sans texte détecté — conversion en image")
-        doc = fitz.open(str(chemin))
-        page = doc[0]
-        pix = page.get_pixmap(dpi=200)
-        doc.close()
 
-        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp:
-            chemin_temp = Path(tmp.name)
+def _compter_niveau(modele: str, accepte: bool) -> None:
+    with _verrou_routage:
+        compteur = _compteurs_routage.setdefault(modele, {"tentatives": 0, "acceptees": 0})
+        compteur["tentatives"] += 1
+        compteur["acceptees"] += int(accepte)
 
-        try:
-            pix.save(str(chemin_temp))
-            return _extraire_depuis_image(chemin_temp)
-        finally:
-            chemin_temp.unlink(missing_ok=True)  # nettoyage garanti
 
-    llm = _creer_llm(MODEL_TEXTE)
-    message = HumanMessage(content=f"{PROMPT_EXTRACTION}\n\nContenu de la facture :\n{texte}")
-    reponse = llm.invoke([message])
-    return json.loads(_nettoyer_json(reponse.content.strip()))
+def statistiques_routage() -> dict:
+    """Taux d'acceptation par niveau : {modele: {tentatives, acceptees, taux}}."""
+    with _verrou_routage:
+        return {
+            modele: {**c, "taux": round(c["acceptees"] / c["tentatives"], 3)}
+            for modele, c in _compteurs_routage.items()
+        }
 
 
-def extraire_donnees_facture(chemin_fichier: str, nom_fichier: str) -> tuple[dict | None, str | None]:
-    """
-    Point d'entrée principal — envoie la facture au LLM
-    et récupère les données structurées.
+def reinitialiser_statistiques_routage() -> None:
+    with _verrou_routage:
+        _compteurs_routage.clear()
 
-    Retourne : (données, None) en cas de succès
-               (None, message_erreur) en cas d'échec
+
+def _router(niveaux: tuple, message: HumanMessage, nom_fichier: str) -> dict | None:
+    """
+    Essaie les modèles dans l'ordre ; un niveau est accepté si ses données passent
+    valider_et_enrichir et les contrôles de plausibilité. Le dernier niveau fait foi.
+    Retourne la facture validée (None si le dernier niveau renvoie des données invalides).
     """
+    for rang, modele in enumerate(niveaux, start=1):
+        dernier = rang == len(niveaux)
+        try:
+            donnees = _interroger(modele, message)
+        except (json.JSONDecodeError, ValidationError, APIError) as e:
+            if dernier:
+                _compter_niveau(modele, accepte=False)
+                raise
+            motif = f"{type(e).__name__} : {str(e)[:80]}"
+        else:
+            resultat = valider_et_enrichir(donnees, nom_fichier)
+            motif = "données invalides" if resultat is None else controler_plausibilite(resultat)
+            if motif is None or dernier:
+                _compter_niveau(modele, accepte=resultat is not None)
+                _journaliser_routage()
+                return resultat
+
+        _compter_niveau(modele, accepte=False)
+        logger.info("Niveau %d (%s) rejeté pour %s : %s — escalade", rang, modele, nom_fichier, motif)
+
+
+def _journaliser_routage() -> None:
+    logger.info("Routage extraction : %s", " | ".join(
+        f"{modele} {s['acceptees']}/{s['tentatives']} ({s['taux']:.0%})"
+        for modele, s in statistiques_routage().items()
+    ))
+
+
+def _message_images(images: list[tuple[str, str]]) -> HumanMessage:
+    """Prompt d'extraction suivi des images [(media_type, base64), ...]."""
+    return HumanMessage(content=[{"type": "text", "text": PROMPT_EXTRACTION}] + [
+        {"type": "image_url", "image_url": {"url": f"data:{media_type};base64,{image_b64}"}}
+        for media_type, image_b64 in images
+    ])
+
+
+def _extraire_depuis_image(chemin: Path, nom_fichier: str) -> dict | None:
+    """Extrait les données d'une facture image."""
+    extension = chemin.suffix.lower().lstrip(".")
+    media_type = "image/png" if extension == "png" else "image/jpeg"
+    return _router(NIVEAUX_IMAGE, _message_images([(media_type, _image_en_base64(chemin))]), nom_fichier)
+
+
+def _pages_en_images(chemin: Path, pages: list[int]) -> list[tuple[str, str]]:
+    """Rendu PNG en mémoire des premières pages d'un segment scanné."""
+    doc = fitz.open(str(chemin))
     try:
-        path = _valider_chemin_fichier(chemin_fichier)
-        extension = path.suffix.lower().lstrip(".")
+        return [
+            ("image/png", base64.b64encode(doc[i].get_pixmap(dpi=DPI_SCAN).tobytes("png")).decode("utf-8"))
+            for i in pages[:NB_MAX_PAGES_IMAGE]
+        ]
+    finally:
+        doc.close()
 
-        if extension in EXTENSIONS_IMAGES:
-            donnees = _extraire_depuis_image(path)
-        elif extension == "pdf":
-            donnees = _extraire_depuis_pdf(path)
-        else:
-            return None, f"Format non supporté : {extension}"
 
-        resultat = valider_et_enrichir(donnees, nom_fichier)
+def _extraire_segment(chemin: Path, segment: dict, nom_fichier: str, niveaux: tuple = NIVEAUX_TEXTE) -> dict | None:
+    """Extrait une facture à partir de ses pages : texte si disponible, sinon images des pages scannées."""
+    if segment["texte"]:
+        message = HumanMessage(content=f"{PROMPT_EXTRACTION}\n\nContenu de la facture :\n{segment['texte']}")
+        return _router(niveaux, message, nom_fichier)
+    logger.info("PDF sans texte détecté — conversion en image (%d page(s))",
+                min(len(segment["pages"]), NB_MAX_PAGES_IMAGE))
+    return _router(NIVEAUX_IMAGE, _message_images(_pages_en_images(chemin, segment["pages"])), nom_fichier)
+
+
+def _extraire_depuis_pdf(chemin: Path, nom_fichier: str, niveaux: tuple = NIVEAUX_TEXTE) -> dict | None:
+    """Extrait les données d'une facture PDF (document entier considéré comme une seule facture)."""
+    doc = fitz.open(str(chemin))
+    segment = {"pages": list(range(len(doc))), "texte": "".join(page.get_text() for page in doc).strip()}
+    doc.close()
+    return _extraire_segment(chemin, segment, nom_fichier, niveaux)
+
+
+def _extraire_avec_erreurs(nom_fichier: str, extraire) -> tuple[dict | None, str | None]:
+    """Exécute extraire() (facture déjà validée par _router) ; toute erreur devient un message lisible."""
+    try:
+        resultat = extraire()
         if resultat is None:
             return None, "Données extraites invalides ou hors plage (consommation, montant, durée)"
         return resultat, None
@@ -170,12 +402,12 @@ def extraire_donnees_facture(chemin_fichier: str, nom_fichier: str) -> tuple[dic
     except FileNotFoundError as e:
         logger.error("Fichier introuvable : %s", e)
         return None, "Fichier introuvable"
+    except (json.JSONDecodeError, ValidationError) as e:
+        logger.error("Réponse LLM non conforme pour %s : %s", nom_fichier, e)
+        return None, "Le modèle IA n'a pas retourné un JSON valide"
     except ValueError as e:
         logger.error("Validation échouée pour %s : %s", nom_fichier, e)
         return None, f"Validation échouée : {e}"
-    except json.JSONDecodeError as e:
-        logger.error("Réponse LLM non JSON pour %s : %s", nom_fichier, e)
-        return None, "Le modèle IA n'a pas retourné un JSON valide"
     except RuntimeError as e:
         logger.error("Clé API manquante : %s", e)
         return None, "Clé API Groq manquante ou invalide"
@@ -187,6 +419,298 @@ def extraire_donnees_facture(chemin_fichier: str, nom_fichier: str) -> tuple[dic
         return None, f"{type(e).__name__} : {str(e)[:120]}"
 
 
+def extraire_donnees_facture(
+    chemin_fichier: str, nom_fichier: str, niveaux_texte: tuple = NIVEAUX_TEXTE
+) -> tuple[dict | None, str | None]:
+    """
+    Point d'entrée principal — envoie la facture au LLM
+    et récupère les données structurées.
+    niveaux_texte : modèles essayés pour un PDF texte (voir _router).
+
+    Retourne : (données, None) en cas de succès
+               (None, message_erreur) en cas d'échec
+    """
+    def extraire():
+        path = _valider_chemin_fichier(chemin_fichier)
+        if path.suffix.lower().lstrip(".") in EXTENSIONS_IMAGES:
+            return _extraire_depuis_image(path, nom_fichier)
+        return _extraire_depuis_pdf(path, nom_fichier, niveaux_texte)
+
+    return _extraire_avec_erreurs(nom_fichier, extraire)
+
+
+# ==============================
+# DÉCOUPAGE DES PDF
+# ==============================
+def _numero_facture(texte: str) -> str | None:
+    correspondance = NUMERO_FACTURE.search(texte)
+    return correspondance.group(1).upper() if correspondance else None
+
+
+def _ancres(texte: str) -> set[str]:
+    return {nature for nature, motif in ANCRES_FACTURE.items() if motif.search(texte)}
+
+
+def _periode_texte(texte: str) -> tuple[int, int] | None:
+    """Première période « Mois Année » de la page → (année, mois)."""
+    correspondance = PERIODE_TEXTE.search(texte)
+    if not correspondance:
+        return None
+    return int(correspondance.group(2)), MOIS[correspondance.group(1).lower()]
+
+
+def _debuts_par_ancres(textes: list[str]) -> list[int]:
+    """
+    Pages de début de facture d'un PDF texte : changement de numéro de facture, ou, sans numéro,
+    page d'en-tête alors que la facture courante en a déjà une. Sans numéro, une page d'en-tête
+    doit changer de période ou, si la période est inconnue, porter au moins deux ancres
+    (un talon « Montant à payer » reste rattaché à sa facture).
+    """
+    debuts = [0]
+    numero_courant = _numero_facture(textes[0])
+    ancres_courantes = _ancres(textes[0])
+    periode_courante = _periode_texte(textes[0])
+    for i, texte in enumerate(textes[1:], start=1):
+        numero = _numero_facture(texte)
+        ancres = _ancres(texte)
+        periode = _periode_texte(texte)
+        if numero:
+            nouvelle = numero_courant is not None and numero != numero_courant
+            numero_courant = numero
+        elif numero_courant is None and ancres_courantes and ancres:
+            nouvelle = periode != periode_courante if (periode and periode_courante) else len(ancres) >= 2
+        else:
+            nouvelle = False
+        if nouvelle:
+            debuts.append(i)
+            ancres_courantes, periode_courante = set(), None
+        ancres_courantes |= ancres
+        periode_courante = periode_courante or periode
+    return debuts
+
+
+def _vignette(page) -> np.ndarray:
+    """Vignette en niveaux de gris, taille fixe : empreinte de mise en page d'une page scannée."""
+    largeur, hauteur = TAILLE_VIGNETTE
+    pix = page.get_pixmap(matrix=fitz.Matrix(largeur / page.rect.width, hauteur / page.rect.height),
+                          colorspace=fitz.csGRAY, alpha=False)
+    pixels = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.stride)[:, :pix.width]
+    return pixels[:hauteur, :largeur].astype(np.float32)
+
+
+def _similarite(a: np.ndarray, b: np.ndarray) -> float:
+    """Corrélation de Pearson entre deux vignettes (1 = même mise en page)."""
+    hauteur, largeur = min(a.shape[0], b.shape[0]), min(a.shape[1], b.shape[1])
+    a, b = a[:hauteur, :largeur].ravel(), b[:hauteur, :largeur].ravel()
+    a, b = a - a.mean(), b - b.mean()
+    norme = float(np.sqrt((a * a).sum() * (b * b).sum()))
+    return float((a * b).sum() / norme) if norme else float(np.array_equal(a, b))
+
+
+def _debuts_par_similarite(doc) -> list[int]:
+    """Pages scannées : une page dont la mise en page ressemble à la première page ouvre une facture."""
+    reference = _vignette(doc[0])
+    return [0] + [
+        i for i in range(1, len(doc))
+        if _similarite(_vignette(doc[i]), reference) >= SEUIL_SIMILARITE_PAGE
+    ]
+
+
+def decouper_pdf(chemin: Path) -> list[dict]:
+    """
+    Découpe un PDF en factures : [{"pages": [indices], "texte": str}, ...]
+    (texte vide pour un document scanné). Ancres textuelles si le PDF a du texte,
+    similarité de mise en page entre pages sinon.
+    """
+    doc = fitz.open(str(chemin))
+    try:
+        textes = [page.get_text() for page in doc]
+        if len(textes) <= 1:
+            debuts = [0] if textes else []
+        elif any(t.strip() for t in textes):
+            debuts = _debuts_par_ancres(textes)
+        else:
+            debuts = _debuts_par_similarite(doc)
+    finally:
+        doc.close()
+
+    bornes = debuts + [len(textes)]
+    return [
+        {"pages": list(range(debut, fin)), "texte": "".join(textes[debut:fin]).strip()}
+        for debut, fin in zip(bornes, bornes[1:])
+    ]
+
+
+def _nom_segment(nom_fichier: str, pages: list[int], nb_segments: int) -> str:
+    if nb_segments == 1:
+        return nom_fichier
+    etendue = f"{pages[0] + 1}" if len(pages) == 1 else f"{pages[0] + 1}-{pages[-1] + 1}"
+    return f"{nom_fichier} (p. {etendue})"
+
+
+def _segments_fichier(chemin_fichier: str, nom_fichier: str) -> list[dict]:
+    """Factures contenues dans un fichier ; pages None = fichier traité d'un bloc (image, fichier invalide)."""
+    try:
+        path = _valider_chemin_fichier(chemin_fichier)
+        decoupage = decouper_pdf(path) if path.suffix.lower() == ".pdf" else []
+    except (OSError, ValueError, RuntimeError) as e:
+        logger.debug("Découpage impossible pour %s : %s", nom_fichier, e)
+        decoupage = []
+
+    if not decoupage:
+        return [{"fichier": nom_fichier, "nom_fichier": nom_fichier, "chemin": chemin_fichier,
+                 "pages": None, "texte": ""}]
+    if len(decoupage) > 1:
+        logger.info("%s : %d factures détectées", nom_fichier, len(decoupage))
+    return [
+        {"fichier": nom_fichier, "nom_fichier": _nom_segment(nom_fichier, s["pages"], len(decoupage)),
+         "chemin": chemin_fichier, **s}
+        for s in decoupage
+    ]
+
+
+def _extraire_segment_isole(segment: dict, niveaux: tuple) -> tuple[dict | None, str | None]:
+    if segment["pages"] is None:
+        return extraire_donnees_facture(segment["chemin"], segment["nom_fichier"], niveaux)
+    return _extraire_avec_erreurs(
+        segment["nom_fichier"],
+        lambda: _extraire_segment(Path(segment["chemin"]), segment, segment["nom_fichier"], niveaux),
+    )
+
+
+def _chronometrer(fonction, *arguments) -> tuple:
+    debut = time.perf_counter()
+    resultat = fonction(*arguments)
+    return resultat, round((time.perf_counter() - debut) * 1000, 1)
+
+
+def _executeur(nb_taches: int) -> ThreadPoolExecutor:
+    """Pool d'extraction ; les threads héritent du contexte Streamlit (session pour la télémétrie)."""
+    contexte = get_script_run_ctx(suppress_warning=True)
+
+    def initialiser():
+        if contexte is not None:
+            add_script_run_ctx(threading.current_thread(), contexte)
+
+    return ThreadPoolExecutor(max_workers=max(1, min(NB_THREADS_EXTRACTION, nb_taches)), initializer=initialiser)
+
+
+# ==============================
+# EXTRACTION GROUPÉE
+# ==============================
+def _decouper_lots(candidats: list) -> list[list]:
+    """Lots consécutifs d'au plus NB_MAX_FACTURES_LOT factures et CARACTERES_MAX_LOT caractères."""
+    lots, courant, taille = [], [], 0
+    for candidat in candidats:
+        longueur = len(candidat[2])
+        if courant and (len(courant) >= NB_MAX_FACTURES_LOT or taille + longueur > CARACTERES_MAX_LOT):
+            lots.append(courant)
+            courant, taille = [], 0
+        courant.append(candidat)
+        taille += longueur
+    if courant:
+        lots.append(courant)
+    return lots
+
+
+def _index_element(element: dict, rang: int, complet: bool) -> int | None:
+    """Numéro de facture d'un élément : clé "index", sinon sa position si le tableau est complet."""
+    try:
+        return int(element["index"])
+    except (KeyError, TypeError, ValueError):
+        return rang if complet else None
+
+
+def _extraire_lot(lot: list) -> dict:
+    """
+    Une requête pour tout le lot [(position, nom_fichier, texte), ...] sur le premier niveau.
+    Retourne {position: facture validée} pour les factures valides et plausibles ;
+    les autres (ou tout le lot si la requête échoue) sont laissées au repli facture par facture.
+    """
+    modele = NIVEAUX_TEXTE[0]
+    blocs = "\n\n".join(
+        f"===== FACTURE {n} =====\n{texte.strip()}\n===== FIN FACTURE {n} ====="
+        for n, (_, _, texte) in enumerate(lot, start=1)
+    )
+    message = HumanMessage(content=PROMPT_EXTRACTION + PROMPT_LOT.format(nb=len(lot)) + "\n\n" + blocs)
+    try:
+        elements = _interroger(modele, message, LotFactures)["factures"]
+    except (json.JSONDecodeError, ValidationError, APIError, RuntimeError) as e:
+        logger.warning("Extraction groupée de %d factures échouée (%s) — repli facture par facture",
+                       len(lot), type(e).__name__)
+        return {}
+
+    par_numero = {}
+    for rang, element in enumerate(elements, start=1):
+        par_numero.setdefault(_index_element(element, rang, len(elements) == len(lot)), element)
+
+    acceptees = {}
+    for n, (position, nom_fichier, _) in enumerate(lot, start=1):
+        try:
+            donnees = FactureExtraite.model_validate(par_numero.get(n, {})).model_dump()
+        except ValidationError as e:
+            logger.info("Facture %s invalide dans le lot : %s", nom_fichier, _resumer_erreur(e))
+            donnees = None
+        resultat = valider_et_enrichir(donnees, nom_fichier)
+        accepte = resultat is not None and controler_plausibilite(resultat) is None
+        _compter_niveau(modele, accepte)
+        if accepte:
+            acceptees[position] = resultat
+    logger.info("Extraction groupée : %d/%d factures acceptées en une requête", len(acceptees), len(lot))
+    _journaliser_routage()
+    return acceptees
+
+
+def extraire_lot_factures(fichiers: list[tuple[str, str]]) -> list[dict]:
+    """
+    Extraction de [(chemin_fichier, nom_fichier), ...] :
+    1. chaque PDF est découpé en factures (plusieurs lignes possibles par fichier) ;
+    2. les factures texte partent à plusieurs par requête (lots exécutés en parallèle) ;
+    3. images, factures scannées et factures rejetées du lot sont extraites une à une,
+       en parallèle (au niveau suivant pour les rejetées).
+
+    Retourne une ligne par facture, dans l'ordre des fichiers puis des pages :
+    {fichier, nom_fichier, pages, donnees, erreur, duree_ms}
+    """
+    segments = [s for chemin, nom in fichiers for s in _segments_fichier(chemin, nom)]
+    candidats = [(position, s["nom_fichier"], s["texte"]) for position, s in enumerate(segments) if s["texte"]]
+    lots = [lot for lot in _decouper_lots(candidats) if len(lot) > 1]
+    soumis = {position for lot in lots for position, _, _ in lot}
+    resultats = {}
+
+    with _executeur(len(segments)) as pool:
+        for lot, (acceptees, duree_ms) in zip(lots, pool.map(lambda l: _chronometrer(_extraire_lot, l), lots)):
+            for position, _, _ in lot:
+                resultats[position] = (acceptees.get(position), None, duree_ms)
+
+        restants = [p for p in range(len(segments)) if resultats.get(p, (None,))[0] is None]
+        isoles = pool.map(
+            lambda p: _chronometrer(
+                _extraire_segment_isole, segments[p], NIVEAUX_TEXTE[1:] if p in soumis else NIVEAUX_TEXTE
+            ),
+            restants,
+        )
+        for position, ((donnees, erreur), duree_ms) in zip(restants, isoles):
+            duree_lot = resultats.get(position, (None, None, 0))[2]
+            resultats[position] = (donnees, erreur, round(duree_lot + duree_ms, 1))
+
+    lignes = []
+    for position, segment in enumerate(segments):
+        donnees, erreur, duree_ms = resultats[position]
+        pages = segment["pages"]
+        lignes.append({
+            "fichier": segment["fichier"],
+            "nom_fichier": segment["nom_fichier"],
+            "pages": (pages[0] + 1, pages[-1] + 1) if pages else None,
+            "donnees": donnees,
+            "erreur": erreur,
+            "duree_ms": duree_ms,
+        })
+        logger.info("Facture %s extraite en %.0f ms%s", segment["nom_fichier"], duree_ms,
+                    "" if donnees else f" — échec : {erreur}")
+    return lignes
+
+
 # ==============================
 # VALIDATION
 # ==============================
@@ -242,4 +766,48 @@ def valider_et_enrichir(donnees: dict, nom_fichier: str) -> dict | None:
         "tarif_moyen": tarif_moyen,
         "fournisseur": str(donnees.get("fournisseur") or ""),
         "usage": str(donnees.get("usage") or "")
-    }
\ No newline at end of file
+    }
+
+
+def _duree_periode(periode: str) -> tuple[int, int] | None:
+    """
+    Durée attendue (jours) et tolérance d'après le libellé de période :
+    « du 01/03/2025 au 31/03/2025 » → dates exactes, « Mars 2025 » / « Janvier-Février 2025 » → mois.
+    None si la période n'est pas interprétable.
+    """
+    dates = re.findall(r"(\d{1,2})[/.-](\d{1,2})[/.-](\d{2,4})", periode)
+    if len(dates) >= 2:
+        try:
+            debut, fin = (
+                date(int(a) + (2000 if len(a) == 2 else 0), int(m), int(j)) for j, m, a in (dates[0], dates[-1])
+            )
+        except ValueError:
+            return None
+        return (fin - debut).days + 1, TOLERANCE_DUREE_JOURS
+
+    mois = [MOIS[m] for m in re.findall(r"[a-zéû]+", periode.lower()) if m in MOIS]
+    if not mois:
+        return None
+    annee = re.search(r"\b(\d{4})\b", periode)
+    annee = int(annee.group(1)) if annee else 2001  # année non bissextile par défaut
+    nb_mois = (mois[-1] - mois[0]) % 12 + 1
+    jours = sum(calendar.monthrange(annee + (mois[0] + i - 1) // 12, (mois[0] + i - 1) % 12 + 1)[1]
+                for i in range(nb_mois))
+    return jours, TOLERANCE_DUREE_JOURS * nb_mois
+
+
+def controler_plausibilite(facture: dict) -> str | None:
+    """
+    Contrôles croisés d'une facture validée : kWh × tarif ≈ montant, durée ≈ période.
+    Retourne le motif d'invraisemblance, ou None si la facture est plausible.
+    """
+    montant = facture["montant_ttc"]
+    if montant > 0:
+        ratio = montant / (facture["consommation_kwh"] * TARIF_KWH_DEFAULT_FCFA)
+        if not (RATIO_MONTANT_MIN <= ratio <= RATIO_MONTANT_MAX):
+            return f"montant incohérent avec la consommation ({facture['tarif_moyen']} FCFA/kWh)"
+
+    attendue = _duree_periode(facture["periode"]) if facture["periode"] else None
+    if attendue and abs(facture["duree_jours"] - attendue[0]) > attendue[1]:
+        return f"durée de {facture['duree_jours']} jours incohérente avec la période « {facture['periode']} »"
+    return None
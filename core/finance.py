@@ -0,0 +1,216 @@
+import logging
+import numpy as np
+from config import (
+    TARIF_KWH_DEFAULT_FCFA,
+    DUREE_PROJECTION_ANS,
+    DEGRADATION_PANNEAUX_ANNUELLE,
+    INFLATION_TARIF_ANNUELLE,
+    INFLATION_COUTS_ANNUELLE,
+    TAUX_ACTUALISATION,
+    TAUX_OM_ANNUEL,
+    CYCLES_VIE_BATTERIE,
+    CYCLES_BATTERIE_PAR_AN,
+    PRIX_BATTERIE_KWH_FCFA,
+)
+
+logger = logging.getLogger(__name__)
+
+# ==============================
+# CONSTANTES
+# ==============================
+TRI_BORNE_MIN = -0.99
+TRI_BORNE_MAX = 10.0
+TRI_ITERATIONS = 60
+
+
+# ==============================
+# INDICATEURS VECTORISÉS
+# ==============================
+def _facteurs_actualisation(taux: np.ndarray, annees: np.ndarray) -> np.ndarray:
+    """(1 + r)^-t pour chaque scénario (lignes) et chaque année (colonnes)."""
+    return (1.0 + taux[:, None]) ** -annees[None, :]
+
+
+def _valeur_actuelle_nette(flux_initial: np.ndarray, flux: np.ndarray, taux: np.ndarray, annees: np.ndarray) -> np.ndarray:
+    return flux_initial + (flux * _facteurs_actualisation(taux, annees)).sum(axis=1)
+
+
+def _taux_rentabilite_interne(flux_initial: np.ndarray, flux: np.ndarray, annees: np.ndarray) -> np.ndarray:
+    """
+    TRI par dichotomie, vectorisée sur tous les scénarios.
+    NaN lorsque la VAN ne change pas de signe sur [TRI_BORNE_MIN, TRI_BORNE_MAX].
+    """
+    bas = np.full(flux.shape[0], TRI_BORNE_MIN)
+    haut = np.full(flux.shape[0], TRI_BORNE_MAX)
+    van_bas = _valeur_actuelle_nette(flux_initial, flux, bas, annees)
+    van_haut = _valeur_actuelle_nette(flux_initial, flux, haut, annees)
+    defini = np.sign(van_bas) != np.sign(van_haut)
+
+    for _ in range(TRI_ITERATIONS):
+        milieu = (bas + haut) / 2
+        van_milieu = _valeur_actuelle_nette(flux_initial, flux, milieu, annees)
+        meme_signe = np.sign(van_milieu) == np.sign(van_bas)
+        bas = np.where(meme_signe, milieu, bas)
+        van_bas = np.where(meme_signe, van_milieu, van_bas)
+        haut = np.where(meme_signe, haut, milieu)
+
+    return np.where(defini, (bas + haut) / 2, np.nan)
+
+
+def _temps_retour(capex: np.ndarray, cumul: np.ndarray, flux: np.ndarray) -> np.ndarray:
+    """Année (interpolée) où le cumul devient positif ; NaN si jamais atteint."""
+    atteint = cumul >= 0
+    indice = atteint.argmax(axis=1)
+    lignes = np.arange(cumul.shape[0])
+    cumul_avant = np.where(indice > 0, cumul[lignes, indice - 1], -capex)
+    flux_annee = flux[lignes, indice]
+    fraction = np.divide(-cumul_avant, flux_annee, out=np.zeros_like(flux_annee), where=flux_annee > 0)
+    return np.where(atteint.any(axis=1), indice + np.clip(fraction, 0, 1), np.nan)
+
+
+# ==============================
+# PROJECTION DE PORTEFEUILLE
+# ==============================
+def projeter_portefeuille(
+    prix_total_installation,
+    production_annuelle_kwh,
+    tarif_kwh=TARIF_KWH_DEFAULT_FCFA,
+    duree_ans: int = DUREE_PROJECTION_ANS,
+    degradation_annuelle=DEGRADATION_PANNEAUX_ANNUELLE,
+    inflation_tarif=INFLATION_TARIF_ANNUELLE,
+    inflation_couts=INFLATION_COUTS_ANNUELLE,
+    taux_actualisation=TAUX_ACTUALISATION,
+    taux_om=TAUX_OM_ANNUEL,
+    cout_remplacement_batterie=0.0,
+    cycles_vie_batterie=CYCLES_VIE_BATTERIE,
+    cycles_par_an=CYCLES_BATTERIE_PAR_AN,
+) -> dict:
+    """
+    Projection financière long terme, vectorisée sur les années et les scénarios.
+
+    Chaque paramètre accepte un scalaire ou un tableau d'une valeur par scénario
+    (site, hypothèse...) : des milliers de sites sont projetés en un seul appel.
+
+    Retourne des tableaux NumPy :
+    - par scénario : van, tri, lcoe, temps_retour_ans, nb_remplacements_batterie
+    - par scénario × année : production_kwh, tarif_kwh, economies, couts_om,
+      remplacements_batterie, flux_net, cumul, cumul_actualise
+    """
+    if duree_ans < 1:
+        raise ValueError(f"Durée de projection invalide : {duree_ans}")
+
+    params = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=float)) for v in (
+        prix_total_installation, production_annuelle_kwh, tarif_kwh, degradation_annuelle,
+        inflation_tarif, inflation_couts, taux_actualisation, taux_om,
+        cout_remplacement_batterie, cycles_vie_batterie, cycles_par_an,
+    )))
+    (capex, production, tarif, degradation, infl_tarif, infl_couts, taux, om,
+     cout_batterie, cycles_vie, cycles_an) = params
+
+    if (capex < 0).any():
+        raise ValueError("Prix installation invalide")
+    if (production <= 0).any():
+        raise ValueError("Production annuelle invalide")
+    if (tarif <= 0).any():
+        raise ValueError("Tarif kWh invalide")
+    if ((degradation < 0) | (degradation >= 1)).any():
+        raise ValueError("Dégradation annuelle invalide")
+    if (taux <= -1).any():
+        raise ValueError("Taux d'actualisation invalide")
+    if ((cycles_vie <= 0) | (cycles_an <= 0)).any():
+        raise ValueError("Durée de vie batterie invalide")
+
+    annees = np.arange(1, duree_ans + 1, dtype=float)
+    ecoulees = annees - 1  # la première année est aux conditions initiales
+
+    production_kwh = production[:, None] * (1 - degradation[:, None]) ** ecoulees
+    tarif_annuel = tarif[:, None] * (1 + infl_tarif[:, None]) ** ecoulees
+    indexation_couts = (1 + infl_couts[:, None]) ** ecoulees
+    economies = production_kwh * tarif_annuel
+    couts_om = om[:, None] * capex[:, None] * indexation_couts
+
+    # Remplacement en fin de vie (en cycles), sauf la dernière année de la projection
+    duree_vie_ans = cycles_vie / cycles_an
+    nb_fins_de_vie = np.floor(annees[None, :] / duree_vie_ans[:, None]) - np.floor(ecoulees[None, :] / duree_vie_ans[:, None])
+    nb_fins_de_vie[:, -1] = 0
+    remplacements = nb_fins_de_vie * cout_batterie[:, None] * indexation_couts
+
+    flux_net = economies - couts_om - remplacements
+    cumul = np.cumsum(flux_net, axis=1) - capex[:, None]
+    actualisation = _facteurs_actualisation(taux, annees)
+    cumul_actualise = np.cumsum(flux_net * actualisation, axis=1) - capex[:, None]
+
+    couts_actualises = capex + ((couts_om + remplacements) * actualisation).sum(axis=1)
+    production_actualisee = (production_kwh * actualisation).sum(axis=1)
+
+    return {
+        "annees": annees.astype(int),
+        "van": cumul_actualise[:, -1],
+        "tri": _taux_rentabilite_interne(-capex, flux_net, annees),
+        "lcoe": couts_actualises / production_actualisee,
+        "temps_retour_ans": _temps_retour(capex, cumul, flux_net),
+        "nb_remplacements_batterie": nb_fins_de_vie.sum(axis=1).astype(int),
+        "production_kwh": production_kwh,
+        "tarif_kwh": tarif_annuel,
+        "economies": economies,
+        "couts_om": couts_om,
+        "remplacements_batterie": remplacements,
+        "flux_net": flux_net,
+        "cumul": cumul,
+        "cumul_actualise": cumul_actualise,
+    }
+
+
+# ==============================
+# PROJECTION D'UN SITE
+# ==============================
+def _arrondi(valeur: float, decimales: int = 2) -> float | None:
+    return None if np.isnan(valeur) else round(float(valeur), decimales)
+
+
+def estimer_cout_remplacement_batterie(capacite_kwh: float, prix_kwh: float = PRIX_BATTERIE_KWH_FCFA) -> float:
+    """Coût de remplacement du parc batterie (FCFA, valeur de l'année 0)."""
+    if capacite_kwh < 0:
+        raise ValueError("Capacité batterie invalide")
+    return round(capacite_kwh * prix_kwh, 2)
+
+
+def projeter_rentabilite_long_terme(
+    prix_total_installation: float,
+    production_annuelle_kwh: float,
+    tarif_kwh: float = TARIF_KWH_DEFAULT_FCFA,
+    **hypotheses
+) -> dict:
+    """
+    Étude de rentabilité long terme d'un site (par défaut 25 ans).
+    Même moteur que projeter_portefeuille, résultat sous forme de dict sérialisable.
+    Les hypothèses (dégradation, inflation, actualisation, O&M, batterie)
+    reprennent les valeurs par défaut de config.py.
+    """
+    p = projeter_portefeuille(prix_total_installation, production_annuelle_kwh, tarif_kwh, **hypotheses)
+
+    projection = [
+        {
+            "annee": int(annee),
+            "production_kwh": round(float(p["production_kwh"][0, i]), 2),
+            "tarif_kwh": round(float(p["tarif_kwh"][0, i]), 2),
+            "economies": round(float(p["economies"][0, i]), 2),
+            "couts_om": round(float(p["couts_om"][0, i]), 2),
+            "remplacement_batterie": round(float(p["remplacements_batterie"][0, i]), 2),
+            "flux_net": round(float(p["flux_net"][0, i]), 2),
+            "economies_cumulees": round(float(p["cumul"][0, i]), 2),
+            "economies_cumulees_actualisees": round(float(p["cumul_actualise"][0, i]), 2),
+        }
+        for i, annee in enumerate(p["annees"])
+    ]
+
+    return {
+        "cout_total_installation": round(float(prix_total_installation), 2),
+        "duree_ans": len(projection),
+        "van": _arrondi(p["van"][0]),
+        "tri": _arrondi(p["tri"][0], 4),
+        "lcoe_fcfa_kwh": _arrondi(p["lcoe"][0]),
+        "temps_retour_ans": _arrondi(p["temps_retour_ans"][0], 1),
+        "nb_remplacements_batterie": int(p["nb_remplacements_batterie"][0]),
+        "projection": projection,
+    }
@@ -0,0 +1,53 @@
+import os
+from functools import lru_cache
+import httpx
+from langchain_groq import ChatGroq
+from core.telemetrie_llm import crochets_http
+
+
+# ==============================
+# CLIENTS LLM
+# ==============================
+def url_api_groq() -> str | None:
+    """
+    URL de base de l'API (GROQ_BASE_URL) : proxy, passerelle interne ou faux serveur local
+    (python -m benchmarks.faux_groq). None = API Groq publique.
+    """
+    return os.getenv("GROQ_BASE_URL") or None
+
+
+def creer_client_http(**options) -> httpx.Client:
+    """Client HTTP des appels LLM, avec comptage des tentatives échouées (télémétrie)."""
+    return httpx.Client(event_hooks=crochets_http(), **options)
+
+
+@lru_cache(maxsize=1)
+def _client_http_partage() -> httpx.Client:
+    return creer_client_http(timeout=httpx.Timeout(60.0, connect=10.0))
+
+
+def creer_chat_groq(modele: str, temperature: float = 0, **options) -> ChatGroq:
+    """ChatGroq configuré depuis l'environnement (clé API, URL de base), instrumenté."""
+    options.setdefault("http_client", _client_http_partage())
+    url = url_api_groq()
+    if url:
+        options["base_url"] = url
+    return ChatGroq(
+        model=modele,
+        api_key=os.getenv("GROQ_API_KEY"),
+        temperature=temperature,
+        **options
+    )
+
+
+@lru_cache(maxsize=16)
+def _client_partage(modele: str, temperature: float, url: str | None, cle_api: str | None) -> ChatGroq:
+    return creer_chat_groq(modele, temperature)
+
+
+def client_groq_partage(modele: str, temperature: float = 0) -> ChatGroq:
+    """
+    ChatGroq réutilisé entre appels et threads (même modèle, même environnement).
+    La construction d'un client charge les certificats TLS (~70 ms) : à éviter par facture.
+    """
+    return _client_partage(modele, temperature, url_api_groq(), os.getenv("GROQ_API_KEY"))
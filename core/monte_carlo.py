@@ -0,0 +1,207 @@
+import math
+import logging
+import numpy as np
+from config import (
+    PERFORMANCE_RATIO_DEFAULT,
+    PUISSANCE_PANNEAU_DEFAULT_WC,
+    TENSION_BATTERIE_DEFAULT_V,
+    PROFONDEUR_DECHARGE_DEFAULT,
+    AUTONOMIE_DEFAULT_JOURS,
+    HSP_MIN,
+    HSP_MAX,
+    NB_SCENARIOS_MONTE_CARLO,
+    GRAINE_MONTE_CARLO,
+    CV_HSP_JOURNALIER,
+    CV_CHARGE_JOURNALIERE,
+    DERATING_PV_MIN,
+    DERATING_BATTERIE_MIN,
+    DUREE_SEQUENCE_JOURS,
+)
+from core.sizing import calculer_puissance_crete, calculer_nombre_panneaux, calculer_batterie
+
+logger = logging.getLogger(__name__)
+
+
+# ==============================
+# TIRAGES ALÉATOIRES
+# ==============================
+
+def _tirer_scenarios(
+    rng: np.random.Generator,
+    nb_sequences: int,
+    duree_sequence: int,
+    hsp: float,
+    conso_journaliere_wh: float,
+    cv_hsp: float,
+    cv_charge: float,
+    derating_pv_min: float,
+    derating_batterie_min: float,
+) -> dict:
+    """
+    Tire les variables aléatoires de la simulation.
+    HSP et charge varient chaque jour, les deratings sont fixes par séquence
+    (un même jeu de composants sur toute la séquence).
+    """
+    forme = (duree_sequence, nb_sequences)
+    hsp_jours = rng.normal(hsp, hsp * cv_hsp, size=forme)
+    np.clip(hsp_jours, HSP_MIN, HSP_MAX, out=hsp_jours)
+
+    charge_jours = rng.normal(conso_journaliere_wh, conso_journaliere_wh * cv_charge, size=forme)
+    np.maximum(charge_jours, 0.0, out=charge_jours)
+
+    return {
+        "hsp": hsp_jours,
+        "charge": charge_jours,
+        "derating_pv": rng.uniform(derating_pv_min, 1.0, size=nb_sequences),
+        "derating_batterie": rng.uniform(derating_batterie_min, 1.0, size=nb_sequences),
+    }
+
+
+# ==============================
+# BILAN ÉNERGÉTIQUE
+# ==============================
+
+def _simuler_bilan(
+    tirages: dict,
+    puissance_installee_wc: float,
+    energie_utile_batterie_wh: float,
+    performance_ratio: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Simule le bilan journalier production / charge / batterie.
+    Boucle sur les jours (état de charge séquentiel), vectorisée sur les séquences.
+    Retourne (jours_defaillants, energie_non_servie_wh) par séquence.
+    """
+    hsp, charge = tirages["hsp"], tirages["charge"]
+    capacite = energie_utile_batterie_wh * tirages["derating_batterie"]
+    facteur_production = puissance_installee_wc * performance_ratio * tirages["derating_pv"]
+
+    etat_charge = capacite.copy()
+    jours_defaillants = np.zeros(hsp.shape[1], dtype=np.int64)
+    energie_non_servie = np.zeros(hsp.shape[1])
+
+    for jour in range(hsp.shape[0]):
+        etat_charge += hsp[jour] * facteur_production - charge[jour]
+        deficit = etat_charge < 0
+        jours_defaillants += deficit
+        energie_non_servie -= np.where(deficit, etat_charge, 0.0)
+        np.clip(etat_charge, 0.0, capacite, out=etat_charge)
+
+    return jours_defaillants, energie_non_servie
+
+
+def _percentiles(valeurs: np.ndarray, arrondi: int = 2) -> dict:
+    p50, p90 = np.percentile(valeurs, [50, 90])
+    return {"p50": round(float(p50), arrondi), "p90": round(float(p90), arrondi)}
+
+
+# ==============================
+# SIMULATION MONTE CARLO
+# ==============================
+
+def simuler_dimensionnement_probabiliste(
+    hsp: float,
+    conso_journaliere_wh: float,
+    puissance_panneau_wc: float = PUISSANCE_PANNEAU_DEFAULT_WC,
+    tension_batterie_v: float = TENSION_BATTERIE_DEFAULT_V,
+    autonomie_jours: float = AUTONOMIE_DEFAULT_JOURS,
+    performance_ratio: float = PERFORMANCE_RATIO_DEFAULT,
+    profondeur_decharge: float = PROFONDEUR_DECHARGE_DEFAULT,
+    nombre_panneaux: int = None,
+    capacite_batterie_ah: float = None,
+    nb_scenarios: int = NB_SCENARIOS_MONTE_CARLO,
+    graine: int = GRAINE_MONTE_CARLO,
+    cv_hsp: float = CV_HSP_JOURNALIER,
+    cv_charge: float = CV_CHARGE_JOURNALIERE,
+    derating_pv_min: float = DERATING_PV_MIN,
+    derating_batterie_min: float = DERATING_BATTERIE_MIN,
+    duree_sequence_jours: int = DUREE_SEQUENCE_JOURS,
+) -> dict:
+    """
+    Dimensionnement probabiliste par Monte Carlo.
+
+    Chaque scénario est un jour tiré au hasard (HSP, consommation, derating).
+    Les jours sont regroupés en séquences pour suivre l'état de charge batterie.
+
+    Retourne :
+    - la probabilité de perte de charge (LLP) de l'installation évaluée
+      (dimensionnement déterministe par défaut, ou nombre_panneaux / capacite_batterie_ah)
+    - les tailles P50 / P90 (panneaux, puissance crête, batterie) qui couvrent
+      respectivement 50 % et 90 % des jours simulés.
+    """
+    hsp = float(hsp)
+    conso_journaliere_wh = float(conso_journaliere_wh)
+    tension_batterie_v = float(tension_batterie_v)
+
+    if not (HSP_MIN <= hsp <= HSP_MAX):
+        raise ValueError(f"HSP invalide : {hsp}")
+    if conso_journaliere_wh <= 0:
+        raise ValueError(f"Consommation invalide : {conso_journaliere_wh}")
+    if puissance_panneau_wc <= 0:
+        raise ValueError(f"Puissance panneau invalide : {puissance_panneau_wc}")
+    if nb_scenarios < 1 or duree_sequence_jours < 1:
+        raise ValueError("Nombre de scénarios ou durée de séquence invalide")
+    if not (0 <= cv_hsp < 1) or not (0 <= cv_charge < 1):
+        raise ValueError("Coefficient de variation invalide (attendu entre 0 et 1)")
+    if not (0 < derating_pv_min <= 1) or not (0 < derating_batterie_min <= 1):
+        raise ValueError("Derating invalide (attendu entre 0 et 1)")
+
+    # --- Référence déterministe ---
+    batterie = calculer_batterie(
+        conso_journaliere_wh, autonomie_jours, tension_batterie_v, profondeur_decharge
+    )
+    if nombre_panneaux is None:
+        puissance_crete = calculer_puissance_crete(conso_journaliere_wh, hsp, performance_ratio)
+        nombre_panneaux = calculer_nombre_panneaux(puissance_crete, puissance_panneau_wc)
+    if capacite_batterie_ah is None:
+        capacite_batterie_ah = batterie["capacite_ah"]
+
+    # --- Tirages ---
+    duree_sequence = min(int(duree_sequence_jours), int(nb_scenarios))
+    nb_sequences = math.ceil(nb_scenarios / duree_sequence)
+    rng = np.random.default_rng(graine)
+    tirages = _tirer_scenarios(
+        rng, nb_sequences, duree_sequence, hsp, conso_journaliere_wh,
+        cv_hsp, cv_charge, derating_pv_min, derating_batterie_min
+    )
+
+    # --- Perte de charge de l'installation évaluée ---
+    jours_defaillants, energie_non_servie = _simuler_bilan(
+        tirages,
+        puissance_installee_wc=nombre_panneaux * puissance_panneau_wc,
+        energie_utile_batterie_wh=capacite_batterie_ah * tension_batterie_v * profondeur_decharge,
+        performance_ratio=performance_ratio,
+    )
+    nb_jours_simules = duree_sequence * nb_sequences
+    energie_demandee = float(tirages["charge"].sum())
+
+    # --- Tailles requises par jour simulé (mêmes formules que core.sizing) ---
+    derating_pv = np.broadcast_to(tirages["derating_pv"], tirages["hsp"].shape)
+    derating_batterie = np.broadcast_to(tirages["derating_batterie"], tirages["hsp"].shape)
+    crete_requise = tirages["charge"] / (tirages["hsp"] * performance_ratio * derating_pv)
+    panneaux_requis = np.ceil(crete_requise / puissance_panneau_wc)
+    batterie_requise_ah = (tirages["charge"] * autonomie_jours) / (
+        tension_batterie_v * profondeur_decharge * derating_batterie
+    )
+
+    return {
+        "nb_scenarios": nb_jours_simules,
+        "nb_sequences": nb_sequences,
+        "duree_sequence_jours": duree_sequence,
+        "graine": graine,
+        "nombre_panneaux_evalue": int(nombre_panneaux),
+        "capacite_batterie_evaluee_ah": round(float(capacite_batterie_ah), 2),
+        "probabilite_perte_charge": round(float(jours_defaillants.sum()) / nb_jours_simules, 4),
+        "fraction_energie_non_servie": round(float(energie_non_servie.sum()) / energie_demandee, 4)
+        if energie_demandee > 0 else 0.0,
+        "probabilite_sequence_defaillante": round(float((jours_defaillants > 0).mean()), 4),
+        "puissance_crete_wc": _percentiles(crete_requise),
+        "nombre_panneaux": {
+            "deterministe": int(nombre_panneaux),
+            **{k: int(v) for k, v in _percentiles(panneaux_requis, 0).items()},
+        },
+        "capacite_batterie_ah": {
+            "deterministe": batterie["capacite_ah"],
+            **_percentiles(batterie_requise_ah),
+        },
+    }
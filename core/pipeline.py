@@ -0,0 +1,206 @@
+import json
+import hashlib
+import logging
+from config import PUISSANCE_PANNEAU_DEFAULT_WC, TENSION_BATTERIE_DEFAULT_V, TARIF_KWH_DEFAULT_FCFA, FACTEUR_SECURITE_ONDULEUR
+from core.sizing import (
+    valider_hsp,
+    resoudre_consommation,
+    resoudre_puissance_panneau,
+    resoudre_tension_systeme,
+    calculer_puissance_crete,
+    calculer_nombre_panneaux,
+    calculer_configuration_strings,
+    calculer_surface_champ,
+    calculer_batterie,
+    calculer_configuration_batterie,
+    calculer_rentabilite,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# ==============================
+# UTILITAIRES
+# ==============================
+def hacher_entrees(valeur) -> str:
+    """Empreinte stable d'une structure JSON-sérialisable (dicts, listes, nombres)."""
+    texte = json.dumps(valeur, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(texte.encode("utf-8")).hexdigest()
+
+
+# ==============================
+# PIPELINE INCRÉMENTAL
+# ==============================
+class PipelineDimensionnement:
+    """
+    Dimensionnement exprimé comme un petit graphe d'étapes mémoïsées :
+
+        consommation → puissance_crete → nombre_panneaux → configuration_strings
+                     │                                 ├→ surface_champ
+                     │                                 └→ rentabilite
+                     ├→ batterie → configuration_batterie
+                     └→ onduleur
+
+    Chaque étape est identifiée par l'empreinte de ses entrées et des clés de ses
+    dépendances : seules les étapes en aval d'un changement sont recalculées.
+    """
+
+    def __init__(self):
+        self._cache = {}
+        self._cle_panneaux = None
+        self._puissance_installee_wc = 0.0
+        self.etapes_recalculees = []
+        self.etapes_reutilisees = []
+
+    def _etape(self, nom: str, entrees: dict, dependances: list, calcul) -> tuple[str, object]:
+        """Exécute une étape ou réutilise son dernier résultat si la clé est inchangée."""
+        cle = hacher_entrees({"entrees": entrees, "dependances": dependances})
+        en_cache = self._cache.get(nom)
+        if en_cache and en_cache[0] == cle:
+            self.etapes_reutilisees.append(nom)
+            return cle, en_cache[1]
+
+        resultat = calcul()
+        self._cache[nom] = (cle, resultat)
+        self.etapes_recalculees.append(nom)
+        return cle, resultat
+
+    def invalider(self) -> None:
+        """Oublie tous les résultats mémoïsés."""
+        self._cache.clear()
+        self._cle_panneaux = None
+
+    def rapport(self) -> dict:
+        """Étapes recalculées / réutilisées lors du dernier appel."""
+        return {
+            "recalculees": list(self.etapes_recalculees),
+            "reutilisees": list(self.etapes_reutilisees),
+        }
+
+    def calculer(
+        self,
+        hsp: float,
+        equipements: list = None,
+        conso_journaliere_kwh: float = None,
+        puissance_panneau_wc: float = PUISSANCE_PANNEAU_DEFAULT_WC,
+        tension_batterie_v: float = TENSION_BATTERIE_DEFAULT_V,
+        module: dict = None,
+        onduleur: dict = None,
+        strings: list = None,
+        batterie_unitaire: dict = None
+    ) -> dict:
+        """
+        Équivalent incrémental de calculer_dimensionnement_complet :
+        mêmes paramètres, même résultat.
+        """
+        self.etapes_recalculees = []
+        self.etapes_reutilisees = []
+
+        hsp = valider_hsp(hsp)
+        puissance_panneau_wc = resoudre_puissance_panneau(module, puissance_panneau_wc)
+        tension_batterie_v = resoudre_tension_systeme(onduleur, batterie_unitaire, tension_batterie_v)
+
+        cle_conso, (conso_j_wh, puissance_totale_w, source_conso, profil_charge) = self._etape(
+            "consommation",
+            {"equipements": equipements or None, "conso_journaliere_kwh": conso_journaliere_kwh},
+            [],
+            lambda: resoudre_consommation(equipements, conso_journaliere_kwh),
+        )
+
+        cle_crete, puissance_crete = self._etape(
+            "puissance_crete", {"hsp": hsp}, [cle_conso],
+            lambda: calculer_puissance_crete(conso_j_wh, hsp),
+        )
+
+        cle_panneaux, nb_panneaux = self._etape(
+            "nombre_panneaux", {"puissance_panneau_wc": puissance_panneau_wc}, [cle_crete],
+            lambda: calculer_nombre_panneaux(puissance_crete, puissance_panneau_wc),
+        )
+        self._cle_panneaux = cle_panneaux
+        self._puissance_installee_wc = nb_panneaux * puissance_panneau_wc
+
+        _, configuration_strings = self._etape(
+            "configuration_strings", {"module": module, "strings": strings}, [cle_panneaux],
+            lambda: calculer_configuration_strings(nb_panneaux, module, strings) if module and strings else None,
+        )
+
+        dimensions = {k: (module or {}).get(k) for k in ("longueur_m", "largeur_m")}
+        _, surface_champ = self._etape(
+            "surface_champ", dimensions, [cle_panneaux],
+            lambda: calculer_surface_champ(nb_panneaux, module)
+            if dimensions["longueur_m"] and dimensions["largeur_m"] else None,
+        )
+
+        cle_batterie, batterie = self._etape(
+            "batterie", {"tension_batterie_v": tension_batterie_v}, [cle_conso],
+            lambda: calculer_batterie(conso_j_wh, tension_batterie_v=tension_batterie_v),
+        )
+
+        _, configuration_batterie = self._etape(
+            "configuration_batterie", {"batterie_unitaire": batterie_unitaire, "onduleur": onduleur}, [cle_batterie],
+            lambda: calculer_configuration_batterie(batterie, batterie_unitaire, onduleur) if batterie_unitaire else None,
+        )
+
+        _, puissance_onduleur_w = self._etape(
+            "onduleur", {}, [cle_conso],
+            lambda: puissance_totale_w * FACTEUR_SECURITE_ONDULEUR,
+        )
+
+        logger.debug("Pipeline dimensionnement : %s", self.rapport())
+
+        puissance_installee = self._puissance_installee_wc
+        return {
+            "source_consommation": source_conso,
+            "consommation_journaliere_wh": round(conso_j_wh, 2),
+            "consommation_journaliere_kwh": round(conso_j_wh / 1000, 2),
+            "puissance_crete_necessaire_wc": puissance_crete,
+            "puissance_panneau_wc": puissance_panneau_wc,
+            "nombre_panneaux": nb_panneaux,
+            "puissance_installee_wc": puissance_installee,
+            "puissance_installee_kwc": round(puissance_installee / 1000, 2),
+            "batterie": batterie,
+            "puissance_onduleur_recommandee_w": round(puissance_onduleur_w, 2),
+            "puissance_onduleur_recommandee_kva": round(puissance_onduleur_w / 1000, 2),
+            "hsp_utilise": hsp,
+            "configuration_strings": configuration_strings,
+            "surface_champ": surface_champ,
+            "configuration_batterie": configuration_batterie,
+            "profil_charge": profil_charge,
+        }
+
+    def calculer_rentabilite(
+        self,
+        prix_total_installation: float,
+        irradiation_annuelle_kwh: float,
+        tarif_kwh: float = TARIF_KWH_DEFAULT_FCFA,
+        puissance_installee_kwc: float = None,
+    ) -> dict:
+        """
+        Étape économique, en aval du nombre de panneaux du dernier calcul.
+        Production annuelle = irradiation annuelle × puissance installée (kWc).
+        puissance_installee_kwc : puissance du dimensionnement affiché ; remplace celle
+        du dernier calcul (qui n'est alors plus nécessaire).
+        """
+        if puissance_installee_kwc is None:
+            if self._cle_panneaux is None:
+                raise ValueError("Lancez calculer() avant l'étude de rentabilité.")
+            puissance_installee_kwc = round(self._puissance_installee_wc / 1000, 2)
+            dependances = [self._cle_panneaux]
+        else:
+            dependances = []
+
+        entrees = {
+            "prix_total_installation": prix_total_installation,
+            "irradiation_annuelle_kwh": irradiation_annuelle_kwh,
+            "tarif_kwh": tarif_kwh,
+            "puissance_installee_kwc": puissance_installee_kwc,
+        }
+        _, rentabilite = self._etape(
+            "rentabilite", entrees, dependances,
+            lambda: calculer_rentabilite(
+                prix_total_installation=prix_total_installation,
+                production_annuelle_kwh=float(irradiation_annuelle_kwh) * puissance_installee_kwc,
+                tarif_kwh=tarif_kwh,
+            ),
+        )
+        return rentabilite
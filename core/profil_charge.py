@@ -0,0 +1,149 @@
+import logging
+from functools import lru_cache
+import numpy as np
+from config import FACTEUR_SURCHARGE_ONDULEUR, HEURE_LEVER_SOLEIL, HEURE_COUCHER_SOLEIL
+
+logger = logging.getLogger(__name__)
+
+# ==============================
+# CONSTANTES
+# ==============================
+HEURES_PAR_JOUR = 24
+HEURES_PAR_AN = 8760
+
+
+# ==============================
+# PLAGES HORAIRES
+# ==============================
+@lru_cache(maxsize=512)
+def parser_plage_horaire(plage: str) -> np.ndarray:
+    """
+    Convertit une plage horaire en masque de 24 heures.
+    Format : "18-23" (de 18h à 23h), plusieurs plages séparées par des virgules
+    ("6-8,18-22"), passage de minuit accepté ("22-6"), journée entière "0-24".
+    """
+    if not plage or not str(plage).strip():
+        raise ValueError("Plage horaire vide")
+
+    masque = np.zeros(HEURES_PAR_JOUR, dtype=bool)
+    for morceau in str(plage).replace(" ", "").split(","):
+        try:
+            debut, fin = (int(h) for h in morceau.split("-"))
+        except ValueError:
+            raise ValueError(f"Plage horaire invalide : {morceau} (attendu ex: 18-23)")
+        if not (0 <= debut < HEURES_PAR_JOUR and 0 <= fin <= HEURES_PAR_JOUR) or debut == fin:
+            raise ValueError(f"Plage horaire invalide : {morceau}")
+        if debut < fin:
+            masque[debut:fin] = True
+        else:
+            masque[debut:] = True
+            masque[:fin] = True
+
+    if not masque.any():
+        raise ValueError(f"Plage horaire vide : {plage}")
+    masque.setflags(write=False)  # partagé via le cache
+    return masque
+
+
+def _a_un_profil(equipement: dict) -> bool:
+    return bool(equipement.get("plage_horaire"))
+
+
+def equipements_avec_profil(equipements: list) -> bool:
+    """Vrai si au moins un équipement porte une plage horaire ou un facteur de démarrage."""
+    return any(
+        _a_un_profil(e) or float(e.get("facteur_demarrage") or 1) > 1
+        for e in equipements or []
+    )
+
+
+# ==============================
+# CONSTRUCTION DU PROFIL
+# ==============================
+def construire_profil_charge(equipements: list, nb_heures: int = HEURES_PAR_JOUR) -> dict:
+    """
+    Construit les matrices horaires (heures × équipements) :
+    - puissance_w : puissance appelée si l'équipement fonctionne sur sa plage
+    - energie_wh  : énergie consommée, l'énergie journalière étant répartie
+                    uniformément sur la plage (cycle de service)
+    Les équipements sans plage horaire sont considérés en marche à toute heure
+    (hypothèse historique : tous les appareils simultanés).
+    nb_heures : 24 (journée type) ou 8760 (année, journée type répétée).
+    """
+    if nb_heures not in (HEURES_PAR_JOUR, HEURES_PAR_AN):
+        raise ValueError(f"Résolution invalide : {nb_heures} (24 ou 8760)")
+
+    n = len(equipements)
+    masques = np.ones((n, HEURES_PAR_JOUR), dtype=bool)
+    for i, e in enumerate(equipements):
+        if _a_un_profil(e):
+            masques[i] = parser_plage_horaire(e["plage_horaire"])
+
+    puissance_unitaire = np.array([float(e["puissance_w"]) for e in equipements])
+    quantite = np.array([int(e.get("quantite", 1)) for e in equipements])
+    conso_jour = np.array([float(e["conso_jour_wh"]) for e in equipements])
+    facteur_demarrage = np.array([float(e.get("facteur_demarrage") or 1) for e in equipements])
+
+    puissance_nominale = puissance_unitaire * quantite
+    heures_actives = masques.sum(axis=1)
+    # Énergie horaire plafonnée à la puissance nominale (cycle de service ≤ 100 %)
+    energie_horaire = np.minimum(conso_jour / np.maximum(heures_actives, 1), puissance_nominale)
+
+    puissance_w = (masques * puissance_nominale[:, None]).T
+    energie_wh = (masques * energie_horaire[:, None]).T
+    # Surplus au démarrage : un seul appareil de chaque type démarre à la fois
+    surplus_demarrage = (masques * ((facteur_demarrage - 1) * puissance_unitaire)[:, None]).T
+
+    if nb_heures == HEURES_PAR_AN:
+        jours = HEURES_PAR_AN // HEURES_PAR_JOUR
+        puissance_w = np.tile(puissance_w, (jours, 1))
+        energie_wh = np.tile(energie_wh, (jours, 1))
+        surplus_demarrage = np.tile(surplus_demarrage, (jours, 1))
+
+    return {
+        "puissance_w": puissance_w,
+        "energie_wh": energie_wh,
+        "surplus_demarrage_w": surplus_demarrage,
+    }
+
+
+# ==============================
+# ANALYSE DU PROFIL
+# ==============================
+def analyser_profil_charge(
+    equipements: list,
+    facteur_surcharge_onduleur: float = FACTEUR_SURCHARGE_ONDULEUR,
+    heure_lever: int = HEURE_LEVER_SOLEIL,
+    heure_coucher: int = HEURE_COUCHER_SOLEIL,
+) -> dict | None:
+    """
+    Dérive du profil horaire les grandeurs de dimensionnement :
+    - puissance_coincidente_w : pic des puissances simultanément appelées
+    - puissance_demarrage_w   : pic en incluant le démarrage du plus gros moteur en marche
+    - puissance_dimensionnante_w : puissance que l'onduleur doit tenir en continu
+      (max du pic coïncident et du pic de démarrage ramené à la surcharge admissible)
+    - courbe horaire d'énergie, énergie journalière et nocturne (hors production PV)
+    """
+    if not equipements:
+        return None
+
+    profil = construire_profil_charge(equipements)
+    puissance_horaire = profil["puissance_w"].sum(axis=1)
+    energie_horaire = profil["energie_wh"].sum(axis=1)
+    demarrage_horaire = puissance_horaire + profil["surplus_demarrage_w"].max(axis=1)
+
+    heure_pointe = int(puissance_horaire.argmax())
+    puissance_coincidente = float(puissance_horaire.max())
+    puissance_demarrage = float(demarrage_horaire.max())
+    heures_nocturnes = np.ones(HEURES_PAR_JOUR, dtype=bool)
+    heures_nocturnes[heure_lever:heure_coucher] = False
+
+    return {
+        "profil_horaire_wh": [round(float(v), 2) for v in energie_horaire],
+        "heure_pointe": heure_pointe,
+        "puissance_coincidente_w": round(puissance_coincidente, 2),
+        "puissance_demarrage_w": round(puissance_demarrage, 2),
+        "puissance_dimensionnante_w": round(max(puissance_coincidente, puissance_demarrage / facteur_surcharge_onduleur), 2),
+        "energie_journaliere_wh": round(float(energie_horaire.sum()), 2),
+        "energie_nocturne_wh": round(float(energie_horaire[heures_nocturnes].sum()), 2),
+    }
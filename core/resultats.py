@@ -0,0 +1,364 @@
+from dataclasses import dataclass
+import ormsgpack
+
+
+def _float_ou_none(valeur) -> float | None:
+    return float(valeur) if valeur is not None else None
+
+
+def _int_ou_none(valeur) -> int | None:
+    return int(valeur) if valeur is not None else None
+
+
+# ==============================
+# BATTERIE
+# ==============================
+@dataclass(frozen=True, slots=True)
+class BatterieResult:
+    capacite_ah: float
+    capacite_kwh: float
+    tension_v: float
+    autonomie_jours: float
+    profondeur_decharge: float
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "BatterieResult":
+        return cls(
+            capacite_ah=float(d["capacite_ah"]),
+            capacite_kwh=float(d["capacite_kwh"]),
+            tension_v=float(d["tension_v"]),
+            autonomie_jours=float(d["autonomie_jours"]),
+            profondeur_decharge=float(d["profondeur_decharge"]),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "capacite_ah": self.capacite_ah,
+            "capacite_kwh": self.capacite_kwh,
+            "tension_v": self.tension_v,
+            "autonomie_jours": self.autonomie_jours,
+            "profondeur_decharge": self.profondeur_decharge,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class ConfigurationBatterie:
+    nb_batteries_serie: int
+    nb_batteries_parallele: int
+    nb_batteries_total: int
+    tension_parc_v: float
+    capacite_reelle_ah: float
+    avertissement_tension: str | None = None
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ConfigurationBatterie":
+        return cls(
+            nb_batteries_serie=int(d["nb_batteries_serie"]),
+            nb_batteries_parallele=int(d["nb_batteries_parallele"]),
+            nb_batteries_total=int(d["nb_batteries_total"]),
+            tension_parc_v=float(d["tension_parc_v"]),
+            capacite_reelle_ah=float(d["capacite_reelle_ah"]),
+            avertissement_tension=d.get("avertissement_tension"),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "nb_batteries_serie": self.nb_batteries_serie,
+            "nb_batteries_parallele": self.nb_batteries_parallele,
+            "nb_batteries_total": self.nb_batteries_total,
+            "tension_parc_v": self.tension_parc_v,
+            "capacite_reelle_ah": self.capacite_reelle_ah,
+            "avertissement_tension": self.avertissement_tension,
+        }
+
+
+# ==============================
+# STRINGS
+# ==============================
+# Clés présentes dans le dict d'une string uniquement si la donnée a pu être calculée
+_CLES_OPTIONNELLES_STRING = (
+    "nb_serie_min", "nb_serie_max_mppt", "nb_serie_max_absolu",
+    "nb_parallele_max", "tension_string_v",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class StringResult:
+    numero_string: int
+    nb_serie_optimal: int
+    nb_serie_affecte: int
+    nb_parallele_affecte: int
+    nb_panneaux_affectes: int
+    nb_serie_min: int | None = None
+    nb_serie_max_mppt: int | None = None
+    nb_serie_max_absolu: int | None = None
+    nb_parallele_max: int | None = None
+    tension_string_v: float | None = None
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "StringResult":
+        return cls(
+            numero_string=int(d["numero_string"]),
+            nb_serie_optimal=int(d["nb_serie_optimal"]),
+            nb_serie_affecte=int(d.get("nb_serie_affecte", 0)),
+            nb_parallele_affecte=int(d.get("nb_parallele_affecte", 0)),
+            nb_panneaux_affectes=int(d.get("nb_panneaux_affectes", 0)),
+            nb_serie_min=_int_ou_none(d.get("nb_serie_min")),
+            nb_serie_max_mppt=_int_ou_none(d.get("nb_serie_max_mppt")),
+            nb_serie_max_absolu=_int_ou_none(d.get("nb_serie_max_absolu")),
+            nb_parallele_max=_int_ou_none(d.get("nb_parallele_max")),
+            tension_string_v=_float_ou_none(d.get("tension_string_v")),
+        )
+
+    def to_dict(self) -> dict:
+        d = {
+            "numero_string": self.numero_string,
+            "nb_serie_optimal": self.nb_serie_optimal,
+            "nb_serie_affecte": self.nb_serie_affecte,
+            "nb_parallele_affecte": self.nb_parallele_affecte,
+            "nb_panneaux_affectes": self.nb_panneaux_affectes,
+        }
+        for cle in _CLES_OPTIONNELLES_STRING:
+            valeur = getattr(self, cle)
+            if valeur is not None:
+                d[cle] = valeur
+        return d
+
+
+@dataclass(frozen=True, slots=True)
+class ConfigurationStrings:
+    strings: tuple[StringResult, ...]
+    avertissements: tuple[str, ...]
+    panneaux_non_affectes: int
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ConfigurationStrings":
+        return cls(
+            strings=tuple(StringResult.from_dict(s) for s in d.get("strings", [])),
+            avertissements=tuple(d.get("avertissements", [])),
+            panneaux_non_affectes=int(d.get("panneaux_non_affectes", 0)),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "strings": [s.to_dict() for s in self.strings],
+            "avertissements": list(self.avertissements),
+            "panneaux_non_affectes": self.panneaux_non_affectes,
+        }
+
+
+# ==============================
+# SURFACE DU CHAMP PV
+# ==============================
+@dataclass(frozen=True, slots=True)
+class SurfaceChamp:
+    surface_module_m2: float
+    surface_brute_m2: float
+    surface_totale_m2: float
+    coefficient_aeration: float
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "SurfaceChamp":
+        return cls(
+            surface_module_m2=float(d["surface_module_m2"]),
+            surface_brute_m2=float(d["surface_brute_m2"]),
+            surface_totale_m2=float(d["surface_totale_m2"]),
+            coefficient_aeration=float(d["coefficient_aeration"]),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "surface_module_m2": self.surface_module_m2,
+            "surface_brute_m2": self.surface_brute_m2,
+            "surface_totale_m2": self.surface_totale_m2,
+            "coefficient_aeration": self.coefficient_aeration,
+        }
+
+
+# ==============================
+# PROFIL DE CHARGE
+# ==============================
+@dataclass(frozen=True, slots=True)
+class ProfilCharge:
+    profil_horaire_wh: tuple[float, ...]
+    heure_pointe: int
+    puissance_coincidente_w: float
+    puissance_demarrage_w: float
+    puissance_dimensionnante_w: float
+    energie_journaliere_wh: float
+    energie_nocturne_wh: float
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProfilCharge":
+        return cls(
+            profil_horaire_wh=tuple(float(v) for v in d["profil_horaire_wh"]),
+            heure_pointe=int(d["heure_pointe"]),
+            puissance_coincidente_w=float(d["puissance_coincidente_w"]),
+            puissance_demarrage_w=float(d["puissance_demarrage_w"]),
+            puissance_dimensionnante_w=float(d["puissance_dimensionnante_w"]),
+            energie_journaliere_wh=float(d["energie_journaliere_wh"]),
+            energie_nocturne_wh=float(d["energie_nocturne_wh"]),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "profil_horaire_wh": list(self.profil_horaire_wh),
+            "heure_pointe": self.heure_pointe,
+            "puissance_coincidente_w": self.puissance_coincidente_w,
+            "puissance_demarrage_w": self.puissance_demarrage_w,
+            "puissance_dimensionnante_w": self.puissance_dimensionnante_w,
+            "energie_journaliere_wh": self.energie_journaliere_wh,
+            "energie_nocturne_wh": self.energie_nocturne_wh,
+        }
+
+
+# ==============================
+# DIMENSIONNEMENT COMPLET
+# ==============================
+@dataclass(frozen=True, slots=True)
+class DimensionnementResult:
+    """
+    Résultat typé de calculer_dimensionnement_complet.
+    Immuable, à __slots__ : conversions numériques faites une fois à la création.
+    to_dict() restitue exactement les clés historiques de core.sizing.
+    """
+    source_consommation: str
+    consommation_journaliere_wh: float
+    consommation_journaliere_kwh: float
+    puissance_crete_necessaire_wc: float
+    puissance_panneau_wc: float
+    nombre_panneaux: int
+    puissance_installee_wc: float
+    puissance_installee_kwc: float
+    batterie: BatterieResult
+    puissance_onduleur_recommandee_w: float
+    puissance_onduleur_recommandee_kva: float
+    hsp_utilise: float
+    configuration_strings: ConfigurationStrings | None = None
+    surface_champ: SurfaceChamp | None = None
+    configuration_batterie: ConfigurationBatterie | None = None
+    profil_charge: ProfilCharge | None = None
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "DimensionnementResult":
+        cs, sc, cb = d.get("configuration_strings"), d.get("surface_champ"), d.get("configuration_batterie")
+        pc = d.get("profil_charge")
+        return cls(
+            source_consommation=str(d["source_consommation"]),
+            consommation_journaliere_wh=float(d["consommation_journaliere_wh"]),
+            consommation_journaliere_kwh=float(d["consommation_journaliere_kwh"]),
+            puissance_crete_necessaire_wc=float(d["puissance_crete_necessaire_wc"]),
+            puissance_panneau_wc=float(d["puissance_panneau_wc"]),
+            nombre_panneaux=int(d["nombre_panneaux"]),
+            puissance_installee_wc=float(d["puissance_installee_wc"]),
+            puissance_installee_kwc=float(d["puissance_installee_kwc"]),
+            batterie=BatterieResult.from_dict(d["batterie"]),
+            puissance_onduleur_recommandee_w=float(d["puissance_onduleur_recommandee_w"]),
+            puissance_onduleur_recommandee_kva=float(d["puissance_onduleur_recommandee_kva"]),
+            hsp_utilise=float(d["hsp_utilise"]),
+            configuration_strings=ConfigurationStrings.from_dict(cs) if cs else None,
+            surface_champ=SurfaceChamp.from_dict(sc) if sc else None,
+            configuration_batterie=ConfigurationBatterie.from_dict(cb) if cb else None,
+            profil_charge=ProfilCharge.from_dict(pc) if pc else None,
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "source_consommation": self.source_consommation,
+            "consommation_journaliere_wh": self.consommation_journaliere_wh,
+            "consommation_journaliere_kwh": self.consommation_journaliere_kwh,
+            "puissance_crete_necessaire_wc": self.puissance_crete_necessaire_wc,
+            "puissance_panneau_wc": self.puissance_panneau_wc,
+            "nombre_panneaux": self.nombre_panneaux,
+            "puissance_installee_wc": self.puissance_installee_wc,
+            "puissance_installee_kwc": self.puissance_installee_kwc,
+            "batterie": self.batterie.to_dict(),
+            "puissance_onduleur_recommandee_w": self.puissance_onduleur_recommandee_w,
+            "puissance_onduleur_recommandee_kva": self.puissance_onduleur_recommandee_kva,
+            "hsp_utilise": self.hsp_utilise,
+            "configuration_strings": self.configuration_strings.to_dict() if self.configuration_strings else None,
+            "surface_champ": self.surface_champ.to_dict() if self.surface_champ else None,
+            "configuration_batterie": self.configuration_batterie.to_dict() if self.configuration_batterie else None,
+            "profil_charge": self.profil_charge.to_dict() if self.profil_charge else None,
+        }
+
+    def to_msgpack(self) -> bytes:
+        return ormsgpack.packb(self.to_dict())
+
+    @classmethod
+    def from_msgpack(cls, donnees: bytes) -> "DimensionnementResult":
+        return cls.from_dict(ormsgpack.unpackb(donnees))
+
+    @property
+    def avertissements(self) -> list[str]:
+        """Tous les avertissements (strings + parc batterie), dans l'ordre d'affichage."""
+        avertissements = []
+        if self.configuration_strings:
+            avertissements.extend(self.configuration_strings.avertissements)
+        if self.configuration_batterie and self.configuration_batterie.avertissement_tension:
+            avertissements.append(self.configuration_batterie.avertissement_tension)
+        return avertissements
+
+
+# ==============================
+# RENTABILITÉ
+# ==============================
+@dataclass(frozen=True, slots=True)
+class ProjectionAnnee:
+    annee: int
+    economies_cumulees: float
+
+
+@dataclass(frozen=True, slots=True)
+class Rentabilite:
+    cout_total_installation: float
+    economies_annuelles: float
+    temps_retour_ans: float
+    projection_10_ans: tuple[ProjectionAnnee, ...]
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Rentabilite":
+        return cls(
+            cout_total_installation=float(d["cout_total_installation"]),
+            economies_annuelles=float(d["economies_annuelles"]),
+            temps_retour_ans=float(d["temps_retour_ans"]),
+            projection_10_ans=tuple(
+                ProjectionAnnee(int(p["annee"]), float(p["economies_cumulees"]))
+                for p in d.get("projection_10_ans", [])
+            ),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "cout_total_installation": self.cout_total_installation,
+            "economies_annuelles": self.economies_annuelles,
+            "temps_retour_ans": self.temps_retour_ans,
+            "projection_10_ans": [
+                {"annee": p.annee, "economies_cumulees": p.economies_cumulees}
+                for p in self.projection_10_ans
+            ],
+        }
+
+    def to_msgpack(self) -> bytes:
+        return ormsgpack.packb(self.to_dict())
+
+    @classmethod
+    def from_msgpack(cls, donnees: bytes) -> "Rentabilite":
+        return cls.from_dict(ormsgpack.unpackb(donnees))
+
+
+# ==============================
+# CONVERSIONS
+# ==============================
+def comme_dimensionnement(dim) -> DimensionnementResult | None:
+    """Accepte un DimensionnementResult ou un dict historique."""
+    if dim is None or isinstance(dim, DimensionnementResult):
+        return dim
+    return DimensionnementResult.from_dict(dim)
+
+
+def comme_rentabilite(rentabilite) -> Rentabilite | None:
+    """Accepte une Rentabilite ou un dict historique."""
+    if rentabilite is None or isinstance(rentabilite, Rentabilite):
+        return rentabilite
+    return Rentabilite.from_dict(rentabilite)
@@ -13,6 +13,7 @@ from config import (
     HSP_EQUIVALENT_FACTURES,
     TARIF_KWH_DEFAULT_FCFA,
 )
+from core.profil_charge import analyser_profil_charge, equipements_avec_profil
 
 logger = logging.getLogger(__name__)
 
@@ -334,6 +335,64 @@ def calculer_rentabilite(
     }
 
 
+# ==============================
+# RÉSOLUTION DES ENTRÉES
+# ==============================
+
+def valider_hsp(hsp: float) -> float:
+    """Convertit et valide le HSP du site."""
+    hsp = float(hsp)
+    if not (HSP_MIN <= hsp <= HSP_MAX):
+        raise ValueError(f"HSP invalide : {hsp}")
+    return hsp
+
+
+def resoudre_consommation(
+    equipements: list = None,
+    conso_journaliere_kwh: float = None
+) -> tuple[float, float, str, dict | None]:
+    """
+    Détermine la consommation journalière (Wh), la puissance à couvrir par
+    l'onduleur (W), la source utilisée ("equipements" ou "factures") et le
+    profil de charge horaire.
+    Si les équipements portent des plages horaires / facteurs de démarrage,
+    l'onduleur est dimensionné sur le pic coïncident (et le pic de démarrage)
+    au lieu de la somme de toutes les puissances.
+    """
+    if equipements:
+        conso_j_wh = calculer_consommation_journaliere(equipements)
+        if equipements_avec_profil(equipements):
+            profil = analyser_profil_charge(equipements)
+            return conso_j_wh, profil["puissance_dimensionnante_w"], "equipements", profil
+        puissance_totale_w = calculer_puissance_total_equipement(equipements)
+        return conso_j_wh, puissance_totale_w, "equipements", None
+    if conso_journaliere_kwh:
+        conso_j_wh = float(conso_journaliere_kwh) * 1000
+        puissance_totale_w = (conso_j_wh / HSP_EQUIVALENT_FACTURES) * FACTEUR_SECURITE_ONDULEUR
+        return conso_j_wh, puissance_totale_w, "factures", None
+    raise ValueError("Fournissez soit les équipements soit la consommation journalière.")
+
+
+def resoudre_puissance_panneau(module: dict = None, puissance_panneau_wc: float = PUISSANCE_PANNEAU_DEFAULT_WC) -> float:
+    """La puissance du module saisi prime sur la valeur par défaut."""
+    if module and module.get("puissance_crete_wc"):
+        return float(module["puissance_crete_wc"])
+    return puissance_panneau_wc
+
+
+def resoudre_tension_systeme(
+    onduleur: dict = None,
+    batterie_unitaire: dict = None,
+    tension_batterie_v: float = TENSION_BATTERIE_DEFAULT_V
+) -> float:
+    """Tension système : onduleur, sinon batterie unitaire, sinon valeur par défaut."""
+    if onduleur and onduleur.get("tension_demarrage_batterie_v"):
+        return float(onduleur["tension_demarrage_batterie_v"])
+    if batterie_unitaire and batterie_unitaire.get("tension_v"):
+        return float(batterie_unitaire["tension_v"])
+    return tension_batterie_v
+
+
 # ==============================
 # DIMENSIONNEMENT COMPLET
 # ==============================
@@ -356,31 +415,16 @@ def calculer_dimensionnement_complet(
     - Mode équipements : equipements est une liste d'appareils
     - Mode factures    : conso_journaliere_kwh est la moyenne des factures
     """
-    hsp = float(hsp)
-    if not (HSP_MIN <= hsp <= HSP_MAX):
-        raise ValueError(f"HSP invalide : {hsp}")
+    hsp = valider_hsp(hsp)
 
     # --- Consommation journalière ---
-    if equipements:
-        conso_j_wh = calculer_consommation_journaliere(equipements)
-        puissance_totale_w = calculer_puissance_total_equipement(equipements)
-        source_conso = "equipements"
-    elif conso_journaliere_kwh:
-        conso_j_wh = float(conso_journaliere_kwh) * 1000
-        puissance_totale_w = (conso_j_wh / HSP_EQUIVALENT_FACTURES) * FACTEUR_SECURITE_ONDULEUR
-        source_conso = "factures"
-    else:
-        raise ValueError("Fournissez soit les équipements soit la consommation journalière.")
-
-    # --- Puissance panneau ---
-    if module and module.get("puissance_crete_wc"):
-        puissance_panneau_wc = float(module["puissance_crete_wc"])
+    conso_j_wh, puissance_totale_w, source_conso, profil_charge = resoudre_consommation(
+        equipements, conso_journaliere_kwh
+    )
 
-    # --- Tension système ---
-    if onduleur and onduleur.get("tension_demarrage_batterie_v"):
-        tension_batterie_v = float(onduleur["tension_demarrage_batterie_v"])
-    elif batterie_unitaire and batterie_unitaire.get("tension_v"):
-        tension_batterie_v = float(batterie_unitaire["tension_v"])
+    # --- Puissance panneau / tension système ---
+    puissance_panneau_wc = resoudre_puissance_panneau(module, puissance_panneau_wc)
+    tension_batterie_v = resoudre_tension_systeme(onduleur, batterie_unitaire, tension_batterie_v)
 
     # --- Calculs de base ---
     puissance_crete = calculer_puissance_crete(conso_j_wh, hsp)
@@ -405,6 +449,7 @@ def calculer_dimensionnement_complet(
         "configuration_strings": None,
         "surface_champ": None,
         "configuration_batterie": None,
+        "profil_charge": profil_charge,
     }
 
     # --- Calculs enrichis ---
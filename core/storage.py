@@ -6,12 +6,18 @@ import logging
 from contextlib import contextmanager
 from pathlib import Path
 from config import TARIF_KWH_DEFAULT_FCFA
+from core.profil_charge import parser_plage_horaire
 
 logger = logging.getLogger(__name__)
 
 # ==============================
 # CONSTANTES
 # ==============================
+# Tables dont toute écriture invalide les réponses de l'agent mises en cache
+TABLES_PROJET = (
+    "equipements", "factures", "onduleur", "onduleur_strings",
+    "module_pv", "batterie", "parametres", "localisation",
+)
 
 
 # ==============================
@@ -58,6 +64,12 @@ def get_db():
 # ==============================
 # INITIALISATION
 # ==============================
+def _ajouter_colonne_si_absente(conn: sqlite3.Connection, table: str, colonne: str, definition: str) -> None:
+    colonnes = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if colonne not in colonnes:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {colonne} {definition}")
+
+
 def initialiser_stockage() -> None:
     """Crée les tables si elles n'existent pas encore."""
     with get_db() as conn:
@@ -69,9 +81,14 @@ def initialiser_stockage() -> None:
                 heures_par_jour REAL NOT NULL CHECK(heures_par_jour >= 0 AND heures_par_jour <= 24),
                 quantite INTEGER NOT NULL CHECK(quantite >= 1),
                 conso_jour_wh REAL NOT NULL CHECK(conso_jour_wh >= 0),
+                plage_horaire TEXT,
+                facteur_demarrage REAL DEFAULT 1 CHECK(facteur_demarrage >= 1),
                 created_at TEXT DEFAULT CURRENT_TIMESTAMP
             )
         """)
+        # Bases créées avant l'ajout du profil de charge
+        _ajouter_colonne_si_absente(conn, "equipements", "plage_horaire", "TEXT")
+        _ajouter_colonne_si_absente(conn, "equipements", "facteur_demarrage", "REAL DEFAULT 1")
 
         conn.execute("""
             CREATE TABLE IF NOT EXISTS factures (
@@ -160,6 +177,26 @@ def initialiser_stockage() -> None:
             )
         """)
 
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_reponses_agent (
+                cle TEXT PRIMARY KEY,
+                reponse TEXT NOT NULL,
+                cree_le REAL NOT NULL,
+                dernier_acces REAL NOT NULL
+            )
+        """)
+
+        # Toute écriture sur le projet rend les réponses en cache obsolètes
+        for table in TABLES_PROJET:
+            for operation in ("INSERT", "UPDATE", "DELETE"):
+                conn.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS invalider_cache_{table}_{operation.lower()}
+                    AFTER {operation} ON {table}
+                    BEGIN
+                        DELETE FROM cache_reponses_agent;
+                    END
+                """)
+
 
 # ==============================
 # ÉQUIPEMENTS
@@ -169,9 +206,15 @@ def ajouter_equipement(
     puissance_w: float,
     heures_par_jour: float,
     quantite: int,
-    conso_jour_wh: float
+    conso_jour_wh: float,
+    plage_horaire: str = None,
+    facteur_demarrage: float = 1.0
 ) -> None:
-    """Insère un nouvel équipement dans la base."""
+    """
+    Insère un nouvel équipement dans la base.
+    plage_horaire : heures de fonctionnement (ex: "18-23", "6-8,18-22"), None = non renseignée.
+    facteur_demarrage : rapport pic de démarrage / puissance nominale (moteurs, compresseurs).
+    """
     if not nom or not nom.strip():
         raise ValueError("Nom équipement invalide")
     if puissance_w < 0:
@@ -180,12 +223,19 @@ def ajouter_equipement(
         raise ValueError("Heures/jour invalide")
     if quantite < 1:
         raise ValueError("Quantité invalide")
+    if facteur_demarrage < 1:
+        raise ValueError("Facteur de démarrage invalide")
+    plage_horaire = plage_horaire.strip() if plage_horaire and plage_horaire.strip() else None
+    if plage_horaire:
+        parser_plage_horaire(plage_horaire)
 
     with get_db() as conn:
         conn.execute("""
-            INSERT INTO equipements (nom, puissance_w, heures_par_jour, quantite, conso_jour_wh)
-            VALUES (?, ?, ?, ?, ?)
-        """, (nom.strip(), puissance_w, heures_par_jour, quantite, conso_jour_wh))
+            INSERT INTO equipements (nom, puissance_w, heures_par_jour, quantite, conso_jour_wh,
+                                     plage_horaire, facteur_demarrage)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (nom.strip(), puissance_w, heures_par_jour, quantite, conso_jour_wh,
+              plage_horaire, facteur_demarrage))
 
 
 def get_equipements() -> list:
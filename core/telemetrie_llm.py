@@ -0,0 +1,272 @@
+import argparse
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+import httpx
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from langchain_core.callbacks import BaseCallbackHandler
+from config import (
+    METRIQUES_LLM_PATH,
+    INTERVALLE_FLUSH_METRIQUES_S,
+    NB_MAX_DUREES_METRIQUES,
+    TAILLE_MAX_TAMPON_METRIQUES,
+    TARIFS_LLM_USD_PAR_MTOKEN,
+)
+
+logger = logging.getLogger(__name__)
+
+# ==============================
+# CONSTANTES
+# ==============================
+STATUTS_REESSAYES = {408, 409, 429, 500, 502, 503, 504}  # Réessayés par le SDK Groq
+
+
+# ==============================
+# AGRÉGATION ET ÉCRITURE
+# ==============================
+class AgregateurMetriques:
+    """
+    Mesures des appels LLM du processus : synthèse en mémoire par (pipeline, modèle)
+    et tampon écrit en JSONL au plus tard toutes les `intervalle_s` secondes (thread démon
+    démarré à la première mesure) ou dès que `taille_max` mesures sont en attente.
+    Les percentiles portent sur les `nb_max_durees` dernières durées par (pipeline, modèle).
+    """
+
+    def __init__(self, chemin: str = None, intervalle_s: float = INTERVALLE_FLUSH_METRIQUES_S,
+                 taille_max: int = TAILLE_MAX_TAMPON_METRIQUES, nb_max_durees: int = NB_MAX_DUREES_METRIQUES):
+        self.chemin = chemin
+        self.intervalle_s = intervalle_s
+        self.taille_max = taille_max
+        self.nb_max_durees = nb_max_durees
+        self._verrou = threading.Lock()
+        self._tampon = []
+        self._durees = {}
+        self._synthese = {}
+        self._dernier_flush = time.monotonic()
+        self._thread_flush = None
+
+    def _demarrer_flush_periodique(self) -> None:
+        # Appelé sous verrou ; pas de thread pour un intervalle infini (lecture de fichier)
+        if self._thread_flush is not None or self.intervalle_s == float("inf"):
+            return
+        self._thread_flush = threading.Thread(target=self._flush_periodique, name="flush-metriques-llm", daemon=True)
+        self._thread_flush.start()
+
+    def _flush_periodique(self) -> None:
+        while True:
+            time.sleep(self.intervalle_s)
+            self.flush()
+
+    def enregistrer(self, mesure: dict) -> None:
+        cle = (mesure["pipeline"], mesure["modele"])
+        with self._verrou:
+            self._tampon.append(mesure)
+            stats = self._synthese.setdefault(cle, {
+                "appels": 0, "erreurs": 0, "tentatives_echouees": 0,
+                "tokens_prompt": 0, "tokens_completion": 0, "cout_usd": 0.0,
+            })
+            stats["appels"] += 1
+            stats["erreurs"] += mesure["erreur"] is not None
+            stats["tentatives_echouees"] += mesure["tentatives_echouees"]
+            stats["tokens_prompt"] += mesure["tokens_prompt"] or 0
+            stats["tokens_completion"] += mesure["tokens_completion"] or 0
+            stats["cout_usd"] += mesure["cout_usd"] or 0.0
+            self._durees.setdefault(cle, deque(maxlen=self.nb_max_durees)).append(mesure["duree_ms"])
+            self._demarrer_flush_periodique()
+            a_ecrire = (len(self._tampon) >= self.taille_max
+                        or time.monotonic() - self._dernier_flush >= self.intervalle_s)
+        if a_ecrire:
+            self.flush()
+
+    def flush(self) -> int:
+        """Écrit les mesures en attente ; retourne le nombre de lignes écrites."""
+        with self._verrou:
+            mesures, self._tampon = self._tampon, []
+            self._dernier_flush = time.monotonic()
+        if not mesures:
+            return 0
+        chemin = Path(self.chemin or os.getenv("METRIQUES_LLM_PATH", METRIQUES_LLM_PATH))
+        try:
+            chemin.parent.mkdir(parents=True, exist_ok=True)
+            with open(chemin, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(m, ensure_ascii=False) + "\n" for m in mesures)
+        except OSError as e:
+            logger.warning("Écriture des métriques LLM impossible (%s) : %s", chemin, e)
+            return 0
+        return len(mesures)
+
+    def synthese(self) -> list[dict]:
+        """Une ligne par (pipeline, modèle) : appels, erreurs, latences p50/p95, tokens, coût."""
+        with self._verrou:
+            lignes = []
+            for (pipeline, modele), stats in sorted(self._synthese.items()):
+                durees = np.asarray(self._durees[(pipeline, modele)])
+                lignes.append({
+                    "pipeline": pipeline,
+                    "modele": modele,
+                    **stats,
+                    "cout_usd": round(stats["cout_usd"], 6),
+                    "duree_p50_ms": round(float(np.percentile(durees, 50)), 1),
+                    "duree_p95_ms": round(float(np.percentile(durees, 95)), 1),
+                })
+            return lignes
+
+    def reinitialiser(self) -> None:
+        with self._verrou:
+            self._tampon.clear()
+            self._durees.clear()
+            self._synthese.clear()
+
+
+_agregateur = AgregateurMetriques()
+atexit.register(_agregateur.flush)
+
+
+def agregateur_metriques() -> AgregateurMetriques:
+    return _agregateur
+
+
+# ==============================
+# TENTATIVES ÉCHOUÉES (HTTP)
+# ==============================
+# Les réessais du SDK Groq sont invisibles pour LangChain : comptés au niveau HTTP
+# et rattachés à l'appel LLM en cours dans le thread (les appels sont synchrones).
+_appel_courant = threading.local()
+
+
+def _compter_reponse(reponse: httpx.Response) -> None:
+    mesure = getattr(_appel_courant, "mesure", None)
+    if mesure is not None and reponse.status_code in STATUTS_REESSAYES:
+        mesure["tentatives_echouees"] += 1
+
+
+def crochets_http() -> dict:
+    """event_hooks à passer aux httpx.Client des clients LLM."""
+    return {"response": [_compter_reponse]}
+
+
+# ==============================
+# CALLBACK LANGCHAIN
+# ==============================
+def estimer_cout(modele: str, tokens_prompt: int | None, tokens_completion: int | None) -> float | None:
+    tarif = TARIFS_LLM_USD_PAR_MTOKEN.get(modele)
+    if tarif is None or tokens_prompt is None:
+        return None
+    return round((tokens_prompt * tarif[0] + (tokens_completion or 0) * tarif[1]) / 1e6, 8)
+
+
+def _session_courante() -> str:
+    """Identifiant de la session Streamlit (celui de la base du projet), hors application : 'hors-session'."""
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return "hors-session"
+    return st.session_state.get("session_id", "hors-session")
+
+
+class TelemetrieLLM(BaseCallbackHandler):
+    """
+    Mesure chaque appel de modèle de chat : durée, délai du premier token (streaming),
+    tokens, tentatives échouées, coût estimé ; étiqueté par pipeline et session.
+    """
+
+    def __init__(self, pipeline: str, session: str = None, agregateur: AgregateurMetriques = None):
+        self.pipeline = pipeline
+        self.session = session or _session_courante()
+        self.agregateur = agregateur or _agregateur
+        self._en_cours = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        mesure = {
+            "debut": time.perf_counter(),
+            "premier_token": None,
+            "modele": (metadata or {}).get("ls_model_name") or (serialized.get("kwargs") or {}).get("model_name"),
+            "tentatives_echouees": 0,
+        }
+        self._en_cours[run_id] = mesure
+        _appel_courant.mesure = mesure
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        mesure = self._en_cours.get(run_id)
+        if mesure is not None and mesure["premier_token"] is None and token:
+            mesure["premier_token"] = time.perf_counter()
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        usage = {}
+        generation = response.generations[0][0] if response.generations and response.generations[0] else None
+        message = getattr(generation, "message", None)
+        if message is not None and getattr(message, "usage_metadata", None):
+            usage = message.usage_metadata
+        modele = (response.llm_output or {}).get("model_name")
+        self._terminer(run_id, usage.get("input_tokens"), usage.get("output_tokens"), None, modele)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._terminer(run_id, None, None, f"{type(error).__name__}: {str(error)[:200]}", None)
+
+    def _terminer(self, run_id, tokens_prompt, tokens_completion, erreur, modele):
+        mesure = self._en_cours.pop(run_id, None)
+        if mesure is None:
+            return
+        if getattr(_appel_courant, "mesure", None) is mesure:
+            _appel_courant.mesure = None
+        fin = time.perf_counter()
+        modele = mesure["modele"] or modele or "inconnu"
+        self.agregateur.enregistrer({
+            "horodatage": datetime.now().isoformat(timespec="seconds"),
+            "pipeline": self.pipeline,
+            "session": self.session,
+            "modele": modele,
+            "duree_ms": round((fin - mesure["debut"]) * 1000, 1),
+            "ttft_ms": round((mesure["premier_token"] - mesure["debut"]) * 1000, 1) if mesure["premier_token"] else None,
+            "tokens_prompt": tokens_prompt,
+            "tokens_completion": tokens_completion,
+            "tentatives_echouees": mesure["tentatives_echouees"],
+            "cout_usd": estimer_cout(modele, tokens_prompt, tokens_completion),
+            "erreur": erreur,
+        })
+
+
+def config_llm(pipeline: str, session: str = None, **config) -> dict:
+    """Config LangChain (invoke/stream) qui mesure les appels LLM sous l'étiquette `pipeline`."""
+    return {
+        **config,
+        "callbacks": [*config.get("callbacks", []), TelemetrieLLM(pipeline, session)],
+        "metadata": {**config.get("metadata", {}), "pipeline": pipeline},
+    }
+
+
+# ==============================
+# LECTURE DU FICHIER
+# ==============================
+def resumer_fichier(chemin: str) -> list[dict]:
+    """Synthèse par (pipeline, modèle) d'un fichier de métriques JSONL."""
+    agregateur = AgregateurMetriques(intervalle_s=float("inf"), taille_max=float("inf"), nb_max_durees=None)
+    with open(chemin, encoding="utf-8") as f:
+        for ligne in f:
+            if ligne.strip():
+                agregateur.enregistrer(json.loads(ligne))
+    return agregateur.synthese()
+
+
+def main(arguments: list = None) -> None:
+    """python -m core.telemetrie_llm [fichier] : synthèse des appels LLM enregistrés."""
+    parser = argparse.ArgumentParser(description="Synthèse des métriques d'appels LLM")
+    parser.add_argument("fichier", nargs="?", default=os.getenv("METRIQUES_LLM_PATH", METRIQUES_LLM_PATH))
+    args = parser.parse_args(arguments)
+    if not Path(args.fichier).exists():
+        parser.exit(1, f"Aucune métrique enregistrée : {args.fichier}\n")
+    for ligne in resumer_fichier(args.fichier):
+        print(f"{ligne['pipeline']:<16} {ligne['modele']:<45} {ligne['appels']:>6} appels  "
+              f"p50 {ligne['duree_p50_ms']:>8.0f} ms  p95 {ligne['duree_p95_ms']:>8.0f} ms  "
+              f"{ligne['tokens_prompt'] + ligne['tokens_completion']:>9} tokens  "
+              f"{ligne['cout_usd']:>9.4f} $  {ligne['erreurs']} erreur(s)  {ligne['tentatives_echouees']} réessai(s)")
+
+
+if __name__ == "__main__":
+    main()
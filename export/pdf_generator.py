@@ -1,15 +1,30 @@
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.styles import ParagraphStyle
 from reportlab.lib.units import cm
 from reportlab.platypus import (
     SimpleDocTemplate, Paragraph, Spacer, Table,
     TableStyle, HRFlowable
 )
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from collections import OrderedDict
 from datetime import datetime
+from functools import lru_cache
+from types import MappingProxyType
+import copy
+import hashlib
 import io
-from config import PERFORMANCE_RATIO_DEFAULT, TARIF_KWH_DEFAULT_FCFA
+import json
+import logging
+import threading
+from config import PERFORMANCE_RATIO_DEFAULT, TARIF_KWH_DEFAULT_FCFA, TAILLE_MAX_CACHE_PDF_OCTETS
+from core.resultats import comme_dimensionnement, comme_rentabilite
+
+logger = logging.getLogger(__name__)
+
+# Incrémenter à chaque modification de la mise en page : invalide les rapports en cache
+VERSION_TEMPLATE_PDF = "1"
+
 
 # ==============================
 # COULEURS
@@ -26,71 +41,107 @@ ROUGE = colors.HexColor("#E74C3C")
 # ==============================
 # STYLES
 # ==============================
-def get_styles():
-    styles = getSampleStyleSheet()
-
-    styles.add(ParagraphStyle(
-        name="Titre",
-        fontSize=22,
-        textColor=BLEU_MARINE,
-        fontName="Helvetica-Bold",
-        alignment=TA_CENTER,
-        spaceAfter=6
-    ))
-
-    styles.add(ParagraphStyle(
-        name="SousTitre",
-        fontSize=11,
-        textColor=GRIS_TEXTE,
-        fontName="Helvetica",
-        alignment=TA_CENTER,
-        spaceAfter=20
-    ))
-
-    styles.add(ParagraphStyle(
-        name="SectionTitre",
-        fontSize=13,
-        textColor=BLANC,
-        fontName="Helvetica-Bold",
-        alignment=TA_LEFT,
-        spaceAfter=0,
-        spaceBefore=0,
-        leftIndent=8
-    ))
-
-    styles.add(ParagraphStyle(
-        name="Avertissement",
-        fontSize=9,
-        textColor=ROUGE,
-        fontName="Helvetica-Bold",
-        spaceAfter=4
-    ))
-
-    styles.add(ParagraphStyle(
-        name="Footer",
-        fontSize=8,
-        textColor=GRIS_TEXTE,
-        alignment=TA_CENTER
-    ))
-
-    return styles
+def get_styles() -> MappingProxyType:
+    """Styles de paragraphe du rapport (partagés, en lecture seule)."""
+    return template_rapport().styles
+
+
+def _creer_styles() -> MappingProxyType:
+    styles = {
+        "Titre": ParagraphStyle(
+            name="Titre",
+            fontSize=22,
+            textColor=BLEU_MARINE,
+            fontName="Helvetica-Bold",
+            alignment=TA_CENTER,
+            spaceAfter=6
+        ),
+        "SousTitre": ParagraphStyle(
+            name="SousTitre",
+            fontSize=11,
+            textColor=GRIS_TEXTE,
+            fontName="Helvetica",
+            alignment=TA_CENTER,
+            spaceAfter=20
+        ),
+        "SectionTitre": ParagraphStyle(
+            name="SectionTitre",
+            fontSize=13,
+            textColor=BLANC,
+            fontName="Helvetica-Bold",
+            alignment=TA_LEFT,
+            spaceAfter=0,
+            spaceBefore=0,
+            leftIndent=8
+        ),
+        "Avertissement": ParagraphStyle(
+            name="Avertissement",
+            fontSize=9,
+            textColor=ROUGE,
+            fontName="Helvetica-Bold",
+            spaceAfter=4
+        ),
+        "Footer": ParagraphStyle(
+            name="Footer",
+            fontSize=8,
+            textColor=GRIS_TEXTE,
+            alignment=TA_CENTER
+        ),
+    }
+    return MappingProxyType(styles)
+
+
+STYLE_SECTION = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, -1), BLEU_MARINE),
+    ("TOPPADDING", (0, 0), (-1, -1), 8),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
+    ("LEFTPADDING", (0, 0), (-1, -1), 12),
+])
+
+STYLE_TABLEAU_DONNEES = TableStyle([
+    ("FONTNAME", (0, 0), (0, -1), "Helvetica"),
+    ("FONTNAME", (1, 0), (1, -1), "Helvetica-Bold"),
+    ("FONTSIZE", (0, 0), (-1, -1), 10),
+    ("TEXTCOLOR", (0, 0), (0, -1), GRIS_TEXTE),
+    ("TEXTCOLOR", (1, 0), (1, -1), BLEU_MARINE),
+    ("ROWBACKGROUNDS", (0, 0), (-1, -1), [BLANC, GRIS_CLAIR]),
+    ("TOPPADDING", (0, 0), (-1, -1), 7),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 7),
+    ("LEFTPADDING", (0, 0), (-1, -1), 12),
+    ("RIGHTPADDING", (0, 0), (-1, -1), 12),
+    ("BOX", (0, 0), (-1, -1), 0.5, colors.HexColor("#e0e0e0")),
+    ("LINEBELOW", (0, 0), (-1, -1), 0.25, colors.HexColor("#e0e0e0")),
+])
+
+STYLE_TABLEAU_PROJECTION = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), BLEU_MARINE),
+    ("TEXTCOLOR", (0, 0), (-1, 0), BLANC),
+    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ("FONTNAME", (0, 1), (-1, -1), "Helvetica"),
+    ("FONTSIZE", (0, 0), (-1, -1), 9),
+    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+    ("TOPPADDING", (0, 0), (-1, -1), 6),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+    ("ROWBACKGROUNDS", (0, 1), (-1, -1), [BLANC, GRIS_CLAIR]),
+    ("TEXTCOLOR", (0, 1), (-1, -1), BLEU_MARINE),
+    ("BOX", (0, 0), (-1, -1), 0.5, colors.HexColor("#e0e0e0")),
+    ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#e0e0e0")),
+])
 
 
 # ==============================
 # COMPOSANTS RÉUTILISABLES
 # ==============================
-def creer_header_section(titre: str, styles) -> list:
+def creer_header_section(titre: str | Paragraph, styles) -> list:
+    """Bandeau de section ; titre en texte ou déjà analysé (Paragraph du template)."""
     elements = []
     elements.append(Spacer(1, 0.3 * cm))
 
-    header_data = [[Paragraph(titre, styles["SectionTitre"])]]
+    if not isinstance(titre, Paragraph):
+        titre = Paragraph(titre, styles["SectionTitre"])
+    header_data = [[titre]]
     header_table = Table(header_data, colWidths=[17 * cm])
-    header_table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, -1), BLEU_MARINE),
-        ("TOPPADDING", (0, 0), (-1, -1), 8),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
-        ("LEFTPADDING", (0, 0), (-1, -1), 12),
-    ]))
+    header_table.setStyle(STYLE_SECTION)
     elements.append(header_table)
     elements.append(Spacer(1, 0.2 * cm))
     return elements
@@ -100,63 +151,106 @@ def creer_tableau_donnees(donnees: list) -> Table:
     table_data = [[label, valeur] for label, valeur in donnees]
 
     table = Table(table_data, colWidths=[8.5 * cm, 8.5 * cm])
-    table.setStyle(TableStyle([
-        ("FONTNAME", (0, 0), (0, -1), "Helvetica"),
-        ("FONTNAME", (1, 0), (1, -1), "Helvetica-Bold"),
-        ("FONTSIZE", (0, 0), (-1, -1), 10),
-        ("TEXTCOLOR", (0, 0), (0, -1), GRIS_TEXTE),
-        ("TEXTCOLOR", (1, 0), (1, -1), BLEU_MARINE),
-        ("ROWBACKGROUNDS", (0, 0), (-1, -1), [BLANC, GRIS_CLAIR]),
-        ("TOPPADDING", (0, 0), (-1, -1), 7),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 7),
-        ("LEFTPADDING", (0, 0), (-1, -1), 12),
-        ("RIGHTPADDING", (0, 0), (-1, -1), 12),
-        ("BOX", (0, 0), (-1, -1), 0.5, colors.HexColor("#e0e0e0")),
-        ("LINEBELOW", (0, 0), (-1, -1), 0.25, colors.HexColor("#e0e0e0")),
-    ]))
+    table.setStyle(STYLE_TABLEAU_DONNEES)
     return table
 
 
-def creer_tableau_projection(projection: list) -> Table:
+def creer_tableau_projection(projection: tuple) -> Table:
     entetes = ["Annee", "Economies cumulees (FCFA)", "Statut"]
     table_data = [entetes]
 
     for p in projection:
-        statut = "Benefice" if p["economies_cumulees"] >= 0 else "En cours..."
+        statut = "Benefice" if p.economies_cumulees >= 0 else "En cours..."
         table_data.append([
-            str(p["annee"]),
-            f"{p['economies_cumulees']:,.0f}",
+            str(p.annee),
+            f"{p.economies_cumulees:,.0f}",
             statut
         ])
 
     table = Table(table_data, colWidths=[3 * cm, 8 * cm, 6 * cm])
-    table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), BLEU_MARINE),
-        ("TEXTCOLOR", (0, 0), (-1, 0), BLANC),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-        ("FONTNAME", (0, 1), (-1, -1), "Helvetica"),
-        ("FONTSIZE", (0, 0), (-1, -1), 9),
-        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-        ("TOPPADDING", (0, 0), (-1, -1), 6),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [BLANC, GRIS_CLAIR]),
-        ("TEXTCOLOR", (0, 1), (-1, -1), BLEU_MARINE),
-        ("BOX", (0, 0), (-1, -1), 0.5, colors.HexColor("#e0e0e0")),
-        ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#e0e0e0")),
-    ]))
+    table.setStyle(STYLE_TABLEAU_PROJECTION)
     return table
 
 
+# ==============================
+# TEMPLATE DU RAPPORT
+# ==============================
+TITRES_SECTIONS = (
+    "RESULTATS DU DIMENSIONNEMENT",
+    "DETAILS COMPOSANTS",
+    "AVERTISSEMENTS",
+    "FICHE TECHNIQUE",
+    "PROJECTION RENTABILITE 10 ANS",
+)
+
+
+class TemplateRapport:
+    """
+    Parties fixes du rapport, construites une fois par processus (template_rapport()) :
+    styles en lecture seule, en-tête, titres de section et filet de pied de page.
+    Chaque rendu en reçoit des copies superficielles, de sorte que l'état de mise en page
+    (dimensions calculées, report de page) reste propre au document en cours.
+    """
+
+    def __init__(self):
+        self.styles = _creer_styles()
+        self._entete = (
+            Paragraph("Raana", self.styles["Titre"]),
+            Paragraph("Rapport de dimensionnement photovoltaique off-grid", self.styles["SousTitre"]),
+            HRFlowable(width="100%", thickness=2, color=ORANGE),
+            Spacer(1, 0.3 * cm),
+        )
+        self._titres_sections = MappingProxyType({
+            titre: Paragraph(titre, self.styles["SectionTitre"]) for titre in TITRES_SECTIONS
+        })
+        self._pied = (
+            Spacer(1, 0.5 * cm),
+            HRFlowable(width="100%", thickness=1, color=ORANGE),
+            Spacer(1, 0.2 * cm),
+        )
+
+    def entete(self) -> list:
+        return [copy.copy(f) for f in self._entete]
+
+    def section(self, titre: str) -> list:
+        return creer_header_section(copy.copy(self._titres_sections[titre]), self.styles)
+
+    def pied(self) -> list:
+        return [copy.copy(f) for f in self._pied]
+
+
+@lru_cache(maxsize=1)
+def template_rapport() -> TemplateRapport:
+    return TemplateRapport()
+
+
 # ==============================
 # GÉNÉRATION DU PDF
 # ==============================
 def generer_pdf_dimensionnement(
-    dim: dict,
+    dim,
     localisation: dict,
-    rentabilite: dict = None,
+    rentabilite=None,
     moyenne: dict = None,
     parametres: dict = None
 ) -> bytes:
+    """
+    Génère le rapport PDF. dim et rentabilite acceptent les objets typés
+    de core.resultats ou les dicts historiques.
+    """
+    return rendre_pdf_dimensionnement(dim, localisation, rentabilite, moyenne, parametres)[0]
+
+
+def rendre_pdf_dimensionnement(
+    dim,
+    localisation: dict,
+    rentabilite=None,
+    moyenne: dict = None,
+    parametres: dict = None
+) -> tuple[bytes, int]:
+    """Rapport PDF et son nombre de pages (exports en série)."""
+    dim = comme_dimensionnement(dim)
+    rentabilite = comme_rentabilite(rentabilite)
 
     buffer = io.BytesIO()
     doc = SimpleDocTemplate(
@@ -168,7 +262,8 @@ def generer_pdf_dimensionnement(
         bottomMargin=2 * cm
     )
 
-    styles = get_styles()
+    template = template_rapport()
+    styles = template.styles
     story = []
     ville = localisation["ville"].split(",")[0] if localisation else "—"
     date_rapport = datetime.now().strftime("%d/%m/%Y a %H:%M")
@@ -176,36 +271,33 @@ def generer_pdf_dimensionnement(
     # ==============================
     # EN-TÊTE
     # ==============================
-    story.append(Paragraph("Raana", styles["Titre"]))
-    story.append(Paragraph("Rapport de dimensionnement photovoltaique off-grid", styles["SousTitre"]))
-    story.append(HRFlowable(width="100%", thickness=2, color=ORANGE))
-    story.append(Spacer(1, 0.3 * cm))
+    story.extend(template.entete())
 
     infos_data = [
         ["Localisation", ville],
         ["Date du rapport", date_rapport],
-        ["Source consommation", "Equipements" if dim["source_consommation"] == "equipements" else "Factures"],
-        ["Consommation journaliere", f"{dim['consommation_journaliere_kwh']} kWh/j"],
+        ["Source consommation", "Equipements" if dim.source_consommation == "equipements" else "Factures"],
+        ["Consommation journaliere", f"{dim.consommation_journaliere_kwh} kWh/j"],
     ]
     story.append(creer_tableau_donnees(infos_data))
 
     # ==============================
     # RÉSULTATS DE BASE
     # ==============================
-    story.extend(creer_header_section("RESULTATS DU DIMENSIONNEMENT", styles))
+    story.extend(template.section("RESULTATS DU DIMENSIONNEMENT"))
 
     donnees_base = [
-        ["Puissance installee", f"{dim['puissance_installee_kwc']} kWc"],
-        ["Nombre de panneaux", f"{dim['nombre_panneaux']} x {dim['puissance_panneau_wc']} Wc"],
-        ["Capacite batterie totale", f"{dim['batterie']['capacite_ah']} Ah - {dim['batterie']['tension_v']} V"],
-        ["Autonomie", f"{dim['batterie']['autonomie_jours']} jour(s)"],
-        ["Onduleur recommande", f"{dim['puissance_onduleur_recommandee_kva']} kVA ({dim['puissance_onduleur_recommandee_w']} W)"],
+        ["Puissance installee", f"{dim.puissance_installee_kwc} kWc"],
+        ["Nombre de panneaux", f"{dim.nombre_panneaux} x {dim.puissance_panneau_wc:g} Wc"],
+        ["Capacite batterie totale", f"{dim.batterie.capacite_ah} Ah - {dim.batterie.tension_v} V"],
+        ["Autonomie", f"{dim.batterie.autonomie_jours} jour(s)"],
+        ["Onduleur recommande", f"{dim.puissance_onduleur_recommandee_kva} kVA ({dim.puissance_onduleur_recommandee_w} W)"],
     ]
 
     if rentabilite:
         donnees_base += [
-            ["Retour sur investissement", f"{rentabilite['temps_retour_ans']} ans"],
-            ["Economies annuelles estimees", f"{rentabilite['economies_annuelles']:,.0f} FCFA"],
+            ["Retour sur investissement", f"{rentabilite.temps_retour_ans} ans"],
+            ["Economies annuelles estimees", f"{rentabilite.economies_annuelles:,.0f} FCFA"],
         ]
 
     story.append(creer_tableau_donnees(donnees_base))
@@ -215,53 +307,45 @@ def generer_pdf_dimensionnement(
     # ==============================
     lignes_composants = []
 
-    if dim.get("configuration_strings"):
-        config_strings = dim["configuration_strings"]
-        for s in config_strings.get("strings", []):
-            if s.get("nb_panneaux_affectes", 0) > 0:
-                num = s["numero_string"]
+    if dim.configuration_strings:
+        for s in dim.configuration_strings.strings:
+            if s.nb_panneaux_affectes > 0:
+                num = s.numero_string
                 lignes_composants += [
-                    [f"Entree PV {num} - Serie", f"{s['nb_serie_affecte']} panneaux"],
-                    [f"Entree PV {num} - Parallele", f"{s['nb_parallele_affecte']} string(s)"],
-                    [f"Entree PV {num} - Total affecte", f"{s['nb_panneaux_affectes']} panneaux"],
+                    [f"Entree PV {num} - Serie", f"{s.nb_serie_affecte} panneaux"],
+                    [f"Entree PV {num} - Parallele", f"{s.nb_parallele_affecte} string(s)"],
+                    [f"Entree PV {num} - Total affecte", f"{s.nb_panneaux_affectes} panneaux"],
                 ]
-                if s.get("tension_string_v"):
-                    lignes_composants.append([f"Entree PV {num} - Tension", f"{s['tension_string_v']} V"])
+                if s.tension_string_v:
+                    lignes_composants.append([f"Entree PV {num} - Tension", f"{s.tension_string_v} V"])
 
-    if dim.get("surface_champ"):
-        sf = dim["surface_champ"]
+    if dim.surface_champ:
+        sf = dim.surface_champ
         lignes_composants += [
-            ["Surface champ PV", f"{sf['surface_totale_m2']} m2 (avec aeration x1.1)"],
-            ["Surface par module", f"{sf['surface_module_m2']} m2"],
+            ["Surface champ PV", f"{sf.surface_totale_m2} m2 (avec aeration x1.1)"],
+            ["Surface par module", f"{sf.surface_module_m2} m2"],
         ]
 
-    if dim.get("configuration_batterie"):
-        cb = dim["configuration_batterie"]
+    if dim.configuration_batterie:
+        cb = dim.configuration_batterie
         lignes_composants += [
-            ["Configuration batterie", f"{cb['nb_batteries_serie']}S x {cb['nb_batteries_parallele']}P"],
-            ["Nombre total de batteries", f"{cb['nb_batteries_total']} unites"],
-            ["Tension parc batterie", f"{cb['tension_parc_v']} V"],
-            ["Capacite reelle", f"{cb['capacite_reelle_ah']} Ah"],
+            ["Configuration batterie", f"{cb.nb_batteries_serie}S x {cb.nb_batteries_parallele}P"],
+            ["Nombre total de batteries", f"{cb.nb_batteries_total} unites"],
+            ["Tension parc batterie", f"{cb.tension_parc_v} V"],
+            ["Capacite reelle", f"{cb.capacite_reelle_ah} Ah"],
         ]
 
     if lignes_composants:
-        story.extend(creer_header_section("DETAILS COMPOSANTS", styles))
+        story.extend(template.section("DETAILS COMPOSANTS"))
         story.append(creer_tableau_donnees(lignes_composants))
 
     # ==============================
     # AVERTISSEMENTS
     # ==============================
-    avertissements = []
-    if dim.get("configuration_strings"):
-        for avert in dim["configuration_strings"].get("avertissements", []):
-            avertissements.append(avert)
-    if dim.get("configuration_batterie"):
-        b = dim["configuration_batterie"]
-        if b.get("avertissement_tension"):
-            avertissements.append(b["avertissement_tension"])
+    avertissements = dim.avertissements
 
     if avertissements:
-        story.extend(creer_header_section("AVERTISSEMENTS", styles))
+        story.extend(template.section("AVERTISSEMENTS"))
         for avert in avertissements:
             story.append(Paragraph(f"- {avert}", styles["Avertissement"]))
             story.append(Spacer(1, 0.2 * cm))
@@ -269,23 +353,23 @@ def generer_pdf_dimensionnement(
     # ==============================
     # FICHE TECHNIQUE
     # ==============================
-    story.extend(creer_header_section("FICHE TECHNIQUE", styles))
+    story.extend(template.section("FICHE TECHNIQUE"))
 
     tarif = moyenne["tarif_moyen_fcfa_kwh"] if moyenne else (
         float(parametres["tarif_kwh"]) if parametres else TARIF_KWH_DEFAULT_FCFA
     )
 
     fiche_data = [
-        ["Consommation journaliere", f"{dim['consommation_journaliere_kwh']} kWh/j"],
-        ["HSP utilise", f"{dim['hsp_utilise']} h/j"],
+        ["Consommation journaliere", f"{dim.consommation_journaliere_kwh} kWh/j"],
+        ["HSP utilise", f"{dim.hsp_utilise} h/j"],
         ["Performance Ratio", f"{PERFORMANCE_RATIO_DEFAULT} (standard off-grid)"],
-        ["Puissance crete necessaire", f"{dim['puissance_crete_necessaire_wc']} Wc"],
-        ["Profondeur de decharge", f"{int(dim['batterie']['profondeur_decharge'] * 100)} %"],
+        ["Puissance crete necessaire", f"{dim.puissance_crete_necessaire_wc} Wc"],
+        ["Profondeur de decharge", f"{int(dim.batterie.profondeur_decharge * 100)} %"],
         ["Tarif kWh utilise", f"{tarif} FCFA/kWh"],
     ]
 
     if rentabilite:
-        fiche_data.append(["Cout total installation", f"{rentabilite['cout_total_installation']:,.0f} FCFA"])
+        fiche_data.append(["Cout total installation", f"{rentabilite.cout_total_installation:,.0f} FCFA"])
 
     story.append(creer_tableau_donnees(fiche_data))
 
@@ -293,20 +377,104 @@ def generer_pdf_dimensionnement(
     # PROJECTION RENTABILITÉ
     # ==============================
     if rentabilite:
-        story.extend(creer_header_section("PROJECTION RENTABILITE 10 ANS", styles))
-        story.append(creer_tableau_projection(rentabilite["projection_10_ans"]))
+        story.extend(template.section("PROJECTION RENTABILITE 10 ANS"))
+        story.append(creer_tableau_projection(rentabilite.projection_10_ans))
 
     # ==============================
     # PIED DE PAGE
     # ==============================
-    story.append(Spacer(1, 0.5 * cm))
-    story.append(HRFlowable(width="100%", thickness=1, color=ORANGE))
-    story.append(Spacer(1, 0.2 * cm))
+    story.extend(template.pied())
     story.append(Paragraph(
         f"Rapport genere par Raana le {date_rapport}",
         styles["Footer"]
     ))
 
     doc.build(story)
-    buffer.seek(0)
-    return buffer.getvalue()
\ No newline at end of file
+    return buffer.getvalue(), doc.page
+
+
+# ==============================
+# CACHE DES RAPPORTS
+# ==============================
+def cle_rapport_pdf(dim, localisation: dict, rentabilite=None, moyenne: dict = None, parametres: dict = None) -> str:
+    """Empreinte stable des entrées du rapport et de la version du template."""
+    dim = comme_dimensionnement(dim)
+    rentabilite = comme_rentabilite(rentabilite)
+    contenu = json.dumps(
+        {
+            "dim": dim.to_dict(),
+            "localisation": localisation,
+            "rentabilite": rentabilite.to_dict() if rentabilite else None,
+            "moyenne": moyenne,
+            "parametres": parametres,
+            "template": VERSION_TEMPLATE_PDF,
+        },
+        sort_keys=True,
+        default=str,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(contenu.encode("utf-8")).hexdigest()
+
+
+class CachePdf:
+    """Rapports PDF par clé, LRU borné en octets (thread-safe : le téléchargement s'exécute hors du script)."""
+
+    def __init__(self, taille_max_octets: int = TAILLE_MAX_CACHE_PDF_OCTETS):
+        self.taille_max_octets = taille_max_octets
+        self._rapports: OrderedDict[str, bytes] = OrderedDict()
+        self._taille = 0
+        self._verrou = threading.Lock()
+
+    def lire(self, cle: str) -> bytes | None:
+        with self._verrou:
+            pdf = self._rapports.get(cle)
+            if pdf is not None:
+                self._rapports.move_to_end(cle)
+            return pdf
+
+    def enregistrer(self, cle: str, pdf: bytes) -> None:
+        if len(pdf) > self.taille_max_octets:
+            return
+        with self._verrou:
+            ancien = self._rapports.pop(cle, None)
+            self._taille += len(pdf) - len(ancien or b"")
+            self._rapports[cle] = pdf
+            while self._taille > self.taille_max_octets:
+                _, evince = self._rapports.popitem(last=False)
+                self._taille -= len(evince)
+
+    def vider(self) -> None:
+        with self._verrou:
+            self._rapports.clear()
+            self._taille = 0
+
+    @property
+    def taille_octets(self) -> int:
+        return self._taille
+
+    def __len__(self) -> int:
+        return len(self._rapports)
+
+
+_cache_pdf = CachePdf()
+
+
+def obtenir_pdf_dimensionnement(
+    dim,
+    localisation: dict,
+    rentabilite=None,
+    moyenne: dict = None,
+    parametres: dict = None
+) -> bytes:
+    """Rapport PDF depuis le cache, généré seulement si ces entrées n'ont jamais été rendues."""
+    cle = cle_rapport_pdf(dim, localisation, rentabilite, moyenne, parametres)
+    pdf = _cache_pdf.lire(cle)
+    if pdf is None:
+        pdf = generer_pdf_dimensionnement(dim, localisation, rentabilite, moyenne, parametres)
+        _cache_pdf.enregistrer(cle, pdf)
+        logger.info("Rapport PDF généré (%d Ko, %d en cache)", len(pdf) // 1024, len(_cache_pdf))
+    return pdf
+
+
+def vider_cache_pdf() -> None:
+    _cache_pdf.vider()
@@ -0,0 +1,216 @@
+import argparse
+import json
+import logging
+import math
+import os
+import re
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import fitz
+from config import TAILLE_LOT_PORTEFEUILLE, TARIF_KWH_DEFAULT_FCFA
+from core.batch import calculer_site, lire_sites, _valeur
+from export.pdf_generator import rendre_pdf_dimensionnement
+
+logger = logging.getLogger(__name__)
+
+
+# ==============================
+# RENDU D'UN LOT (PROCESSUS DU POOL)
+# ==============================
+def _nom_rapport(site: dict) -> str:
+    nom = re.sub(r"[^\w.-]+", "_", str(site["site_id"])).strip("_") or "site"
+    return f"rapport_{nom}.pdf"
+
+
+def rendre_rapport_site(site: dict) -> dict:
+    """
+    Dimensionne un site et rend son rapport PDF :
+    {site_id, nom_fichier, titre, pdf, pages, erreur}. Une erreur n'interrompt pas le lot.
+    """
+    titre = str(_valeur(site, "ville") or _valeur(site, "nom") or site["site_id"])
+    rapport = {"site_id": str(site["site_id"]), "nom_fichier": _nom_rapport(site), "titre": titre,
+               "pdf": None, "pages": 0, "erreur": None}
+    try:
+        dim, rentabilite, _ = calculer_site(site)
+        rapport["pdf"], rapport["pages"] = rendre_pdf_dimensionnement(
+            dim,
+            {"ville": titre},
+            rentabilite,
+            None,
+            {"tarif_kwh": float(_valeur(site, "tarif_kwh") or TARIF_KWH_DEFAULT_FCFA)},
+        )
+    except Exception as e:
+        # Donnée invalide, catalogue ou rendu ReportLab : le site est consigné en erreur, le lot continue
+        rapport["erreur"] = str(e) or type(e).__name__
+    return rapport
+
+
+def rendre_lot(sites: list) -> list[dict]:
+    """Exécuté dans un processus du pool : un lot de sites → leurs rapports, dans l'ordre."""
+    return [rendre_rapport_site(site) for site in sites]
+
+
+# ==============================
+# ÉCRITURE EN FLUX
+# ==============================
+class _SortieZip:
+    """Un PDF par site ; les PDF étant déjà compressés, ils sont stockés tels quels."""
+
+    def __init__(self, chemin: Path):
+        self._zip = zipfile.ZipFile(chemin, "w", compression=zipfile.ZIP_STORED)
+        self._noms = set()
+
+    def _nom_unique(self, nom: str) -> str:
+        # Identifiants distincts mais identiques une fois nettoyés (« a/b », « a b ») : suffixe -2, -3...
+        base, extension = nom.rsplit(".", 1)
+        n = 1
+        while nom in self._noms:
+            n += 1
+            nom = f"{base}-{n}.{extension}"
+        self._noms.add(nom)
+        return nom
+
+    def ajouter(self, rapport: dict) -> None:
+        self._zip.writestr(self._nom_unique(rapport["nom_fichier"]), rapport["pdf"])
+
+    def fermer(self, erreurs: list) -> None:
+        if erreurs:
+            self._zip.writestr("erreurs.json", json.dumps(erreurs, ensure_ascii=False, indent=2))
+        self._zip.close()
+
+
+class _SortiePdfUnique:
+    """
+    Rapports concaténés dans un seul PDF, avec un signet (table des matières) par site.
+    Le document est assemblé en mémoire et écrit à la fermeture : la mémoire croît avec
+    le portefeuille (environ deux fois la taille du PDF final). Sortie .zip pour un export en flux.
+    """
+
+    def __init__(self, chemin: Path):
+        self._chemin = chemin
+        self._doc = fitz.open()
+        self._sommaire = []
+
+    def ajouter(self, rapport: dict) -> None:
+        self._sommaire.append([1, rapport["titre"], len(self._doc) + 1])
+        with fitz.open(stream=rapport["pdf"], filetype="pdf") as source:
+            self._doc.insert_pdf(source)
+
+    def fermer(self, erreurs: list) -> None:
+        # Sites en échec dans un fichier voisin <sortie>.erreurs.json, comme erreurs.json dans l'archive zip
+        fichier_erreurs = self._chemin.with_name(self._chemin.name + ".erreurs.json")
+        if erreurs:
+            fichier_erreurs.write_text(json.dumps(erreurs, ensure_ascii=False, indent=2), encoding="utf-8")
+        else:
+            fichier_erreurs.unlink(missing_ok=True)
+        if len(self._doc) == 0:
+            # Aucun rapport rendu (tous les sites en erreur ou interruption précoce) : pas de PDF vide
+            logger.warning("Aucun rapport à écrire : %s non créé", self._chemin)
+        else:
+            self._doc.set_toc(self._sommaire)
+            self._doc.save(str(self._chemin), garbage=1, deflate=True)
+        self._doc.close()
+
+
+# ==============================
+# EXÉCUTION
+# ==============================
+def exporter_portefeuille(
+    entree,
+    sortie,
+    nb_processus: int = None,
+    taille_lot: int = TAILLE_LOT_PORTEFEUILLE,
+) -> dict:
+    """
+    Rend un rapport PDF par site du fichier d'entrée (mêmes colonnes que core.batch,
+    plus ville ou nom optionnels pour le titre) et les écrit au fil de l'eau :
+    - sortie .zip : un PDF par site (+ erreurs.json si des sites ont échoué), écrit en flux
+    - sortie .pdf : un seul document, un signet par site, assemblé en mémoire
+      (+ <sortie>.erreurs.json si des sites ont échoué)
+
+    Les lots sont rendus sur un pool de processus ; au plus deux lots par processus
+    sont en attente. En sortie .zip, la mémoire reste ainsi bornée quel que soit le nombre
+    de sites ; le PDF unique, lui, grandit avec le portefeuille jusqu'à son écriture.
+    Les rapports sont écrits dans l'ordre du fichier d'entrée.
+
+    Retourne un récapitulatif (rapports, pages, erreurs, durée, pages/s).
+    """
+    if taille_lot < 1:
+        raise ValueError(f"Taille de lot invalide : {taille_lot}")
+    sortie = Path(sortie)
+    if sortie.suffix.lower() not in {".zip", ".pdf"}:
+        raise ValueError(f"Sortie non supportée : {sortie.suffix} (attendu .zip ou .pdf)")
+
+    debut = time.perf_counter()
+    enregistrements = lire_sites(entree).to_dict("records")
+    nb_lots = math.ceil(len(enregistrements) / taille_lot)
+    lots = (enregistrements[n * taille_lot:(n + 1) * taille_lot] for n in range(nb_lots))
+
+    sortie.parent.mkdir(parents=True, exist_ok=True)
+    ecrivain = _SortieZip(sortie) if sortie.suffix.lower() == ".zip" else _SortiePdfUnique(sortie)
+    nb_rapports, nb_pages, erreurs = 0, 0, []
+
+    nb_processus = nb_processus or os.cpu_count() or 1
+    fenetre = 2 * nb_processus
+    try:
+        with ProcessPoolExecutor(max_workers=nb_processus) as pool:
+            en_attente = deque()
+            for lot in lots:
+                en_attente.append(pool.submit(rendre_lot, lot))
+                while len(en_attente) >= fenetre:
+                    nb_rapports, nb_pages = _ecrire(en_attente.popleft().result(), ecrivain, erreurs, nb_rapports, nb_pages)
+            while en_attente:
+                nb_rapports, nb_pages = _ecrire(en_attente.popleft().result(), ecrivain, erreurs, nb_rapports, nb_pages)
+    except BaseException:
+        # Même interrompue, la sortie reste lisible (archive zip avec répertoire central),
+        # sans qu'un échec de la fermeture ne masque l'erreur d'origine
+        try:
+            ecrivain.fermer(erreurs)
+        except Exception:
+            logger.exception("Fermeture de %s impossible après interruption", sortie)
+        raise
+    ecrivain.fermer(erreurs)
+    duree = time.perf_counter() - debut
+    return {
+        "nb_rapports": nb_rapports,
+        "nb_pages": nb_pages,
+        "nb_erreurs": len(erreurs),
+        "nb_lots": nb_lots,
+        "duree_s": round(duree, 2),
+        "pages_par_seconde": round(nb_pages / duree, 1) if duree > 0 else None,
+        "rapports_par_seconde": round(nb_rapports / duree, 1) if duree > 0 else None,
+        "sortie": str(sortie),
+    }
+
+
+def _ecrire(rapports: list, ecrivain, erreurs: list, nb_rapports: int, nb_pages: int) -> tuple[int, int]:
+    for rapport in rapports:
+        if rapport["erreur"]:
+            erreurs.append({"site_id": rapport["site_id"], "erreur": rapport["erreur"]})
+            continue
+        ecrivain.ajouter(rapport)
+        nb_rapports += 1
+        nb_pages += rapport["pages"]
+    logger.info("%d rapport(s), %d page(s) écrits", nb_rapports, nb_pages)
+    return nb_rapports, nb_pages
+
+
+def main(arguments: list = None) -> None:
+    """python -m export.portefeuille sites.csv rapports.zip|rapports.pdf [--processus 8] [--taille-lot 50]"""
+    parser = argparse.ArgumentParser(description="Export des rapports PDF d'un portefeuille de sites")
+    parser.add_argument("entree", help="Fichier de sites (.csv ou .parquet)")
+    parser.add_argument("sortie", help="Archive .zip (un PDF par site, écrite en flux) ou .pdf unique avec signets (assemblé en mémoire)")
+    parser.add_argument("--processus", type=int, default=None, help="Nombre de processus (défaut : tous les cœurs)")
+    parser.add_argument("--taille-lot", type=int, default=TAILLE_LOT_PORTEFEUILLE, help="Rapports par lot")
+    args = parser.parse_args(arguments)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    recapitulatif = exporter_portefeuille(args.entree, args.sortie, args.processus, args.taille_lot)
+    print(json.dumps(recapitulatif, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
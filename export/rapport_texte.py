@@ -0,0 +1,75 @@
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from jinja2 import Environment, FileSystemLoader, StrictUndefined
+from config import TARIF_KWH_DEFAULT_FCFA
+from core.resultats import comme_dimensionnement, comme_rentabilite
+
+# ==============================
+# CONSTANTES
+# ==============================
+DOSSIER_TEMPLATES = Path(__file__).parent / "templates"
+TEMPLATE_RAPPORT = "rapport.md.j2"
+
+
+# ==============================
+# FORMATS
+# ==============================
+def _nombre(valeur: float, decimales: int = 2) -> str:
+    """1.5 -> '1,5' ; 48.0 -> '48' (format français, zéros inutiles retirés)."""
+    texte = f"{valeur:.{decimales}f}".rstrip("0").rstrip(".")
+    return texte.replace(".", ",")
+
+
+def _milliers(valeur: float) -> str:
+    """1250000 -> '1 250 000' (espace fine insécable comme séparateur de milliers)."""
+    return f"{valeur:,.0f}".replace(",", "\u202f")
+
+
+@lru_cache(maxsize=1)
+def _template():
+    """Environnement Jinja2 et template compilés une fois par processus."""
+    environnement = Environment(
+        loader=FileSystemLoader(DOSSIER_TEMPLATES),
+        undefined=StrictUndefined,
+        trim_blocks=True,
+        lstrip_blocks=True,
+        keep_trailing_newline=True,
+    )
+    environnement.filters["nombre"] = _nombre
+    environnement.filters["milliers"] = _milliers
+    return environnement.get_template(TEMPLATE_RAPPORT)
+
+
+# ==============================
+# RAPPORT
+# ==============================
+def generer_rapport_texte(
+    dim,
+    localisation: dict,
+    rentabilite=None,
+    moyenne: dict = None,
+    parametres: dict = None,
+    recommandations: str = None
+) -> str:
+    """
+    Rapport de dimensionnement en Markdown, sans appel LLM.
+    dim et rentabilite acceptent les objets typés de core.resultats ou les dicts historiques.
+    recommandations : texte optionnel (rédigé par l'agent) inséré dans la dernière section.
+    """
+    dim = comme_dimensionnement(dim)
+    rentabilite = comme_rentabilite(rentabilite)
+
+    tarif = moyenne["tarif_moyen_fcfa_kwh"] if (moyenne and moyenne.get("tarif_moyen_fcfa_kwh")) else (
+        float(parametres["tarif_kwh"]) if parametres else TARIF_KWH_DEFAULT_FCFA
+    )
+
+    return _template().render(
+        dim=dim,
+        rentabilite=rentabilite,
+        moyenne=moyenne,
+        tarif=tarif,
+        ville=localisation["ville"].split(",")[0] if localisation else "—",
+        date_rapport=datetime.now().strftime("%d/%m/%Y à %H:%M"),
+        recommandations=recommandations.strip() if recommandations else None,
+    )
@@ -0,0 +1,42 @@
+import logging
+import pytest
+from benchmarks.faux_groq import Scenario, demarrer_faux_groq
+from core.telemetrie_llm import agregateur_metriques
+
+
+def pytest_addoption(parser):
+    parser.addoption("--bench", action="store_true", default=False, help="Exécuter les benchmarks (marqueur bench)")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "bench: benchmark de performance, exécuté uniquement avec --bench")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--bench"):
+        return
+    ignore = pytest.mark.skip(reason="benchmark : lancer avec --bench")
+    for item in items:
+        if "bench" in item.keywords:
+            item.add_marker(ignore)
+
+
+@pytest.fixture(scope="session")
+def _faux_groq():
+    serveur = demarrer_faux_groq(retry_after_ms=1)
+    yield serveur
+    serveur.shutdown()
+    serveur.server_close()
+
+
+@pytest.fixture
+def faux_groq(_faux_groq, monkeypatch, tmp_path):
+    """Faux serveur Groq local (scénario par défaut, compteurs à zéro) utilisé via GROQ_BASE_URL."""
+    _faux_groq.scenario = Scenario()
+    _faux_groq.remettre_a_zero()
+    monkeypatch.setenv("GROQ_BASE_URL", _faux_groq.url)
+    monkeypatch.setenv("GROQ_API_KEY", "cle-factice")
+    monkeypatch.setenv("METRIQUES_LLM_PATH", str(tmp_path / "metriques_llm.jsonl"))
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    yield _faux_groq
+    agregateur_metriques().flush()
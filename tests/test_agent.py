@@ -0,0 +1,125 @@
+"""
+Tests unitaires pour agent/agent.py
+Couvre la fabrique d'agents partagée et la diffusion des réponses
+(aucun appel réseau : modèle factice scripté).
+"""
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGenerationChunk
+from langchain_core.tools import tool
+from langgraph.prebuilt import create_react_agent
+from agent.agent import (
+    OUTILS_AGENT,
+    diffuser_analyse,
+    obtenir_agent,
+    prechauffer_agent,
+    vider_cache_agents,
+    _client_llm,
+)
+
+
+# ==============================
+# FIXTURES
+# ==============================
+
+@pytest.fixture(autouse=True)
+def fabrique_vide(monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "cle-de-test")
+    vider_cache_agents()
+    yield
+    vider_cache_agents()
+
+
+class ModeleScripte(GenericFakeChatModel):
+    """Modèle factice : réponses scriptées, appels d'outils compris, diffusées token par token."""
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        message = next(self.messages)
+        if isinstance(message, Exception):
+            raise message
+        if message.tool_calls:
+            yield ChatGenerationChunk(message=AIMessageChunk(content=message.content, tool_call_chunks=[
+                {"name": a["name"], "args": '{"x": 1}', "id": a["id"], "index": i}
+                for i, a in enumerate(message.tool_calls)
+            ]))
+            return
+        for mot in message.content.split(" "):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=mot + " "))
+
+
+@tool
+def outil_test(x: int) -> dict:
+    """Outil de test."""
+    return {"x": x}
+
+
+def agent_scripte(*reponses):
+    modele = ModeleScripte(messages=iter(reponses))
+    return create_react_agent(model=modele, tools=[outil_test])
+
+
+# ==============================
+# obtenir_agent
+# ==============================
+
+class TestFabriqueAgent:
+    def test_agent_reutilise(self):
+        assert obtenir_agent() is obtenir_agent()
+
+    def test_cle_modele_temperature_outils(self):
+        defaut = obtenir_agent()
+        assert obtenir_agent(temperature=0.5) is not defaut
+        assert obtenir_agent(outils=OUTILS_AGENT[:1]) is not defaut
+
+    def test_client_http_partage(self):
+        a = _client_llm("modele-a", 0.1)
+        b = _client_llm("modele-b", 0.1)
+        assert a is not b
+        assert a.http_client is b.http_client
+
+    def test_concurrence(self):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            agents = list(pool.map(lambda _: obtenir_agent(), range(32)))
+        assert all(a is agents[0] for a in agents)
+
+    def test_prechauffage(self):
+        assert prechauffer_agent() is True
+
+    def test_prechauffage_sans_cle(self, monkeypatch):
+        monkeypatch.delenv("GROQ_API_KEY")
+        assert prechauffer_agent() is False
+
+
+# ==============================
+# diffuser_analyse
+# ==============================
+
+class TestDiffusion:
+    def test_tokens_et_outils(self):
+        agent = agent_scripte(
+            AIMessage(content="", tool_calls=[{"name": "outil_test", "args": {"x": 1}, "id": "a1"}]),
+            AIMessage(content="Rapport final complet"),
+        )
+        evenements = list(diffuser_analyse("Question", agent=agent))
+        outils = [(e["nom"], e["etat"]) for e in evenements if e["type"] == "outil"]
+        assert outils == [("outil_test", "appel"), ("outil_test", "termine")]
+        textes = [e["contenu"] for e in evenements if e["type"] == "texte"]
+        assert len(textes) == 3
+        assert "".join(textes).strip() == "Rapport final complet"
+
+    def test_erreur_apres_outil(self):
+        agent = agent_scripte(
+            AIMessage(content="Je calcule", tool_calls=[{"name": "outil_test", "args": {"x": 1}, "id": "a1"}]),
+            RuntimeError("quota dépassé"),
+        )
+        recu = []
+        with pytest.raises(RuntimeError, match="quota"):
+            for evenement in diffuser_analyse("Question", agent=agent):
+                recu.append(evenement)
+        assert any(e["type"] == "texte" for e in recu)
+        assert ("outil_test", "termine") in [(e.get("nom"), e.get("etat")) for e in recu]
@@ -0,0 +1,74 @@
+"""
+Tests unitaires pour core/balayage.py
+Vérifie la cohérence de la grille vectorisée avec les calculs scalaires de core/sizing.py.
+"""
+import pytest
+from core.balayage import balayer_dimensionnement, plage, vider_cache_balayage
+from core.sizing import calculer_puissance_crete, calculer_nombre_panneaux, calculer_batterie
+
+
+BASE = {"hsp": 5.0, "conso_journaliere_wh": 5000}
+
+
+# ==============================
+# plage
+# ==============================
+
+class TestPlage:
+    def test_bornes_incluses(self):
+        valeurs = plage(0.6, 0.8, 3)
+        assert valeurs == (0.6, 0.7, 0.8)
+
+    def test_nb_points_invalide(self):
+        with pytest.raises(ValueError, match="Nombre de points invalide"):
+            plage(0.6, 0.8, 0)
+
+
+# ==============================
+# balayer_dimensionnement
+# ==============================
+
+class TestBalayage:
+    def test_taille_produit_cartesien(self):
+        df = balayer_dimensionnement(
+            BASE,
+            performance_ratio=plage(0.5, 0.9, 5),
+            puissance_panneau_wc=[300, 400, 500],
+            tension_batterie_v=[12, 24],
+        )
+        assert len(df) == 5 * 3 * 2
+
+    def test_coherent_avec_sizing(self):
+        df = balayer_dimensionnement(
+            BASE, puissance_panneau_wc=[300, 450, 550], tension_batterie_v=[12, 24, 48]
+        )
+        for ligne in df.itertuples():
+            crete = calculer_puissance_crete(5000, 5.0)
+            assert ligne.puissance_crete_necessaire_wc == crete
+            assert ligne.nombre_panneaux == calculer_nombre_panneaux(crete, ligne.puissance_panneau_wc)
+            batterie = calculer_batterie(5000, tension_batterie_v=ligne.tension_batterie_v)
+            assert ligne.capacite_batterie_ah == batterie["capacite_ah"]
+
+    def test_colonnes_tidy(self):
+        df = balayer_dimensionnement(BASE, autonomie_jours=[1, 2])
+        for cle in ["hsp", "autonomie_jours", "nombre_panneaux", "capacite_batterie_ah", "puissance_installee_kwc"]:
+            assert cle in df.columns
+
+    def test_cache_par_definition(self):
+        vider_cache_balayage()
+        df1 = balayer_dimensionnement(BASE, autonomie_jours=[1, 2, 3])
+        df1["nombre_panneaux"] = -1  # la copie retournée ne doit pas polluer le cache
+        df2 = balayer_dimensionnement(BASE, autonomie_jours=[1, 2, 3])
+        assert (df2["nombre_panneaux"] > 0).all()
+
+    def test_parametre_inconnu(self):
+        with pytest.raises(ValueError, match="Paramètre non balayable"):
+            balayer_dimensionnement(BASE, couleur=[1, 2])
+
+    def test_consommation_requise(self):
+        with pytest.raises(ValueError, match="Consommation journalière requise"):
+            balayer_dimensionnement({"hsp": 5.0})
+
+    def test_hsp_invalide(self):
+        with pytest.raises(ValueError, match="HSP invalide"):
+            balayer_dimensionnement(BASE, hsp=[0.0, 5.0])
@@ -0,0 +1,142 @@
+"""
+Tests unitaires pour core/batch.py
+Couvre le dimensionnement d'un site, l'exécution par lots et la reprise après interruption.
+"""
+import json
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+from core import batch
+from core.batch import dimensionner_site, dimensionner_lot, executer_batch, lire_sites, SCHEMA_RESULTATS
+from core.catalogue import importer_catalogue, vider_cache_catalogue
+from core.sizing import calculer_dimensionnement_complet
+
+
+# ==============================
+# FIXTURES
+# ==============================
+
+@pytest.fixture(autouse=True)
+def catalogue_temporaire(tmp_path, monkeypatch):
+    monkeypatch.setenv("CATALOGUE_PATH", str(tmp_path / "catalogue.db"))
+    vider_cache_catalogue()
+    yield
+    vider_cache_catalogue()
+
+
+@pytest.fixture
+def fichier_sites(tmp_path):
+    chemin = tmp_path / "sites.csv"
+    pd.DataFrame({
+        "site_id": [f"S{i}" for i in range(25)],
+        "hsp": [5.0 + (i % 5) / 10 for i in range(25)],
+        "conso_journaliere_kwh": [2 + i for i in range(25)],
+        "irradiation_annuelle_kwh": 1900,
+        "prix_total_installation": 2_000_000,
+    }).to_csv(chemin, index=False)
+    return chemin
+
+
+# ==============================
+# dimensionner_site
+# ==============================
+
+class TestDimensionnerSite:
+    def test_identique_au_dimensionnement(self):
+        ligne = dimensionner_site({"site_id": "A", "hsp": 5.5, "conso_journaliere_kwh": 10})
+        attendu = calculer_dimensionnement_complet(hsp=5.5, conso_journaliere_kwh=10)
+        assert ligne["statut"] == "ok"
+        assert ligne["nombre_panneaux"] == attendu["nombre_panneaux"]
+        assert ligne["capacite_batterie_ah"] == attendu["batterie"]["capacite_ah"]
+
+    def test_donnees_pvgis(self, monkeypatch):
+        monkeypatch.setattr(batch, "get_solar_data", lambda lat, lon: {"hsp_moyen": 5.2, "irradiation_annuelle_kwh": 2000})
+        batch._donnees_solaires.cache_clear()
+        ligne = dimensionner_site({"site_id": "B", "latitude": 6.13, "longitude": 1.22, "conso_journaliere_kwh": 5})
+        batch._donnees_solaires.cache_clear()
+        assert ligne["source_hsp"] == "pvgis"
+        assert ligne["hsp"] == 5.2
+
+    def test_echec_pvgis_non_memorise(self, monkeypatch):
+        reponses = [None, {"hsp_moyen": 5.2, "irradiation_annuelle_kwh": 2000}]
+        monkeypatch.setattr(batch, "get_solar_data", lambda lat, lon: reponses.pop(0))
+        batch._donnees_solaires.cache_clear()
+        site = {"site_id": "C", "latitude": 6.13, "longitude": 1.22, "conso_journaliere_kwh": 5}
+        premier, second = dimensionner_site(site), dimensionner_site(site)
+        batch._donnees_solaires.cache_clear()
+        assert premier["statut"] == "erreur" and "PVGIS" in premier["erreur"]
+        assert second["statut"] == "ok"
+
+    def test_reference_catalogue(self):
+        importer_catalogue("modules", pd.DataFrame([{"reference": "M-450", "puissance_crete_wc": 450,
+                                                     "longueur_m": 2.0, "largeur_m": 1.0}]))
+        ligne = dimensionner_site({"site_id": "C", "hsp": 5, "conso_journaliere_kwh": 5, "reference_module": "M-450"})
+        assert ligne["puissance_panneau_wc"] == 450
+        assert ligne["surface_champ_m2"] is not None
+
+    def test_erreur_consignee(self):
+        ligne = dimensionner_site({"site_id": "D", "hsp": 50, "conso_journaliere_kwh": 5})
+        assert ligne["statut"] == "erreur"
+        assert "HSP invalide" in ligne["erreur"]
+
+    def test_reference_inconnue(self):
+        ligne = dimensionner_site({"site_id": "E", "hsp": 5, "conso_journaliere_kwh": 5, "reference_batterie": "X"})
+        assert ligne["statut"] == "erreur"
+        assert "introuvable" in ligne["erreur"]
+
+    def test_lot_respecte_le_schema(self):
+        table = dimensionner_lot([{"site_id": "A", "hsp": 5, "conso_journaliere_kwh": 5}])
+        assert table.schema == SCHEMA_RESULTATS
+
+
+# ==============================
+# executer_batch
+# ==============================
+
+class TestExecution:
+    def test_colonnes_obligatoires(self, tmp_path):
+        chemin = tmp_path / "sites.csv"
+        pd.DataFrame({"hsp": [5]}).to_csv(chemin, index=False)
+        with pytest.raises(ValueError, match="conso_journaliere_kwh"):
+            lire_sites(chemin)
+
+    def test_run_complet(self, fichier_sites, tmp_path):
+        sortie = tmp_path / "resultats.parquet"
+        recap = executer_batch(fichier_sites, sortie, nb_processus=2, taille_lot=10)
+        resultats = pq.read_table(sortie).to_pandas()
+        assert recap["nb_sites"] == 25
+        assert recap["nb_lots"] == 3
+        assert list(resultats["site_id"]) == [f"S{i}" for i in range(25)]
+        assert (resultats["statut"] == "ok").all()
+        assert resultats["temps_retour_ans"].notna().all()
+        assert not (tmp_path / "resultats.parquet.parts").exists()
+
+    def test_reprise_apres_interruption(self, fichier_sites, tmp_path):
+        sortie = tmp_path / "resultats.parquet"
+        executer_batch(fichier_sites, sortie, nb_processus=1, taille_lot=10, conserver_lots=True)
+        dossier = tmp_path / "resultats.parquet.parts"
+
+        # Interruption simulée : le dernier lot n'a jamais été écrit
+        (dossier / "lot-000002.parquet").unlink()
+        progression = json.loads((dossier / "progression.json").read_text())
+        progression["lots_termines"] = [0, 1]
+        (dossier / "progression.json").write_text(json.dumps(progression))
+
+        recap = executer_batch(fichier_sites, sortie, nb_processus=1, taille_lot=10)
+        assert recap["lots_repris"] == 2
+        assert pq.read_table(sortie).num_rows == 25
+
+    def test_reprise_decoupage_different(self, fichier_sites, tmp_path):
+        sortie = tmp_path / "resultats.parquet"
+        executer_batch(fichier_sites, sortie, nb_processus=1, taille_lot=10, conserver_lots=True)
+        with pytest.raises(ValueError, match="Reprise impossible"):
+            executer_batch(fichier_sites, sortie, nb_processus=1, taille_lot=5)
+
+    def test_reprise_entree_differente(self, fichier_sites, tmp_path):
+        sortie = tmp_path / "resultats.parquet"
+        executer_batch(fichier_sites, sortie, nb_processus=1, taille_lot=10, conserver_lots=True)
+        sites = pd.read_csv(fichier_sites)
+        sites["conso_journaliere_kwh"] += 1
+        sites.to_csv(fichier_sites, index=False)  # même nombre de lignes, autre contenu
+        with pytest.raises(ValueError, match="autre fichier d'entrée"):
+            executer_batch(fichier_sites, sortie, nb_processus=1, taille_lot=10)
@@ -0,0 +1,81 @@
+"""
+Tests du harnais de benchmarks (benchmarks/)
+Les mesures elles-mêmes ne tournent qu'avec : pytest --bench
+"""
+import os
+import httpx
+import pytest
+from benchmarks.charges import CHARGES, executer_charges, preparer_extraction_factures_llm, preparer_stockage
+from benchmarks.mesure import mesurer, comparer, charger_baseline, enregistrer_baseline
+from config import BASELINE_BENCH_PATH, SEUIL_REGRESSION_BENCH
+from core.telemetrie_llm import agregateur_metriques
+
+
+# ==============================
+# Harnais
+# ==============================
+
+class TestMesure:
+    def test_statistiques(self):
+        mesure = mesurer(lambda: sum(range(1000)), repetitions=20, operations=1000)
+        assert mesure["repetitions"] == 20
+        assert 0 < mesure["mediane_ms"] <= mesure["p95_ms"]
+        assert mesure["ops_par_seconde"] > 0
+        assert mesure["memoire_pic_ko"] >= 0
+
+    def test_repetitions_invalides(self):
+        with pytest.raises(ValueError, match="répétitions"):
+            mesurer(lambda: None, repetitions=0)
+
+    def test_regression_detectee(self):
+        baseline = {"a": {"mediane_ms": 10.0}, "b": {"mediane_ms": 10.0}}
+        resultats = {"a": {"mediane_ms": 13.0}, "b": {"mediane_ms": 11.0}, "c": {"mediane_ms": 99.0}}
+        regressions = comparer(resultats, baseline, seuil=0.25)
+        assert [r["charge"] for r in regressions] == ["a"]
+        assert regressions[0]["ecart"] == pytest.approx(0.3)
+
+    def test_sans_reference(self):
+        assert comparer({"a": {"mediane_ms": 1.0}}, None, 0.25) == []
+
+    def test_aller_retour_baseline(self, tmp_path):
+        chemin = tmp_path / "baseline.json"
+        assert charger_baseline(chemin) is None
+        enregistrer_baseline(chemin, {"a": {"mediane_ms": 1.5}})
+        assert charger_baseline(chemin) == {"a": {"mediane_ms": 1.5}}
+
+    def test_charge_inconnue(self):
+        with pytest.raises(ValueError, match="Charge inconnue"):
+            executer_charges(["inexistante"])
+
+
+class TestPreparations:
+    def test_stockage_restaure_environnement(self, monkeypatch):
+        monkeypatch.setenv("DB_PATH", "avant.db")
+        with preparer_stockage():
+            chemin = os.environ["DB_PATH"]
+            assert os.path.exists(chemin)
+        assert os.environ["DB_PATH"] == "avant.db"
+        assert not os.path.exists(os.path.dirname(chemin))
+
+    def test_faux_serveur_arrete(self, monkeypatch):
+        monkeypatch.delenv("GROQ_BASE_URL", raising=False)
+        with preparer_extraction_factures_llm():
+            url = os.environ["GROQ_BASE_URL"]
+        assert "GROQ_BASE_URL" not in os.environ
+        with pytest.raises(httpx.TransportError):
+            httpx.get(f"{url}/stats", timeout=1)
+
+
+# ==============================
+# Benchmarks (pytest --bench)
+# ==============================
+
+@pytest.mark.bench
+@pytest.mark.parametrize("nom", list(CHARGES))
+def test_benchmark(nom, monkeypatch, tmp_path):
+    monkeypatch.setenv("DB_PATH", str(tmp_path / "bench.db"))
+    monkeypatch.setenv("METRIQUES_LLM_PATH", str(tmp_path / "metriques_llm.jsonl"))
+    mesure = executer_charges([nom])
+    agregateur_metriques().flush()
+    regressions = comparer(mesure, charger_baseline(BASELINE_BENCH_PATH), SEUIL_REGRESSION_BENCH)
+    assert not regressions, f"Régression de performance : {regressions}"
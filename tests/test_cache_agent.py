@@ -0,0 +1,112 @@
+"""
+Tests unitaires pour agent/cache.py
+Cache persistant des réponses de l'agent (base SQLite temporaire, aucun appel LLM).
+"""
+import logging
+import pytest
+from core import storage
+from agent import agent as module_agent
+from agent.agent import cle_cache_reponse, lancer_analyse
+from agent.cache import (
+    normaliser_question,
+    cle_reponse,
+    lire_reponse,
+    enregistrer_reponse,
+    vider_cache_reponses,
+)
+
+
+# ==============================
+# FIXTURES
+# ==============================
+
+@pytest.fixture(autouse=True)
+def base_temporaire(tmp_path, monkeypatch):
+    monkeypatch.setenv("DB_PATH", str(tmp_path / "projet.db"))
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    storage.initialiser_stockage()
+    storage.sauvegarder_localisation("Lomé, Togo", 6.13, 1.22, 1900, 5.2, 1500)
+    storage.ajouter_equipement("Réfrigérateur", 150, 24, 1, 3600)
+
+
+# ==============================
+# Clé de cache
+# ==============================
+
+class TestCle:
+    def test_normalisation(self):
+        assert normaliser_question("  Optimise   MA config ? ") == normaliser_question("optimise ma config")
+
+    def test_stable(self):
+        instantane = {"equipements": [{"nom": "TV", "puissance_w": 80}]}
+        assert cle_reponse("Q", instantane, "m", "1") == cle_reponse("q", dict(instantane), "m", "1")
+
+    def test_modele_et_version(self):
+        base = cle_reponse("Q", {}, "m", "1")
+        assert cle_reponse("Q", {}, "autre", "1") != base
+        assert cle_reponse("Q", {}, "m", "2") != base
+
+    def test_projet_modifie(self):
+        avant, _ = cle_cache_reponse("Question")
+        storage.sauvegarder_parametres(150, 2_000_000)
+        apres, _ = cle_cache_reponse("Question")
+        assert avant != apres
+
+
+# ==============================
+# Lecture / écriture
+# ==============================
+
+class TestCacheReponses:
+    def test_aller_retour(self):
+        assert lire_reponse("a") is None
+        enregistrer_reponse("a", "Rapport")
+        assert lire_reponse("a") == "Rapport"
+
+    def test_expiration(self):
+        enregistrer_reponse("a", "Rapport")
+        assert lire_reponse("a", duree_max_s=-1) is None
+        assert lire_reponse("a") is None
+
+    def test_eviction_lru(self, monkeypatch):
+        horloge = iter(range(100))
+        monkeypatch.setattr("agent.cache.time.time", lambda: float(next(horloge)))
+        enregistrer_reponse("a", "A", taille_max=2)
+        enregistrer_reponse("b", "B", taille_max=2)
+        lire_reponse("a")
+        enregistrer_reponse("c", "C", taille_max=2)
+        assert lire_reponse("b") is None
+        assert lire_reponse("a") == "A" and lire_reponse("c") == "C"
+
+    @pytest.mark.parametrize("ecriture", [
+        lambda: storage.ajouter_equipement("TV", 80, 4, 1, 320),
+        lambda: storage.effacer_equipements(),
+        lambda: storage.sauvegarder_parametres(200, 1_000_000),
+        lambda: storage.sauvegarder_batterie(48, 200),
+        lambda: storage.sauvegarder_localisation("Kara, Togo", 9.55, 1.19, 2000, 5.5, 1600),
+    ])
+    def test_invalidation_par_ecriture(self, ecriture):
+        enregistrer_reponse("a", "Rapport")
+        ecriture()
+        assert lire_reponse("a") is None
+
+    def test_vider(self):
+        enregistrer_reponse("a", "Rapport")
+        vider_cache_reponses()
+        assert lire_reponse("a") is None
+
+
+# ==============================
+# lancer_analyse
+# ==============================
+
+class TestLancerAnalyse:
+    def test_succes_cache_sans_llm(self, monkeypatch):
+        cle, _ = cle_cache_reponse("Quel panneau ?")
+        enregistrer_reponse(cle, "Réponse en cache")
+
+        def sans_agent(*args, **kwargs):
+            raise AssertionError("L'agent ne doit pas être appelé")
+
+        monkeypatch.setattr(module_agent, "obtenir_agent", sans_agent)
+        assert lancer_analyse("quel panneau") == "Réponse en cache"
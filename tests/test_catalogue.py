@@ -0,0 +1,150 @@
+"""
+Tests unitaires pour core/catalogue.py
+Couvre l'import, les recherches par plages et la conversion vers les entrées du dimensionnement.
+"""
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from core.catalogue import (
+    IndexCatalogue,
+    COLONNES_CATALOGUE,
+    charger_index,
+    importer_catalogue,
+    importer_catalogue_csv,
+    rechercher_composants,
+    module_depuis_catalogue,
+    onduleur_depuis_catalogue,
+    vider_cache_catalogue,
+)
+from core.sizing import calculer_dimensionnement_complet
+
+
+# ==============================
+# FIXTURES
+# ==============================
+
+@pytest.fixture(autouse=True)
+def catalogue_temporaire(tmp_path, monkeypatch):
+    monkeypatch.setenv("CATALOGUE_PATH", str(tmp_path / "catalogue.db"))
+    vider_cache_catalogue()
+    yield
+    vider_cache_catalogue()
+
+
+@pytest.fixture
+def modules():
+    return pd.DataFrame([
+        {"reference": "M-380", "fabricant": "A", "puissance_crete_wc": 380, "voc_v": 45.0, "vmp_v": 37.5, "imp_a": 10.1},
+        {"reference": "M-410", "fabricant": "A", "puissance_crete_wc": 410, "voc_v": 49.0, "vmp_v": 40.8, "imp_a": 10.0,
+         "longueur_m": 1.72, "largeur_m": 1.13},
+        {"reference": "M-450", "fabricant": "B", "puissance_crete_wc": 450, "voc_v": 49.5, "vmp_v": 41.2, "imp_a": 10.9},
+        {"reference": "M-550", "fabricant": "B", "puissance_crete_wc": 550, "voc_v": 50.0, "vmp_v": 42.5, "imp_a": 13.0},
+    ])
+
+
+@pytest.fixture
+def onduleurs():
+    return pd.DataFrame([
+        {"reference": "O-24", "tension_batterie_v": 24, "nb_mppt": 1, "vmppt_min_v": 60, "vmppt_max_v": 450},
+        {"reference": "O-48-1", "tension_batterie_v": 48, "nb_mppt": 1, "vmppt_min_v": 120, "vmppt_max_v": 450},
+        {"reference": "O-48-2", "tension_batterie_v": 48, "nb_mppt": 2, "voc_max_v": 500, "vmppt_min_v": 120,
+         "vmppt_max_v": 450, "imax_a": 22},
+    ])
+
+
+# ==============================
+# Import
+# ==============================
+
+class TestImport:
+    def test_import_et_rechargement(self, modules):
+        assert importer_catalogue("modules", modules) == 4
+        assert len(charger_index("modules")) == 4
+
+    def test_mise_a_jour_par_reference(self, modules):
+        importer_catalogue("modules", modules)
+        importer_catalogue("modules", modules.assign(voc_v=60.0))
+        assert len(charger_index("modules")) == 4
+        assert rechercher_composants("modules", voc_v=60.0)[0]["voc_v"] == 60.0
+
+    def test_import_csv(self, tmp_path, modules):
+        chemin = tmp_path / "modules.csv"
+        modules.to_csv(chemin, sep=";", index=False)
+        assert importer_catalogue_csv("modules", chemin) == 4
+
+    def test_colonne_obligatoire_manquante(self, modules):
+        with pytest.raises(ValueError, match="Colonnes manquantes"):
+            importer_catalogue("modules", modules.drop(columns="puissance_crete_wc"))
+
+    def test_type_invalide(self, modules):
+        with pytest.raises(ValueError, match="Type de composant invalide"):
+            importer_catalogue("cables", modules)
+
+
+# ==============================
+# Recherche
+# ==============================
+
+class TestRecherche:
+    def test_plages_combinees(self, modules):
+        importer_catalogue("modules", modules)
+        resultats = rechercher_composants("modules", puissance_crete_wc=(400, 550), vmp_v=(38, 42))
+        assert [m["reference"] for m in resultats] == ["M-410", "M-450"]
+
+    def test_borne_ouverte(self, onduleurs):
+        importer_catalogue("onduleurs", onduleurs)
+        resultats = rechercher_composants("onduleurs", tension_batterie_v=48, nb_mppt=(2, None))
+        assert [o["reference"] for o in resultats] == ["O-48-2"]
+
+    def test_valeur_non_renseignee_exclue(self, modules):
+        importer_catalogue("modules", modules)
+        resultats = rechercher_composants("modules", longueur_m=(0, None))
+        assert [m["reference"] for m in resultats] == ["M-410"]
+
+    def test_sans_critere(self, modules):
+        importer_catalogue("modules", modules)
+        assert len(rechercher_composants("modules")) == 4
+
+    def test_critere_inconnu(self, modules):
+        importer_catalogue("modules", modules)
+        with pytest.raises(ValueError, match="Critère inconnu"):
+            rechercher_composants("modules", couleur=1)
+
+    def test_milliers_de_references(self):
+        rng = np.random.default_rng(0)
+        n = 20_000
+        donnees = pd.DataFrame({
+            "reference": [f"M-{i}" for i in range(n)],
+            "fabricant": "X",
+            "puissance_crete_wc": rng.integers(300, 700, n),
+            "vmp_v": rng.uniform(30, 50, n),
+        })
+        index = IndexCatalogue(donnees.reindex(columns=["reference", "fabricant", *COLONNES_CATALOGUE["modules"]]),
+                               COLONNES_CATALOGUE["modules"])
+        attendu = np.flatnonzero(donnees["puissance_crete_wc"].between(400, 550) & donnees["vmp_v"].between(38, 42))
+        debut = time.perf_counter()
+        indices = index.rechercher(puissance_crete_wc=(400, 550), vmp_v=(38, 42))
+        assert time.perf_counter() - debut < 0.05
+        np.testing.assert_array_equal(indices, attendu)
+
+
+# ==============================
+# Conversion vers le dimensionnement
+# ==============================
+
+class TestConversion:
+    def test_module_dans_le_dimensionnement(self, modules):
+        importer_catalogue("modules", modules)
+        fiche = rechercher_composants("modules", puissance_crete_wc=410)[0]
+        result = calculer_dimensionnement_complet(hsp=5.0, conso_journaliere_kwh=5, module=module_depuis_catalogue(fiche))
+        assert result["puissance_panneau_wc"] == 410
+        assert result["surface_champ"] is not None
+
+    def test_onduleur_deux_mppt(self, onduleurs):
+        importer_catalogue("onduleurs", onduleurs)
+        fiche = rechercher_composants("onduleurs", nb_mppt=2)[0]
+        onduleur, strings = onduleur_depuis_catalogue(fiche)
+        assert onduleur == {"tension_demarrage_batterie_v": 48.0, "nb_strings": 2}
+        assert [s["numero_string"] for s in strings] == [1, 2]
+        assert strings[1]["vmppt_max_v"] == 450
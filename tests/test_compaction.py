@@ -0,0 +1,82 @@
+"""
+Tests unitaires pour agent/compaction.py
+Forme compacte et budget de tokens des résultats d'outils de l'agent.
+"""
+import pytest
+from agent.compaction import (
+    compacter,
+    tableau,
+    estimer_tokens,
+    agreger_equipements,
+    sous_budget,
+)
+
+
+# ==============================
+# FIXTURES
+# ==============================
+
+@pytest.fixture
+def equipements():
+    return [
+        {"id": i, "nom": f"Équipement {i}", "puissance_w": 10.0 * i, "heures_par_jour": 2.0,
+         "quantite": 1, "conso_jour_wh": 20.0 * i, "created_at": "2026-01-01 00:00:00",
+         "plage_horaire": None, "facteur_demarrage": 1.0}
+        for i in range(1, 31)
+    ]
+
+
+# ==============================
+# compacter / tableau
+# ==============================
+
+class TestCompacter:
+    def test_nuls_et_colonnes_techniques(self):
+        assert compacter({"id": 1, "nom": "TV", "isc_a": None, "updated_at": "x", "vide": {}}) == {"nom": "TV"}
+
+    def test_arrondi(self):
+        assert compacter({"a": 47.92190502115315, "b": 500.0, "c": [1.005, 2.0]}) == {"a": 47.92, "b": 500, "c": [1.0, 2]}
+
+    def test_tableau(self):
+        result = tableau([{"a": 1, "b": 2}, {"a": 3, "b": 4}])
+        assert result == {"colonnes": ["a", "b"], "lignes": [[1, 2], [3, 4]]}
+        assert tableau([]) == {"colonnes": [], "lignes": []}
+
+    def test_estimation_tokens(self):
+        assert estimer_tokens("x" * 350) == 100
+        assert estimer_tokens({"a": 1}) > 0
+
+
+# ==============================
+# Équipements et budget
+# ==============================
+
+class TestAgregation:
+    def test_top_n_et_autres(self, equipements):
+        result = agreger_equipements(equipements, nb_detailles=5)
+        assert len(result) == 6
+        assert [e["nom"] for e in result[:2]] == ["Équipement 30", "Équipement 29"]
+        autres = result[-1]
+        assert autres["nom"] == "autres (25 équipements)"
+        assert "puissance_w" not in autres
+        assert autres["puissance_totale_w"] == sum(
+            e["puissance_w"] * e["quantite"] for e in sorted(equipements, key=lambda e: e["conso_jour_wh"])[:25]
+        )
+        total = sum(e["conso_jour_wh"] for e in equipements)
+        assert sum(e["conso_jour_wh"] for e in result) == pytest.approx(total)
+
+    def test_champs_par_defaut_omis(self, equipements):
+        ligne = agreger_equipements(equipements[:1])[0]
+        assert "id" not in ligne and "plage_horaire" not in ligne and "facteur_demarrage" not in ligne
+
+    def test_pas_de_ligne_autres(self, equipements):
+        assert len(agreger_equipements(equipements[:3], nb_detailles=10)) == 3
+
+    def test_sous_budget(self, equipements):
+        def construire(nb):
+            return compacter({"equipements": agreger_equipements(equipements, nb)})
+
+        complet = estimer_tokens(construire(30))
+        result = sous_budget(construire, nb_detailles=30, budget=complet // 3)
+        assert estimer_tokens(result) <= complet // 3
+        assert result["equipements"][-1]["nom"].startswith("autres")
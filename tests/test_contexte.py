@@ -0,0 +1,145 @@
+"""
+Tests unitaires pour agent/contexte.py
+Instantané projet partagé, mémoïsation et chronométrage des outils (aucun appel LLM).
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from langchain_core.messages import AIMessage
+from langgraph.graph import StateGraph, MessagesState
+from langgraph.prebuilt import ToolNode
+from core import storage
+from agent import contexte as module_contexte
+from agent.contexte import ContexteExecution, contexte_execution, contexte_actif, donnees_projet
+from agent.tools import get_donnees_projet, outil_dimensionnement, outil_rentabilite
+
+
+# ==============================
+# FIXTURES
+# ==============================
+
+@pytest.fixture(autouse=True)
+def base_temporaire(tmp_path, monkeypatch):
+    monkeypatch.setenv("DB_PATH", str(tmp_path / "projet.db"))
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    storage.initialiser_stockage()
+    storage.sauvegarder_localisation("Lomé, Togo", 6.13, 1.22, 1900, 5.2, 1500)
+    storage.ajouter_equipement("Réfrigérateur", 150, 24, 1, 3600)
+
+
+@pytest.fixture
+def compteur_chargements(monkeypatch):
+    appels = []
+    original = module_contexte.charger_instantane_projet
+
+    def charger():
+        appels.append(1)
+        return original()
+
+    monkeypatch.setattr(module_contexte, "charger_instantane_projet", charger)
+    return appels
+
+
+# ==============================
+# Contexte d'exécution
+# ==============================
+
+class TestContexteExecution:
+    def test_instantane_charge_une_fois(self, compteur_chargements):
+        with contexte_execution():
+            get_donnees_projet.invoke({})
+            outil_dimensionnement.invoke({"puissance_panneau_wc": 500})
+            outil_rentabilite.invoke({"puissance_installee_kwc": 1.5})
+        assert len(compteur_chargements) == 1
+
+    def test_memoisation_par_arguments(self):
+        with contexte_execution() as contexte:
+            a = outil_dimensionnement.invoke({"puissance_panneau_wc": 500, "tension_batterie_v": 48})
+            b = outil_dimensionnement.invoke({})
+            outil_dimensionnement.invoke({"puissance_panneau_wc": 400})
+        assert a == b
+        assert [appel["cache"] for appel in contexte.appels] == [False, True, False]
+        rapport = contexte.rapport()
+        assert rapport["nb_appels"] == 3 and rapport["nb_cache"] == 1
+        assert rapport["par_outil"]["outil_dimensionnement"]["appels"] == 3
+        assert all(appel["duree_ms"] >= 0 for appel in contexte.appels)
+
+    def test_resultat_memoise_protege(self):
+        with contexte_execution():
+            premier = get_donnees_projet.invoke({})
+            premier["equipements"].clear()
+            assert get_donnees_projet.invoke({})["nombre_equipements"] == 1
+
+    def test_hors_contexte(self, compteur_chargements):
+        assert contexte_actif() is None
+        get_donnees_projet.invoke({})
+        get_donnees_projet.invoke({})
+        assert len(compteur_chargements) == 2
+        assert donnees_projet()["localisation"]["ville"] == "Lomé, Togo"
+
+    def test_contextes_isoles(self):
+        with contexte_execution():
+            get_donnees_projet.invoke({})
+        storage.ajouter_equipement("TV", 80, 4, 1, 320)
+        with contexte_execution() as contexte:
+            assert get_donnees_projet.invoke({})["nombre_equipements"] == 2
+        assert contexte.appels[0]["cache"] is False
+
+    def test_appels_paralleles_langgraph(self, compteur_chargements):
+        """Le ToolNode exécute les appels d'outils en parallèle dans des threads."""
+        graphe = StateGraph(MessagesState)
+        graphe.add_node("outils", ToolNode([outil_dimensionnement, outil_rentabilite]))
+        graphe.set_entry_point("outils")
+        graphe.set_finish_point("outils")
+        message = AIMessage(content="", tool_calls=[
+            {"name": "outil_dimensionnement", "args": {"puissance_panneau_wc": 500}, "id": "1"},
+            {"name": "outil_dimensionnement", "args": {"puissance_panneau_wc": 450}, "id": "2"},
+            {"name": "outil_rentabilite", "args": {"puissance_installee_kwc": 1.5}, "id": "3"},
+        ])
+        with contexte_execution() as contexte:
+            graphe.compile().invoke({"messages": [message]})
+        assert contexte.rapport()["nb_appels"] == 3
+        assert len(compteur_chargements) == 1
+
+    def test_calculs_hors_verrou(self):
+        contexte = ContexteExecution(instantane={})
+        barriere = threading.Barrier(2, timeout=5)
+
+        def calcul():
+            barriere.wait()  # bloquerait si les deux calculs étaient sérialisés
+            return {"ok": True}
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            resultats = list(pool.map(lambda n: contexte.executer("outil", {"n": n}, calcul), range(2)))
+        assert resultats == [{"ok": True}, {"ok": True}]
+
+    def test_appel_identique_calcule_une_fois(self):
+        contexte = ContexteExecution(instantane={})
+        calculs = []
+        demarre, libere = threading.Event(), threading.Event()
+
+        def calcul():
+            calculs.append(1)
+            demarre.set()
+            libere.wait(5)
+            return {"valeur": 1}
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            premier = pool.submit(contexte.executer, "outil", {}, calcul)
+            demarre.wait(5)
+            second = pool.submit(contexte.executer, "outil", {}, calcul)
+            libere.set()
+            assert premier.result() == second.result() == {"valeur": 1}
+        assert len(calculs) == 1
+        assert sorted(a["cache"] for a in contexte.appels) == [False, True]
+
+    def test_erreur_non_memorisee(self):
+        contexte = ContexteExecution(instantane={})
+
+        def echec():
+            raise ValueError("indisponible")
+
+        with pytest.raises(ValueError):
+            contexte.executer("outil", {}, echec)
+        assert contexte.executer("outil", {}, lambda: {"ok": True}) == {"ok": True}
@@ -0,0 +1,390 @@
+"""
+Tests unitaires pour core/facture_extractor.py
+Réparation locale du JSON, schéma des champs, relance ciblée, routage par niveaux
+extraction groupée et découpage des PDF multi-factures (faux serveur Groq local).
+"""
+import json
+import time
+import fitz
+import pytest
+from pydantic import ValidationError
+from benchmarks.faux_groq import Scenario
+from core import facture_extractor
+from core.facture_extractor import (
+    MODEL_RAPIDE,
+    MODEL_TEXTE,
+    MODEL_VISION,
+    NB_MAX_FACTURES_LOT,
+    NB_MAX_PAGES_IMAGE,
+    NIVEAUX_TEXTE,
+    FactureExtraite,
+    _analyser_reponse,
+    _convertir_nombre,
+    _duree_periode,
+    _decouper_lots,
+    _pages_en_images,
+    _reparer_json,
+    controler_plausibilite,
+    decouper_pdf,
+    extraire_donnees_facture,
+    extraire_lot_factures,
+    reinitialiser_statistiques_routage,
+    statistiques_routage,
+    valider_et_enrichir,
+)
+
+FACTURE = {"periode": "Mars 2025", "duree_jours": 30, "consommation_kwh": 300, "montant_ttc": 45000,
+           "puissance_souscrite_kva": 3, "fournisseur": "CEET", "usage": "Domestique"}
+
+
+# ==============================
+# FIXTURES
+# ==============================
+
+def _creer_pdf(chemin, texte="Facture CEET Mars 2025"):
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), texte)
+    doc.save(str(chemin))
+    doc.close()
+    return str(chemin)
+
+
+@pytest.fixture
+def facture_pdf(tmp_path):
+    return _creer_pdf(tmp_path / "facture.pdf")
+
+
+@pytest.fixture
+def factures_pdf(tmp_path):
+    return [(_creer_pdf(tmp_path / f"f{i}.pdf", f"Facture CEET mois {i}"), f"f{i}.pdf") for i in range(1, 4)]
+
+
+# ==============================
+# Réparation locale
+# ==============================
+
+class TestConversionNombres:
+    @pytest.mark.parametrize("texte,attendu", [
+        ("166.707 FCFA", 166707), ("1 194 kWh", 1194), ("1,5 kVA", 1.5),
+        ("12,345.6", 12345.6), ("45000", 45000), ("n/a", None), ("", None),
+        ("0,500 kVA", 0.5), ("0.500", 0.5), ("1.000.000", 1_000_000),
+    ])
+    def test_conversion(self, texte, attendu):
+        assert _convertir_nombre(texte) == attendu
+
+    def test_valeurs_non_textuelles_inchangees(self):
+        assert _convertir_nombre(300) == 300
+        assert _convertir_nombre(None) is None
+
+    def test_texte_illisible_rendu_tel_quel(self):
+        assert _convertir_nombre("environ") == "environ"
+
+
+class TestReparationJson:
+    def test_balises_et_texte_autour(self):
+        assert _reparer_json('Voici :\n```json\n{"a": 1}\n```\nBonne journée') == {"a": 1}
+
+    def test_balise_non_fermee(self):
+        assert _reparer_json('```json\n{"a": 1}') == {"a": 1}
+
+    def test_virgule_finale_et_litteraux_python(self):
+        assert _reparer_json('{"a": None, "b": True,}') == {"a": None, "b": True}
+
+    def test_accolade_manquante_et_guillemets_simples(self):
+        assert _reparer_json("{'a': 1") == {"a": 1}
+
+    def test_tableau_nu(self):
+        assert _reparer_json('Voici : [{"a": 1}, {"a": 2}]') == [{"a": 1}, {"a": 2}]
+
+    def test_liste_a_un_element(self):
+        assert _reparer_json('[{"a": 1}]') == {"a": 1}
+
+    def test_irreparable(self):
+        with pytest.raises(json.JSONDecodeError):
+            _reparer_json("Je ne peux pas lire cette facture.")
+
+
+class TestSchema:
+    def test_champs_textuels_convertis(self):
+        donnees = _analyser_reponse('{"duree_jours": "30 jours", "consommation_kwh": "1.194 kWh", "autre": 1}')
+        assert donnees["duree_jours"] == 30 and donnees["consommation_kwh"] == 1194
+        assert "autre" not in donnees and donnees["montant_ttc"] is None
+
+    def test_valeur_invalide(self):
+        with pytest.raises(ValidationError):
+            FactureExtraite.model_validate({"consommation_kwh": "beaucoup"})
+
+    def test_objet_attendu(self):
+        with pytest.raises(ValidationError):
+            _analyser_reponse("[1, 2]")
+
+
+# ==============================
+# Extraction structurée
+# ==============================
+
+class TestExtractionStructuree:
+    def test_mode_json_sans_relance(self, faux_groq, facture_pdf):
+        faux_groq.scenario = Scenario(regles=[{"reponse": json.dumps(FACTURE)}])
+        donnees, erreur = extraire_donnees_facture(facture_pdf, "facture.pdf")
+        assert erreur is None and donnees["consommation_journaliere_kwh"] == 10.0
+        assert faux_groq.statistiques()["requetes"] == 1
+
+    def test_generation_refusee_reparee_localement(self, faux_groq, facture_pdf):
+        faux_groq.scenario = Scenario(regles=[{"reponse": f"```json\n{json.dumps(FACTURE)}\n```"}])
+        donnees, erreur = extraire_donnees_facture(facture_pdf, "facture.pdf")
+        assert erreur is None and donnees["montant_ttc"] == 45000
+        assert faux_groq.statistiques() == {"requetes": 1, "ok": 0, "429": 0, "erreur": 0, "json_invalide": 1}
+
+    def test_relance_ciblee(self, faux_groq, facture_pdf):
+        faux_groq.scenario = Scenario(regles=[
+            {"si_contient": "n'est pas conforme", "reponse": json.dumps(FACTURE)},
+            {"reponse": json.dumps({**FACTURE, "consommation_kwh": "beaucoup"})},
+        ])
+        donnees, erreur = extraire_donnees_facture(facture_pdf, "facture.pdf")
+        assert erreur is None and donnees["consommation_kwh"] == 300
+        assert faux_groq.statistiques()["requetes"] == 2
+
+    def test_une_seule_relance_par_niveau(self, faux_groq, facture_pdf):
+        faux_groq.scenario = Scenario(regles=[{"reponse": "Je ne peux pas lire cette facture."}])
+        donnees, erreur = extraire_donnees_facture(facture_pdf, "facture.pdf")
+        assert donnees is None
+        assert erreur == "Le modèle IA n'a pas retourné un JSON valide"
+        assert faux_groq.statistiques()["requetes"] == 2 * len(NIVEAUX_TEXTE)
+
+
+# ==============================
+# Routage par niveaux
+# ==============================
+
+@pytest.fixture
+def routage():
+    reinitialiser_statistiques_routage()
+    yield
+    reinitialiser_statistiques_routage()
+
+
+class TestRoutage:
+    def test_niveau_rapide_suffit(self, faux_groq, facture_pdf, routage):
+        faux_groq.scenario = Scenario(regles=[{"reponse": json.dumps(FACTURE)}])
+        donnees, erreur = extraire_donnees_facture(facture_pdf, "facture.pdf")
+        assert erreur is None
+        assert faux_groq.statistiques()["requetes"] == 1
+        assert statistiques_routage() == {MODEL_RAPIDE: {"tentatives": 1, "acceptees": 1, "taux": 1.0}}
+
+    def test_escalade_si_invraisemblable(self, faux_groq, facture_pdf, routage):
+        faux_groq.scenario = Scenario(regles=[
+            {"si_modele": MODEL_RAPIDE, "reponse": json.dumps({**FACTURE, "consommation_kwh": 3000})},
+            {"reponse": json.dumps(FACTURE)},
+        ])
+        donnees, erreur = extraire_donnees_facture(facture_pdf, "facture.pdf")
+        assert erreur is None and donnees["consommation_kwh"] == 300
+        statistiques = statistiques_routage()
+        assert statistiques[MODEL_RAPIDE]["acceptees"] == 0
+        assert statistiques[MODEL_TEXTE] == {"tentatives": 1, "acceptees": 1, "taux": 1.0}
+
+    def test_escalade_si_json_invalide(self, faux_groq, facture_pdf, routage):
+        faux_groq.scenario = Scenario(regles=[
+            {"si_modele": MODEL_RAPIDE, "reponse": "illisible"},
+            {"reponse": json.dumps(FACTURE)},
+        ])
+        donnees, erreur = extraire_donnees_facture(facture_pdf, "facture.pdf")
+        assert erreur is None
+        assert faux_groq.statistiques()["requetes"] == 3
+
+    def test_dernier_niveau_fait_foi(self, faux_groq, facture_pdf, routage):
+        faux_groq.scenario = Scenario(regles=[{"reponse": json.dumps({**FACTURE, "duree_jours": 60})}])
+        donnees, erreur = extraire_donnees_facture(facture_pdf, "facture.pdf")
+        assert erreur is None and donnees["duree_jours"] == 60
+        assert statistiques_routage()[MODEL_TEXTE]["acceptees"] == 1
+
+    def test_validation_unique(self, faux_groq, facture_pdf, routage, monkeypatch):
+        appels = []
+
+        def valider(donnees, nom_fichier):
+            appels.append(nom_fichier)
+            return valider_et_enrichir(donnees, nom_fichier)
+
+        monkeypatch.setattr(facture_extractor, "valider_et_enrichir", valider)
+        faux_groq.scenario = Scenario(regles=[{"reponse": json.dumps(FACTURE)}])
+        donnees, erreur = extraire_donnees_facture(facture_pdf, "facture.pdf")
+        assert erreur is None and donnees["consommation_journaliere_kwh"] == 10
+        assert appels == ["facture.pdf"]
+
+
+class TestPlausibilite:
+    def _facture(self, **champs):
+        return valider_et_enrichir({**FACTURE, **champs}, "facture.pdf")
+
+    def test_facture_plausible(self):
+        assert controler_plausibilite(self._facture()) is None
+
+    def test_montant_incoherent(self):
+        assert "montant" in controler_plausibilite(self._facture(montant_ttc=450000))
+
+    def test_montant_absent_non_controle(self):
+        assert controler_plausibilite(self._facture(montant_ttc=None)) is None
+
+    def test_duree_incoherente(self):
+        assert "durée" in controler_plausibilite(self._facture(duree_jours=60))
+
+    @pytest.mark.parametrize("periode,attendu", [
+        ("Mars 2025", (31, 5)), ("Février 2024", (29, 5)), ("Janvier - Février 2025", (59, 10)),
+        ("Décembre 2024 - Janvier 2025", (62, 10)), ("du 01/03/2025 au 31/03/2025", (31, 5)),
+        ("Trimestre 1", None),
+    ])
+    def test_duree_periode(self, periode, attendu):
+        assert _duree_periode(periode) == attendu
+
+
+# ==============================
+# Extraction groupée
+# ==============================
+
+def _lot(*factures, index=True):
+    return json.dumps({"factures": [{**f, "index": i} if index else f for i, f in enumerate(factures, start=1)]})
+
+
+class TestExtractionGroupee:
+    def test_une_requete_pour_le_lot(self, faux_groq, factures_pdf, routage):
+        faux_groq.scenario = Scenario(regles=[{"si_contient": "FACTURE 3", "reponse": _lot(FACTURE, FACTURE, FACTURE)}])
+        resultats = extraire_lot_factures(factures_pdf)
+        assert [r["erreur"] for r in resultats] == [None, None, None]
+        assert [r["donnees"]["nom_fichier"] for r in resultats] == ["f1.pdf", "f2.pdf", "f3.pdf"]
+        assert faux_groq.statistiques()["requetes"] == 1
+        assert statistiques_routage()[MODEL_RAPIDE] == {"tentatives": 3, "acceptees": 3, "taux": 1.0}
+
+    def test_tableau_nu_sans_index(self, faux_groq, factures_pdf):
+        factures = [FACTURE, {**FACTURE, "consommation_kwh": 310}, {**FACTURE, "consommation_kwh": 320}]
+        faux_groq.scenario = Scenario(regles=[{"reponse": json.dumps(factures)}])
+        resultats = extraire_lot_factures(factures_pdf)
+        assert [r["donnees"]["consommation_kwh"] for r in resultats] == [300, 310, 320]
+
+    def test_repli_pour_les_factures_rejetees(self, faux_groq, factures_pdf, routage):
+        faux_groq.scenario = Scenario(regles=[
+            {"si_contient": "FACTURE 3", "reponse": _lot(FACTURE, {**FACTURE, "consommation_kwh": None}, FACTURE)},
+            {"si_modele": MODEL_TEXTE, "reponse": json.dumps({**FACTURE, "consommation_kwh": 290})},
+        ])
+        resultats = extraire_lot_factures(factures_pdf)
+        assert [r["donnees"]["consommation_kwh"] for r in resultats] == [300, 290, 300]
+        # Repli directement au niveau suivant : le lot tenait lieu de premier niveau
+        assert faux_groq.statistiques()["requetes"] == 2
+        assert statistiques_routage()[MODEL_TEXTE]["tentatives"] == 1
+
+    def test_lot_illisible(self, faux_groq, factures_pdf):
+        faux_groq.scenario = Scenario(regles=[
+            {"si_modele": MODEL_TEXTE, "reponse": json.dumps(FACTURE)},
+            {"reponse": "Je ne peux pas lire ces factures."},
+        ])
+        resultats = extraire_lot_factures(factures_pdf)
+        assert all(r["erreur"] is None for r in resultats)
+        assert faux_groq.statistiques()["requetes"] == 2 + len(factures_pdf)
+
+    def test_fichiers_hors_lot(self, faux_groq, factures_pdf, tmp_path):
+        faux_groq.scenario = Scenario(regles=[{"reponse": json.dumps(FACTURE)}])
+        fichiers = [(str(tmp_path / "absent.pdf"), "absent.pdf"), factures_pdf[0]]
+        resultats = extraire_lot_factures(fichiers)
+        assert (resultats[0]["donnees"], resultats[0]["erreur"]) == (None, "Fichier introuvable")
+        assert resultats[1]["erreur"] is None
+        assert faux_groq.statistiques()["requetes"] == 1
+
+    def test_decoupage(self):
+        candidats = [(i, f"f{i}.pdf", "x" * 100) for i in range(NB_MAX_FACTURES_LOT + 1)]
+        assert [len(lot) for lot in _decouper_lots(candidats)] == [NB_MAX_FACTURES_LOT, 1]
+        gros = [(i, f"f{i}.pdf", "x" * 40_000) for i in range(3)]
+        assert [len(lot) for lot in _decouper_lots(gros)] == [1, 1, 1]
+
+
+# ==============================
+# Découpage des PDF multi-factures
+# ==============================
+
+def _pdf_texte(chemin, pages):
+    doc = fitz.open()
+    for texte in pages:
+        page = doc.new_page()
+        for i, ligne in enumerate(texte.split("\n")):
+            page.insert_text((72, 72 + 14 * i), ligne)
+    doc.save(str(chemin))
+    doc.close()
+    return str(chemin)
+
+
+def _pdf_scanne(chemin, mises_en_page):
+    """Pages sans texte : 'A' = première page de facture (bandeau + tableau), 'B' = page de détail."""
+    doc = fitz.open()
+    for mise_en_page in mises_en_page:
+        page = doc.new_page()
+        if mise_en_page == "A":
+            page.draw_rect(fitz.Rect(0, 0, page.rect.width, 150), fill=(0, 0, 0))
+            page.draw_rect(fitz.Rect(300, 400, 560, 600), fill=(0.3, 0.3, 0.3))
+        else:
+            for y in range(100, 800, 60):
+                page.draw_rect(fitz.Rect(40, y, 300, y + 20), fill=(0, 0, 0))
+    doc.save(str(chemin))
+    doc.close()
+    return str(chemin)
+
+
+PAGE_1 = "Facture N° A1001\nPériode de consommation : Mars 2025\nMontant à payer : 45000 FCFA"
+DETAIL = "Détail des consommations\nIndex relevés"
+PAGE_2 = "Facture N° A1002\nPériode de consommation : Avril 2025\nMontant à payer : 46000 FCFA"
+
+
+class TestDecoupage:
+    def test_numeros_de_facture(self, tmp_path):
+        chemin = _pdf_texte(tmp_path / "releve.pdf", [PAGE_1, DETAIL, PAGE_2, "Facture N° A1002 (suite)"])
+        assert [s["pages"] for s in decouper_pdf(chemin)] == [[0, 1], [2, 3]]
+
+    def test_ancres_sans_numero(self, tmp_path):
+        pages = [p.replace("Facture N° A1001\n", "").replace("Facture N° A1002\n", "") for p in (PAGE_1, DETAIL, PAGE_2)]
+        segments = decouper_pdf(_pdf_texte(tmp_path / "releve.pdf", pages))
+        assert [s["pages"] for s in segments] == [[0, 1], [2]]
+        assert "Avril 2025" in segments[1]["texte"] and "Avril" not in segments[0]["texte"]
+
+    @pytest.mark.parametrize("talon", [
+        "Talon de paiement\nMontant à payer : 45000 FCFA",
+        "Talon de paiement\nPériode de consommation : Mars 2025\nMontant à payer : 45000 FCFA",
+    ])
+    def test_talon_sans_numero(self, tmp_path, talon):
+        premiere = PAGE_1.replace("Facture N° A1001\n", "")
+        chemin = _pdf_texte(tmp_path / "facture.pdf", [premiere, talon])
+        assert [s["pages"] for s in decouper_pdf(chemin)] == [[0, 1]]
+
+    def test_facture_unique_multipage(self, tmp_path):
+        chemin = _pdf_texte(tmp_path / "facture.pdf", [PAGE_1, DETAIL, "Facture N° A1001 - page 3"])
+        assert [s["pages"] for s in decouper_pdf(chemin)] == [[0, 1, 2]]
+
+    def test_pages_scannees_par_similarite(self, tmp_path):
+        segments = decouper_pdf(_pdf_scanne(tmp_path / "scan.pdf", "ABAB"))
+        assert [s["pages"] for s in segments] == [[0, 1], [2, 3]]
+        assert all(s["texte"] == "" for s in segments)
+
+    def test_pages_scannees_limitees(self, tmp_path):
+        chemin = _pdf_scanne(tmp_path / "scan.pdf", "ABBBB")
+        assert len(_pages_en_images(chemin, list(range(5)))) == NB_MAX_PAGES_IMAGE
+
+
+class TestExtractionMultiFactures:
+    def test_plusieurs_lignes_par_fichier(self, faux_groq, tmp_path):
+        faux_groq.scenario = Scenario(regles=[{"reponse": _lot(FACTURE, {**FACTURE, "periode": "Avril 2025"})}])
+        chemin = _pdf_texte(tmp_path / "releve.pdf", [PAGE_1, DETAIL, PAGE_2])
+        lignes = extraire_lot_factures([(chemin, "releve.pdf")])
+        assert [l["nom_fichier"] for l in lignes] == ["releve.pdf (p. 1-2)", "releve.pdf (p. 3)"]
+        assert [l["pages"] for l in lignes] == [(1, 2), (3, 3)]
+        assert [l["donnees"]["periode"] for l in lignes] == ["Mars 2025", "Avril 2025"]
+        assert all(l["fichier"] == "releve.pdf" and l["duree_ms"] > 0 for l in lignes)
+        # Les factures d'un même relevé partent dans une seule requête groupée
+        assert faux_groq.statistiques()["requetes"] == 1
+
+    def test_pile_scannee_en_parallele(self, faux_groq, tmp_path, routage):
+        faux_groq.scenario = Scenario(regles=[{"reponse": json.dumps(FACTURE)}], latence_ms=300)
+        chemin = _pdf_scanne(tmp_path / "scan.pdf", "ABABAB")
+        debut = time.perf_counter()
+        lignes = extraire_lot_factures([(chemin, "scan.pdf")])
+        duree_ms = (time.perf_counter() - debut) * 1000
+        assert [l["pages"] for l in lignes] == [(1, 2), (3, 4), (5, 6)]
+        assert all(l["erreur"] is None for l in lignes)
+        assert statistiques_routage()[MODEL_VISION]["acceptees"] == 3
+        # Segments extraits en même temps : durée totale inférieure à la somme des durées par segment
+        assert duree_ms < sum(l["duree_ms"] for l in lignes)
@@ -0,0 +1,141 @@
+"""
+Tests du faux serveur Groq (benchmarks/faux_groq.py) et de l'URL de base configurable.
+Tout passe par un serveur local : aucun appel réseau externe.
+"""
+import json
+import fitz
+import httpx
+import pytest
+from benchmarks.faux_groq import Scenario, empreinte_requete
+from core.llm import creer_chat_groq, client_groq_partage
+from core.facture_extractor import extraire_donnees_facture
+
+FACTURE = {"periode": "Mars 2025", "duree_jours": 30, "consommation_kwh": 300, "montant_ttc": 45000,
+           "puissance_souscrite_kva": 3, "fournisseur": "CEET", "usage": "Domestique"}
+
+
+# ==============================
+# FIXTURES
+# ==============================
+
+SCENARIO = [
+    {"si_contient": "facture", "reponse": f"```json\n{json.dumps(FACTURE)}\n```"},
+    {"si_contient": "outil", "reponse": "", "tool_calls": [{"name": "get_donnees_projet", "args": {}}]},
+]
+
+
+@pytest.fixture
+def serveur(faux_groq):
+    faux_groq.scenario = Scenario(regles=SCENARIO)
+    return faux_groq
+
+
+_http = httpx.Client()
+
+
+def _completion(serveur, **requete):
+    return _http.post(f"{serveur.url}/openai/v1/chat/completions",
+                      json={"model": "m", "messages": [{"role": "user", "content": "Bonjour"}], **requete})
+
+
+# ==============================
+# Protocole
+# ==============================
+
+class TestProtocole:
+    def test_reponse_par_defaut(self, serveur):
+        corps = _completion(serveur).json()
+        assert corps["object"] == "chat.completion"
+        assert corps["choices"][0]["message"]["content"] == "Réponse factice du serveur local."
+        assert corps["usage"]["total_tokens"] > 0
+
+    def test_chemin_inconnu(self, serveur):
+        assert _http.post(f"{serveur.url}/autre", json={}).status_code == 404
+
+    def test_client_langchain(self, serveur):
+        assert creer_chat_groq("m").invoke("Lis cette facture").content.startswith("```json")
+
+    def test_diffusion(self, serveur):
+        fragments = [f.content for f in creer_chat_groq("m").stream("Bonjour à tous")]
+        assert len(fragments) > 3
+        assert "".join(fragments).strip() == "Réponse factice du serveur local."
+
+    def test_appel_outil(self, serveur):
+        message = creer_chat_groq("m").invoke("Appelle un outil")
+        assert message.tool_calls[0]["name"] == "get_donnees_projet"
+
+    def test_client_partage(self, serveur):
+        assert client_groq_partage("m") is client_groq_partage("m")
+        assert client_groq_partage("m") is not client_groq_partage("autre")
+
+
+# ==============================
+# Incidents simulés
+# ==============================
+
+class TestIncidents:
+    def test_taux_429_reproductible(self, serveur):
+        serveur.scenario = Scenario(taux_429=0.5, graine=7)
+        premiers = [_completion(serveur).status_code for _ in range(20)]
+        serveur.scenario = Scenario(taux_429=0.5, graine=7)
+        assert [_completion(serveur).status_code for _ in range(20)] == premiers
+        assert set(premiers) == {200, 429}
+
+    def test_entete_retry_after(self, serveur):
+        serveur.scenario = Scenario(taux_429=1)
+        reponse = _completion(serveur)
+        assert reponse.status_code == 429
+        assert reponse.headers["retry-after-ms"] == "1"
+
+    def test_erreurs_serveur(self, serveur):
+        serveur.scenario = Scenario(taux_erreur=1)
+        assert _completion(serveur).status_code == 500
+        assert serveur.statistiques()["erreur"] == 1
+
+    def test_taux_invalide(self):
+        with pytest.raises(ValueError, match="Taux"):
+            Scenario(taux_429=1.5)
+
+
+# ==============================
+# Rejeu et pipelines
+# ==============================
+
+class TestRejeu:
+    def test_echange_enregistre(self, serveur, tmp_path):
+        requete = {"model": "m", "messages": [{"role": "user", "content": "Bonjour"}]}
+        reponse = {"id": "x", "object": "chat.completion", "created": 0, "model": "m",
+                   "choices": [{"index": 0, "message": {"role": "assistant", "content": "Enregistré"},
+                                "finish_reason": "stop"}]}
+        fichier = tmp_path / "echanges.jsonl"
+        fichier.write_text(json.dumps({"requete": requete, "reponse": reponse}) + "\n", encoding="utf-8")
+        serveur.scenario = Scenario.depuis_fichier(str(fichier))
+        assert empreinte_requete(requete) in serveur.scenario.enregistrements
+        assert _completion(serveur).json()["choices"][0]["message"]["content"] == "Enregistré"
+
+
+class TestExtractionFactures:
+    def test_extraction_pdf_hors_ligne(self, serveur, tmp_path):
+        chemin = tmp_path / "facture.pdf"
+        doc = fitz.open()
+        doc.new_page().insert_text((72, 72), "Facture CEET Mars 2025")
+        doc.save(str(chemin))
+        doc.close()
+
+        donnees, erreur = extraire_donnees_facture(str(chemin), "facture.pdf")
+        assert erreur is None
+        assert donnees["consommation_journaliere_kwh"] == 10.0
+
+    def test_retry_apres_429(self, serveur, tmp_path):
+        serveur.scenario = Scenario(
+            regles=[{"reponse": json.dumps(FACTURE)}], taux_429=0.5, graine=3
+        )
+        chemin = tmp_path / "facture.pdf"
+        doc = fitz.open()
+        doc.new_page().insert_text((72, 72), "Facture")
+        doc.save(str(chemin))
+        doc.close()
+
+        resultats = [extraire_donnees_facture(str(chemin), "facture.pdf") for _ in range(5)]
+        assert all(erreur is None for _, erreur in resultats)
+        assert serveur.statistiques()["429"] > 0
@@ -0,0 +1,113 @@
+"""
+Tests unitaires pour core/finance.py
+Couvre la projection long terme (VAN, TRI, LCOE, remplacement batterie) et la vectorisation.
+"""
+import numpy as np
+import pytest
+from core.finance import estimer_cout_remplacement_batterie, projeter_portefeuille, projeter_rentabilite_long_terme
+from core.sizing import calculer_rentabilite
+
+
+SANS_DERIVE = {"degradation_annuelle": 0, "inflation_tarif": 0, "inflation_couts": 0, "taux_om": 0}
+
+
+# ==============================
+# projeter_rentabilite_long_terme
+# ==============================
+
+class TestProjectionSite:
+    def test_horizon_par_defaut_25_ans(self):
+        result = projeter_rentabilite_long_terme(2_000_000, 1825)
+        assert result["duree_ans"] == 25
+        assert result["projection"][-1]["annee"] == 25
+
+    def test_coherent_avec_calcul_10_ans(self):
+        # Sans dégradation, inflation ni O&M, on retrouve calculer_rentabilite
+        long_terme = projeter_rentabilite_long_terme(2_000_000, 1825, duree_ans=10, **SANS_DERIVE)
+        simple = calculer_rentabilite(2_000_000, 1825)
+        assert [p["economies_cumulees"] for p in long_terme["projection"]] == \
+            [p["economies_cumulees"] for p in simple["projection_10_ans"]]
+        assert long_terme["temps_retour_ans"] == simple["temps_retour_ans"]
+
+    def test_degradation_reduit_production(self):
+        result = projeter_rentabilite_long_terme(2_000_000, 1825, degradation_annuelle=0.01)
+        productions = [p["production_kwh"] for p in result["projection"]]
+        assert all(productions[i] > productions[i + 1] for i in range(len(productions) - 1))
+
+    def test_inflation_tarif(self):
+        result = projeter_rentabilite_long_terme(2_000_000, 1825, inflation_tarif=0.05)
+        assert result["projection"][1]["tarif_kwh"] == pytest.approx(150 * 1.05)
+
+    def test_remplacement_batterie_en_fin_de_vie(self):
+        # 3650 cycles à 365 cycles/an → remplacement aux années 10 et 20
+        result = projeter_rentabilite_long_terme(
+            2_000_000, 1825, cout_remplacement_batterie=500_000,
+            cycles_vie_batterie=3650, inflation_couts=0
+        )
+        remplacements = {p["annee"]: p["remplacement_batterie"] for p in result["projection"]}
+        assert result["nb_remplacements_batterie"] == 2
+        assert remplacements[10] == 500_000
+        assert remplacements[20] == 500_000
+        assert remplacements[11] == 0
+
+    def test_tri_annule_la_van(self):
+        result = projeter_rentabilite_long_terme(2_000_000, 1825, **SANS_DERIVE)
+        au_tri = projeter_rentabilite_long_terme(2_000_000, 1825, taux_actualisation=result["tri"], **SANS_DERIVE)
+        assert au_tri["van"] == pytest.approx(0, abs=100)
+
+    def test_lcoe_sans_couts_annuels(self):
+        # LCOE = capex / production actualisée
+        result = projeter_rentabilite_long_terme(1_000_000, 1000, taux_actualisation=0, **SANS_DERIVE)
+        assert result["lcoe_fcfa_kwh"] == pytest.approx(1_000_000 / (1000 * 25), rel=1e-3)
+
+    def test_jamais_rentable(self):
+        result = projeter_rentabilite_long_terme(100_000_000, 100)
+        assert result["temps_retour_ans"] is None
+
+    def test_prix_installation_negatif(self):
+        with pytest.raises(ValueError, match="Prix installation invalide"):
+            projeter_rentabilite_long_terme(-1, 1000)
+
+    def test_production_nulle(self):
+        with pytest.raises(ValueError, match="Production annuelle invalide"):
+            projeter_rentabilite_long_terme(1_000_000, 0)
+
+
+# ==============================
+# projeter_portefeuille
+# ==============================
+
+class TestPortefeuille:
+    def test_un_resultat_par_site(self):
+        result = projeter_portefeuille(
+            prix_total_installation=np.array([1e6, 2e6, 3e6]),
+            production_annuelle_kwh=np.array([1000, 2000, 3000]),
+        )
+        assert result["van"].shape == (3,)
+        assert result["cumul"].shape == (3, 25)
+
+    def test_identique_au_calcul_site_par_site(self):
+        prix = np.array([1.5e6, 2.5e6])
+        production = np.array([1500, 2200])
+        portefeuille = projeter_portefeuille(prix, production, tarif_kwh=[140, 160])
+        for i in range(2):
+            site = projeter_rentabilite_long_terme(prix[i], production[i], [140, 160][i])
+            assert portefeuille["van"][i] == pytest.approx(site["van"], abs=0.01)
+
+    def test_milliers_de_sites(self):
+        n = 5_000
+        result = projeter_portefeuille(np.full(n, 2e6), np.linspace(1000, 3000, n))
+        assert np.isfinite(result["tri"]).all()
+
+
+# ==============================
+# estimer_cout_remplacement_batterie
+# ==============================
+
+class TestCoutRemplacementBatterie:
+    def test_proportionnel_a_la_capacite(self):
+        assert estimer_cout_remplacement_batterie(10, prix_kwh=200_000) == 2_000_000
+
+    def test_capacite_invalide(self):
+        with pytest.raises(ValueError, match="Capacité"):
+            estimer_cout_remplacement_batterie(-1)
@@ -0,0 +1,66 @@
+"""
+Tests unitaires pour core/monte_carlo.py
+Couvre la simulation probabiliste (reproductibilité, cohérence des percentiles, validations).
+"""
+import time
+import pytest
+from core.monte_carlo import simuler_dimensionnement_probabiliste
+
+
+# ==============================
+# simuler_dimensionnement_probabiliste
+# ==============================
+
+class TestMonteCarlo:
+    def test_reproductible_avec_meme_graine(self):
+        r1 = simuler_dimensionnement_probabiliste(5.0, 5000, nb_scenarios=10_000, graine=7)
+        r2 = simuler_dimensionnement_probabiliste(5.0, 5000, nb_scenarios=10_000, graine=7)
+        assert r1 == r2
+
+    def test_graine_differente(self):
+        r1 = simuler_dimensionnement_probabiliste(5.0, 5000, nb_scenarios=10_000, graine=1)
+        r2 = simuler_dimensionnement_probabiliste(5.0, 5000, nb_scenarios=10_000, graine=2)
+        assert r1["puissance_crete_wc"] != r2["puissance_crete_wc"]
+
+    def test_p90_superieur_ou_egal_p50(self):
+        r = simuler_dimensionnement_probabiliste(5.0, 5000, nb_scenarios=10_000)
+        assert r["nombre_panneaux"]["p90"] >= r["nombre_panneaux"]["p50"]
+        assert r["capacite_batterie_ah"]["p90"] >= r["capacite_batterie_ah"]["p50"]
+        assert r["puissance_crete_wc"]["p90"] >= r["puissance_crete_wc"]["p50"]
+
+    def test_probabilite_entre_0_et_1(self):
+        r = simuler_dimensionnement_probabiliste(5.0, 5000, nb_scenarios=10_000)
+        assert 0.0 <= r["probabilite_perte_charge"] <= 1.0
+        assert 0.0 <= r["fraction_energie_non_servie"] <= 1.0
+
+    def test_sans_variabilite_egal_deterministe(self):
+        # Sans aléa, la P50 retombe sur le dimensionnement déterministe
+        r = simuler_dimensionnement_probabiliste(
+            5.0, 5000, nb_scenarios=1_000, cv_hsp=0, cv_charge=0,
+            derating_pv_min=1.0, derating_batterie_min=1.0
+        )
+        assert r["nombre_panneaux"]["p50"] == r["nombre_panneaux"]["deterministe"]
+        assert r["capacite_batterie_ah"]["p50"] == pytest.approx(r["capacite_batterie_ah"]["deterministe"], rel=1e-3)
+        assert r["probabilite_perte_charge"] == 0.0
+
+    def test_surdimensionnement_reduit_perte_de_charge(self):
+        base = simuler_dimensionnement_probabiliste(5.0, 5000, nb_scenarios=20_000)
+        large = simuler_dimensionnement_probabiliste(
+            5.0, 5000, nb_scenarios=20_000,
+            nombre_panneaux=base["nombre_panneaux_evalue"] * 2,
+            capacite_batterie_ah=base["capacite_batterie_evaluee_ah"] * 2
+        )
+        assert large["probabilite_perte_charge"] <= base["probabilite_perte_charge"]
+
+    def test_hsp_invalide(self):
+        with pytest.raises(ValueError, match="HSP invalide"):
+            simuler_dimensionnement_probabiliste(0.0, 5000)
+
+    def test_conso_invalide(self):
+        with pytest.raises(ValueError, match="Consommation invalide"):
+            simuler_dimensionnement_probabiliste(5.0, 0)
+
+    def test_100k_scenarios_sous_une_seconde(self):
+        debut = time.perf_counter()
+        simuler_dimensionnement_probabiliste(5.0, 5000, nb_scenarios=100_000)
+        assert time.perf_counter() - debut < 1.0
@@ -0,0 +1,155 @@
+"""
+Tests unitaires pour export/pdf_generator.py
+Rapport PDF, template partagé et cache des rapports (génération à la demande, LRU borné en octets).
+"""
+from concurrent.futures import ThreadPoolExecutor
+import re
+import fitz
+import pytest
+import export.pdf_generator as pdf_generator
+from core.resultats import comme_dimensionnement
+from core.sizing import calculer_dimensionnement_complet, calculer_rentabilite
+from export.pdf_generator import (
+    CachePdf,
+    cle_rapport_pdf,
+    generer_pdf_dimensionnement,
+    obtenir_pdf_dimensionnement,
+    rendre_pdf_dimensionnement,
+    template_rapport,
+    vider_cache_pdf,
+)
+
+
+# ==============================
+# FIXTURES
+# ==============================
+
+@pytest.fixture
+def dim():
+    return calculer_dimensionnement_complet(
+        equipements=[
+            {"nom": "Réfrigérateur", "puissance_w": 150, "heures_par_jour": 24, "quantite": 1,
+             "conso_jour_wh": 3600, "plage_horaire": "0-24", "facteur_demarrage": 3.0},
+            {"nom": "TV", "puissance_w": 100, "heures_par_jour": 4, "quantite": 1, "conso_jour_wh": 400},
+        ],
+        hsp=5.2,
+    )
+
+
+@pytest.fixture
+def rentabilite(dim):
+    return calculer_rentabilite(
+        prix_total_installation=2_000_000,
+        production_annuelle_kwh=1900 * dim["puissance_installee_kwc"],
+        tarif_kwh=150,
+    )
+
+
+@pytest.fixture
+def generations(monkeypatch):
+    """Compte les rendus ReportLab effectifs derrière obtenir_pdf_dimensionnement."""
+    vider_cache_pdf()
+    appels = []
+    original = pdf_generator.generer_pdf_dimensionnement
+
+    def generer(*args, **kwargs):
+        appels.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(pdf_generator, "generer_pdf_dimensionnement", generer)
+    yield appels
+    vider_cache_pdf()
+
+
+LOCALISATION = {"ville": "Lomé, Togo"}
+PARAMETRES = {"tarif_kwh": 150, "prix_total_installation": 2_000_000}
+
+
+# ==============================
+# Génération
+# ==============================
+
+class TestGeneration:
+    def test_pdf_valide(self, dim, rentabilite):
+        pdf = generer_pdf_dimensionnement(dim, LOCALISATION, rentabilite, None, PARAMETRES)
+        assert pdf.startswith(b"%PDF")
+
+    def test_nombre_de_pages(self, dim, rentabilite):
+        pdf, pages = rendre_pdf_dimensionnement(dim, LOCALISATION, rentabilite, None, PARAMETRES)
+        with fitz.open(stream=pdf, filetype="pdf") as doc:
+            assert len(doc) == pages == 2
+
+
+# ==============================
+# Template
+# ==============================
+
+def _texte(pdf: bytes) -> str:
+    """Texte du rapport, horodatage exclu."""
+    with fitz.open(stream=pdf, filetype="pdf") as doc:
+        return re.sub(r"\d{2}/\d{2}/\d{4} a \d{2}:\d{2}", "", "".join(page.get_text() for page in doc))
+
+
+class TestTemplate:
+    def test_construit_une_fois(self):
+        assert template_rapport() is template_rapport()
+        assert pdf_generator.get_styles() is template_rapport().styles
+
+    def test_styles_en_lecture_seule(self):
+        with pytest.raises(TypeError):
+            template_rapport().styles["Titre"] = None
+
+    def test_rendus_successifs_identiques(self, dim, rentabilite):
+        premier = _texte(generer_pdf_dimensionnement(dim, LOCALISATION, rentabilite, None, PARAMETRES))
+        assert "RESULTATS DU DIMENSIONNEMENT" in premier and "PROJECTION RENTABILITE 10 ANS" in premier
+        assert _texte(generer_pdf_dimensionnement(dim, LOCALISATION, rentabilite, None, PARAMETRES)) == premier
+
+    def test_rendus_concurrents(self, dim, rentabilite):
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            rendus = list(pool.map(
+                lambda _: generer_pdf_dimensionnement(dim, LOCALISATION, rentabilite, None, PARAMETRES),
+                range(12),
+            ))
+        assert len({_texte(pdf) for pdf in rendus}) == 1
+
+
+# ==============================
+# Cache
+# ==============================
+
+class TestCacheRapports:
+    def test_rendu_unique(self, dim, rentabilite, generations):
+        premier = obtenir_pdf_dimensionnement(dim, LOCALISATION, rentabilite, None, PARAMETRES)
+        second = obtenir_pdf_dimensionnement(dim, LOCALISATION, rentabilite, None, PARAMETRES)
+        assert premier is second
+        assert len(generations) == 1
+
+    def test_entrees_modifiees(self, dim, rentabilite, generations):
+        obtenir_pdf_dimensionnement(dim, LOCALISATION, rentabilite, None, PARAMETRES)
+        obtenir_pdf_dimensionnement(dim, LOCALISATION, rentabilite, None, {**PARAMETRES, "tarif_kwh": 160})
+        obtenir_pdf_dimensionnement(dim, LOCALISATION, None, None, PARAMETRES)
+        assert len(generations) == 3
+
+    def test_cle_stable(self, dim, rentabilite):
+        assert cle_rapport_pdf(dim, LOCALISATION, rentabilite) == \
+            cle_rapport_pdf(comme_dimensionnement(dim), dict(LOCALISATION), rentabilite)
+
+    def test_version_template(self, dim, monkeypatch):
+        avant = cle_rapport_pdf(dim, LOCALISATION)
+        monkeypatch.setattr(pdf_generator, "VERSION_TEMPLATE_PDF", "test")
+        assert cle_rapport_pdf(dim, LOCALISATION) != avant
+
+    def test_lru_borne_en_octets(self):
+        cache = CachePdf(taille_max_octets=10)
+        cache.enregistrer("a", b"1234")
+        cache.enregistrer("b", b"1234")
+        cache.lire("a")
+        cache.enregistrer("c", b"1234")
+        assert cache.lire("b") is None
+        assert cache.lire("a") == b"1234" and cache.lire("c") == b"1234"
+        assert cache.taille_octets == 8
+
+    def test_rapport_trop_gros_non_conserve(self):
+        cache = CachePdf(taille_max_octets=3)
+        cache.enregistrer("a", b"1234")
+        assert len(cache) == 0 and cache.taille_octets == 0
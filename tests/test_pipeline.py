@@ -0,0 +1,109 @@
+"""
+Tests unitaires pour core/pipeline.py
+Vérifie l'équivalence avec calculer_dimensionnement_complet et le recalcul incrémental.
+"""
+import pytest
+from core.pipeline import PipelineDimensionnement, hacher_entrees
+from core.sizing import calculer_dimensionnement_complet
+
+
+# ==============================
+# FIXTURES
+# ==============================
+
+@pytest.fixture
+def entrees():
+    return {
+        "hsp": 5.0,
+        "equipements": [
+            {"puissance_w": 100, "heures_jour": 8, "quantite": 2, "conso_jour_wh": 1600.0},
+            {"puissance_w": 50, "heures_jour": 4, "quantite": 1, "conso_jour_wh": 200.0},
+        ],
+        "module": {
+            "puissance_crete_wc": 400, "voc_v": 49.5, "vmp_v": 41.2, "isc_a": 10.1,
+            "imp_a": 9.7, "longueur_m": 1.722, "largeur_m": 1.134,
+        },
+        "onduleur": {"tension_demarrage_batterie_v": 48.0},
+        "strings": [{"numero_string": 1, "voc_max_v": 600, "vmppt_min_v": 100, "vmppt_max_v": 500, "imax_a": 30}],
+        "batterie_unitaire": {"tension_v": 12.0, "capacite_ah": 100.0},
+    }
+
+
+# ==============================
+# PipelineDimensionnement
+# ==============================
+
+class TestPipeline:
+    def test_identique_au_calcul_complet(self, entrees):
+        pipeline = PipelineDimensionnement()
+        assert pipeline.calculer(**entrees) == calculer_dimensionnement_complet(**entrees)
+
+    def test_identique_mode_factures(self):
+        pipeline = PipelineDimensionnement()
+        assert pipeline.calculer(hsp=5.5, conso_journaliere_kwh=10) == \
+            calculer_dimensionnement_complet(hsp=5.5, conso_journaliere_kwh=10)
+
+    def test_premier_appel_recalcule_tout(self, entrees):
+        pipeline = PipelineDimensionnement()
+        pipeline.calculer(**entrees)
+        assert pipeline.etapes_reutilisees == []
+        assert "consommation" in pipeline.etapes_recalculees
+
+    def test_appel_identique_reutilise_tout(self, entrees):
+        pipeline = PipelineDimensionnement()
+        pipeline.calculer(**entrees)
+        pipeline.calculer(**entrees)
+        assert pipeline.etapes_recalculees == []
+
+    def test_changement_batterie_unitaire(self, entrees):
+        pipeline = PipelineDimensionnement()
+        pipeline.calculer(**entrees)
+        entrees["batterie_unitaire"] = {"tension_v": 24.0, "capacite_ah": 200.0}
+        dim = pipeline.calculer(**entrees)
+        assert pipeline.etapes_recalculees == ["configuration_batterie"]
+        assert dim == calculer_dimensionnement_complet(**entrees)
+
+    def test_changement_hsp_epargne_batterie(self, entrees):
+        pipeline = PipelineDimensionnement()
+        pipeline.calculer(**entrees)
+        entrees["hsp"] = 4.0
+        pipeline.calculer(**entrees)
+        assert "puissance_crete" in pipeline.etapes_recalculees
+        assert "nombre_panneaux" in pipeline.etapes_recalculees
+        assert {"consommation", "batterie", "configuration_batterie", "onduleur"} <= set(pipeline.etapes_reutilisees)
+
+    def test_rentabilite_reutilisee(self, entrees):
+        pipeline = PipelineDimensionnement()
+        pipeline.calculer(**entrees)
+        r1 = pipeline.calculer_rentabilite(2_000_000, 1800, 150)
+        pipeline.calculer(**entrees)
+        r2 = pipeline.calculer_rentabilite(2_000_000, 1800, 150)
+        assert r1 == r2
+        assert "rentabilite" in pipeline.etapes_reutilisees
+
+    def test_rentabilite_sans_calcul(self):
+        with pytest.raises(ValueError, match="Lancez calculer"):
+            PipelineDimensionnement().calculer_rentabilite(1_000_000, 1800)
+
+    def test_rentabilite_puissance_affichee(self, entrees):
+        pipeline = PipelineDimensionnement()
+        dim = pipeline.calculer(**entrees)
+        attendu = pipeline.calculer_rentabilite(2_000_000, 1800, 150)
+        assert PipelineDimensionnement().calculer_rentabilite(
+            2_000_000, 1800, 150, puissance_installee_kwc=dim["puissance_installee_kwc"]
+        ) == attendu
+        autre = pipeline.calculer_rentabilite(2_000_000, 1800, 150, puissance_installee_kwc=10.0)
+        assert autre["economies_annuelles"] == 1800 * 10.0 * 150
+
+    def test_hsp_invalide(self, entrees):
+        entrees["hsp"] = 0.0
+        with pytest.raises(ValueError, match="HSP invalide"):
+            PipelineDimensionnement().calculer(**entrees)
+
+
+class TestHacherEntrees:
+    def test_stable_ordre_des_cles(self):
+        assert hacher_entrees({"a": 1, "b": 2}) == hacher_entrees({"b": 2, "a": 1})
+
+    def test_sensible_aux_valeurs(self):
+        assert hacher_entrees({"a": 1}) != hacher_entrees({"a": 2})
@@ -0,0 +1,160 @@
+"""
+Tests unitaires pour export/portefeuille.py
+Export des rapports PDF d'un portefeuille de sites : archive zip ou PDF unique avec signets.
+"""
+import json
+import zipfile
+import fitz
+import pandas as pd
+import pytest
+from core.catalogue import vider_cache_catalogue
+from export import portefeuille
+from export.portefeuille import exporter_portefeuille, main, rendre_rapport_site
+
+
+# ==============================
+# FIXTURES
+# ==============================
+
+@pytest.fixture(autouse=True)
+def catalogue_temporaire(tmp_path, monkeypatch):
+    monkeypatch.setenv("CATALOGUE_PATH", str(tmp_path / "catalogue.db"))
+    vider_cache_catalogue()
+    yield
+    vider_cache_catalogue()
+
+
+@pytest.fixture
+def fichier_sites(tmp_path):
+    chemin = tmp_path / "sites.csv"
+    pd.DataFrame({
+        "site_id": [f"S{i}" for i in range(7)],
+        "ville": [f"Ville {i}" for i in range(7)],
+        "hsp": 5.2,
+        "conso_journaliere_kwh": [2 + i for i in range(7)],
+        "irradiation_annuelle_kwh": 1900,
+        "prix_total_installation": 2_000_000,
+    }).to_csv(chemin, index=False)
+    return chemin
+
+
+# ==============================
+# Rendu d'un site
+# ==============================
+
+class TestRenduSite:
+    def test_rapport(self):
+        rapport = rendre_rapport_site({"site_id": "A/1", "hsp": 5.2, "conso_journaliere_kwh": 4,
+                                       "irradiation_annuelle_kwh": 1900, "prix_total_installation": 2_000_000})
+        assert rapport["erreur"] is None
+        assert rapport["pdf"].startswith(b"%PDF")
+        assert rapport["pages"] == 2
+        assert rapport["nom_fichier"] == "rapport_A_1.pdf" and rapport["titre"] == "A/1"
+
+    def test_site_invalide(self):
+        rapport = rendre_rapport_site({"site_id": "B", "hsp": 5.2, "conso_journaliere_kwh": -1})
+        assert rapport["pdf"] is None and rapport["erreur"]
+
+
+    def test_erreur_de_rendu(self, monkeypatch):
+        def rendre(*args, **kwargs):
+            raise RuntimeError("police introuvable")
+
+        monkeypatch.setattr(portefeuille, "rendre_pdf_dimensionnement", rendre)
+        rapport = rendre_rapport_site({"site_id": "C", "hsp": 5.2, "conso_journaliere_kwh": 4})
+        assert rapport["pdf"] is None and rapport["erreur"] == "police introuvable"
+
+
+# ==============================
+# Export
+# ==============================
+
+class TestExport:
+    def test_archive_zip(self, fichier_sites, tmp_path):
+        recap = exporter_portefeuille(fichier_sites, tmp_path / "rapports.zip", nb_processus=2, taille_lot=3)
+        with zipfile.ZipFile(recap["sortie"]) as archive:
+            noms = archive.namelist()
+            assert noms == [f"rapport_S{i}.pdf" for i in range(7)]
+            assert archive.read("rapport_S0.pdf").startswith(b"%PDF")
+        assert recap["nb_rapports"] == 7 and recap["nb_erreurs"] == 0 and recap["nb_lots"] == 3
+        assert recap["nb_pages"] >= 7 and recap["pages_par_seconde"] > 0
+
+    def test_pdf_unique_avec_signets(self, fichier_sites, tmp_path):
+        recap = exporter_portefeuille(fichier_sites, tmp_path / "rapports.pdf", nb_processus=2, taille_lot=2)
+        with fitz.open(recap["sortie"]) as doc:
+            assert len(doc) == recap["nb_pages"]
+            sommaire = doc.get_toc()
+        assert [titre for _, titre, _ in sommaire] == [f"Ville {i}" for i in range(7)]
+        assert sommaire[0][2] == 1 and sommaire[1][2] > 1
+
+    def test_erreurs_consignees(self, fichier_sites, tmp_path):
+        sites = pd.read_csv(fichier_sites)
+        sites.loc[3, "conso_journaliere_kwh"] = -5
+        sites.to_csv(fichier_sites, index=False)
+        recap = exporter_portefeuille(fichier_sites, tmp_path / "rapports.zip", nb_processus=1)
+        assert recap["nb_rapports"] == 6 and recap["nb_erreurs"] == 1
+        with zipfile.ZipFile(recap["sortie"]) as archive:
+            erreurs = json.loads(archive.read("erreurs.json"))
+        assert erreurs[0]["site_id"] == "S3"
+
+    def test_noms_uniques(self, fichier_sites, tmp_path):
+        sites = pd.read_csv(fichier_sites).head(4)
+        sites["site_id"] = ["a/b", "a_b", "a b", "a_b-2"]
+        sites.to_csv(fichier_sites, index=False)
+        recap = exporter_portefeuille(fichier_sites, tmp_path / "rapports.zip", nb_processus=1)
+        with zipfile.ZipFile(recap["sortie"]) as archive:
+            noms = archive.namelist()
+        assert noms == ["rapport_a_b.pdf", "rapport_a_b-2.pdf", "rapport_a_b-3.pdf", "rapport_a_b-2-2.pdf"]
+
+    def test_archive_fermee_si_interruption(self, fichier_sites, tmp_path, monkeypatch):
+        ecrire = portefeuille._ecrire
+        appels = []
+
+        def ecrire_puis_echouer(*args):
+            appels.append(1)
+            if len(appels) > 1:
+                raise OSError("disque plein")
+            return ecrire(*args)
+
+        monkeypatch.setattr(portefeuille, "_ecrire", ecrire_puis_echouer)
+        sortie = tmp_path / "rapports.zip"
+        with pytest.raises(OSError):
+            exporter_portefeuille(fichier_sites, sortie, nb_processus=1, taille_lot=3)
+        with zipfile.ZipFile(sortie) as archive:
+            assert archive.namelist() == [f"rapport_S{i}.pdf" for i in range(3)]
+
+    def test_pdf_unique_tous_en_erreur(self, fichier_sites, tmp_path):
+        sites = pd.read_csv(fichier_sites).head(2).astype({"conso_journaliere_kwh": object})
+        sites["conso_journaliere_kwh"] = [-5, "abc"]
+        sites.to_csv(fichier_sites, index=False)
+        recap = exporter_portefeuille(fichier_sites, tmp_path / "rapports.pdf", nb_processus=1)
+        assert recap["nb_rapports"] == 0 and recap["nb_erreurs"] == 2
+        assert not (tmp_path / "rapports.pdf").exists()
+        erreurs = json.loads((tmp_path / "rapports.pdf.erreurs.json").read_text(encoding="utf-8"))
+        assert [e["site_id"] for e in erreurs] == ["S0", "S1"]
+
+    def test_pdf_unique_sans_erreur_supprime_ancien_fichier(self, fichier_sites, tmp_path):
+        ancien = tmp_path / "rapports.pdf.erreurs.json"
+        ancien.write_text("[]", encoding="utf-8")
+        exporter_portefeuille(fichier_sites, tmp_path / "rapports.pdf", nb_processus=1)
+        assert not ancien.exists()
+
+    def test_erreur_de_fermeture_ne_masque_pas(self, fichier_sites, tmp_path, monkeypatch):
+        def echouer(*args):
+            raise OSError("disque plein")
+
+        def fermer(self, erreurs):
+            raise ValueError("fermeture")
+
+        monkeypatch.setattr(portefeuille, "_ecrire", echouer)
+        monkeypatch.setattr(portefeuille._SortiePdfUnique, "fermer", fermer)
+        with pytest.raises(OSError, match="disque plein"):
+            exporter_portefeuille(fichier_sites, tmp_path / "rapports.pdf", nb_processus=1)
+
+    def test_sortie_non_supportee(self, fichier_sites, tmp_path):
+        with pytest.raises(ValueError, match="Sortie"):
+            exporter_portefeuille(fichier_sites, tmp_path / "rapports.tar")
+
+    def test_cli(self, fichier_sites, tmp_path, capsys):
+        main([str(fichier_sites), str(tmp_path / "rapports.zip"), "--processus", "1", "--taille-lot", "4"])
+        assert json.loads(capsys.readouterr().out)["nb_rapports"] == 7
@@ -0,0 +1,123 @@
+"""
+Tests unitaires pour core/profil_charge.py
+Couvre les plages horaires, le pic coïncident, le pic de démarrage et l'intégration au dimensionnement.
+"""
+import time
+import numpy as np
+import pytest
+from core.profil_charge import (
+    parser_plage_horaire,
+    construire_profil_charge,
+    analyser_profil_charge,
+    equipements_avec_profil,
+)
+from core.sizing import calculer_dimensionnement_complet
+from config import FACTEUR_SECURITE_ONDULEUR
+
+
+def equipement(puissance_w, heures, plage=None, quantite=1, facteur_demarrage=1.0):
+    return {
+        "puissance_w": puissance_w,
+        "quantite": quantite,
+        "heures_par_jour": heures,
+        "conso_jour_wh": puissance_w * heures * quantite,
+        "plage_horaire": plage,
+        "facteur_demarrage": facteur_demarrage,
+    }
+
+
+# ==============================
+# parser_plage_horaire
+# ==============================
+
+class TestPlageHoraire:
+    def test_plage_simple(self):
+        masque = parser_plage_horaire("18-23")
+        assert masque.sum() == 5
+        assert masque[18] and masque[22] and not masque[23]
+
+    def test_plusieurs_plages(self):
+        masque = parser_plage_horaire("6-8, 18-22")
+        assert list(np.flatnonzero(masque)) == [6, 7, 18, 19, 20, 21]
+
+    def test_passage_minuit(self):
+        masque = parser_plage_horaire("22-6")
+        assert masque.sum() == 8
+        assert masque[23] and masque[0] and not masque[6]
+
+    def test_journee_entiere(self):
+        assert parser_plage_horaire("0-24").all()
+
+    @pytest.mark.parametrize("plage", ["", "18", "18-18", "25-3", "a-b", "24-0", "24-3"])
+    def test_plage_invalide(self, plage):
+        with pytest.raises(ValueError, match="Plage horaire"):
+            parser_plage_horaire(plage)
+
+
+# ==============================
+# analyser_profil_charge
+# ==============================
+
+class TestAnalyseProfil:
+    def test_pic_coincident_inferieur_a_la_somme(self):
+        # Pompe le matin, TV le soir : jamais simultanées
+        equipements = [equipement(1000, 2, "6-8"), equipement(200, 4, "18-22")]
+        profil = analyser_profil_charge(equipements)
+        assert profil["puissance_coincidente_w"] == 1000
+        assert profil["heure_pointe"] == 6
+
+    def test_sans_plage_toujours_en_marche(self):
+        equipements = [equipement(100, 24), equipement(200, 4, "18-22")]
+        assert analyser_profil_charge(equipements)["puissance_coincidente_w"] == 300
+
+    def test_energie_conservee(self):
+        equipements = [equipement(150, 3, "18-21", quantite=4), equipement(60, 24)]
+        profil = analyser_profil_charge(equipements)
+        total = sum(e["conso_jour_wh"] for e in equipements)
+        assert profil["energie_journaliere_wh"] == pytest.approx(total)
+        assert sum(profil["profil_horaire_wh"]) == pytest.approx(total)
+
+    def test_energie_nocturne(self):
+        profil = analyser_profil_charge([equipement(100, 4, "19-23")])
+        assert profil["energie_nocturne_wh"] == pytest.approx(400)
+
+    def test_pic_demarrage(self):
+        # Réfrigérateur 150 W ×3 au démarrage + éclairage 100 W
+        equipements = [equipement(150, 24, "0-24", facteur_demarrage=3), equipement(100, 5, "18-23")]
+        profil = analyser_profil_charge(equipements, facteur_surcharge_onduleur=2.0)
+        assert profil["puissance_demarrage_w"] == 250 + 300
+        assert profil["puissance_dimensionnante_w"] == 275
+
+    def test_liste_vide(self):
+        assert analyser_profil_charge([]) is None
+
+    def test_profil_annuel(self):
+        profil = construire_profil_charge([equipement(100, 2, "18-20")], nb_heures=8760)
+        assert profil["energie_wh"].shape == (8760, 1)
+        assert profil["energie_wh"].sum() == pytest.approx(200 * 365)
+
+    def test_centaines_equipements(self):
+        equipements = [equipement(50 + i, 4, f"{i % 20}-{i % 20 + 4}") for i in range(500)]
+        debut = time.perf_counter()
+        analyser_profil_charge(equipements)
+        assert time.perf_counter() - debut < 0.5
+
+
+# ==============================
+# Intégration au dimensionnement
+# ==============================
+
+class TestIntegrationDimensionnement:
+    def test_sans_profil_comportement_historique(self):
+        equipements = [{"puissance_w": 100, "quantite": 2, "conso_jour_wh": 1600.0}]
+        result = calculer_dimensionnement_complet(hsp=5.0, equipements=equipements)
+        assert result["profil_charge"] is None
+        assert result["puissance_onduleur_recommandee_w"] == round(200 * FACTEUR_SECURITE_ONDULEUR, 2)
+        assert not equipements_avec_profil(equipements)
+
+    def test_onduleur_sur_pic_coincident(self):
+        equipements = [equipement(1000, 2, "6-8"), equipement(200, 4, "18-22")]
+        result = calculer_dimensionnement_complet(hsp=5.0, equipements=equipements)
+        assert result["profil_charge"]["puissance_coincidente_w"] == 1000
+        assert result["puissance_onduleur_recommandee_w"] == round(1000 * FACTEUR_SECURITE_ONDULEUR, 2)
+        assert result["consommation_journaliere_wh"] == 2800
@@ -0,0 +1,87 @@
+"""
+Tests unitaires pour export/rapport_texte.py
+Rapport Markdown déterministe généré depuis les résultats du calcul (aucun appel LLM).
+"""
+import pytest
+from core.sizing import calculer_dimensionnement_complet, calculer_rentabilite
+from core.resultats import DimensionnementResult
+from export.rapport_texte import generer_rapport_texte, _nombre, _milliers
+
+
+# ==============================
+# FIXTURES
+# ==============================
+
+@pytest.fixture
+def dim():
+    return calculer_dimensionnement_complet(
+        equipements=[
+            {"nom": "Réfrigérateur", "puissance_w": 150, "heures_par_jour": 24, "quantite": 1,
+             "conso_jour_wh": 3600, "plage_horaire": "0-24", "facteur_demarrage": 3.0},
+            {"nom": "TV", "puissance_w": 100, "heures_par_jour": 4, "quantite": 1, "conso_jour_wh": 400},
+        ],
+        hsp=5.2,
+    )
+
+
+@pytest.fixture
+def rentabilite(dim):
+    return calculer_rentabilite(
+        prix_total_installation=2_000_000,
+        production_annuelle_kwh=1900 * dim["puissance_installee_kwc"],
+        tarif_kwh=150,
+    )
+
+
+LOCALISATION = {"ville": "Lomé, Togo"}
+
+
+# ==============================
+# Formats
+# ==============================
+
+class TestFormats:
+    def test_nombre(self):
+        assert _nombre(1.5) == "1,5"
+        assert _nombre(48.0) == "48"
+        assert _nombre(87.7234) == "87,72"
+
+    def test_milliers(self):
+        assert _milliers(1_250_000) == "1\u202f250\u202f000"
+
+
+# ==============================
+# generer_rapport_texte
+# ==============================
+
+class TestRapportTexte:
+    def test_sections(self, dim, rentabilite):
+        rapport = generer_rapport_texte(dim, LOCALISATION, rentabilite, parametres={"tarif_kwh": 150})
+        assert "— Lomé" in rapport
+        assert "**4 kWh/jour**" in rapport
+        assert f"| Panneaux | {dim['nombre_panneaux']} × 500 Wc |" in rapport
+        assert "Étude de rentabilité" in rapport
+        assert "| 10 |" in rapport
+        assert "Recommandations personnalisées disponibles avec l'agent IA" in rapport
+
+    def test_objet_type_equivalent(self, dim):
+        assert generer_rapport_texte(dim, LOCALISATION) == generer_rapport_texte(
+            DimensionnementResult.from_dict(dim), LOCALISATION
+        )
+
+    def test_sans_rentabilite(self, dim):
+        rapport = generer_rapport_texte(dim, LOCALISATION)
+        assert "Prix de l'installation non renseigné" in rapport
+
+    def test_factures(self, dim):
+        dim = {**dim, "source_consommation": "factures", "profil_charge": None}
+        moyenne = {"tarif_moyen_fcfa_kwh": 132.5}
+        rapport = generer_rapport_texte(dim, None, moyenne=moyenne)
+        assert "moyenne des factures" in rapport
+        assert "132,5 FCFA/kWh" in rapport
+        assert "pic de consommation" not in rapport
+
+    def test_recommandations(self, dim):
+        rapport = generer_rapport_texte(dim, LOCALISATION, recommandations="- Nettoyer les panneaux\n")
+        assert rapport.rstrip().endswith("- Nettoyer les panneaux")
+        assert "disponibles avec l'agent IA" not in rapport
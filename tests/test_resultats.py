@@ -0,0 +1,108 @@
+"""
+Tests unitaires pour core/resultats.py
+Vérifie la compatibilité des clés historiques et les allers-retours dict / msgpack.
+"""
+import dataclasses
+import pytest
+from core.resultats import (
+    DimensionnementResult,
+    Rentabilite,
+    comme_dimensionnement,
+    comme_rentabilite,
+)
+from core.sizing import calculer_dimensionnement_complet, calculer_rentabilite
+
+
+# ==============================
+# FIXTURES
+# ==============================
+
+@pytest.fixture
+def dim_complet():
+    return calculer_dimensionnement_complet(
+        hsp=5.0,
+        equipements=[{"puissance_w": 100, "quantite": 2, "conso_jour_wh": 1600.0}],
+        module={"puissance_crete_wc": 400, "voc_v": 49.5, "vmp_v": 41.2, "imp_a": 9.7,
+                "longueur_m": 1.722, "largeur_m": 1.134},
+        strings=[{"numero_string": 1, "voc_max_v": 600, "vmppt_min_v": 100, "vmppt_max_v": 500, "imax_a": 30}],
+        batterie_unitaire={"tension_v": 12.0, "capacite_ah": 100.0},
+        onduleur={"tension_demarrage_batterie_v": 48.0},
+    )
+
+
+@pytest.fixture
+def dim_minimal():
+    return calculer_dimensionnement_complet(hsp=5.5, conso_journaliere_kwh=10)
+
+
+# ==============================
+# DimensionnementResult
+# ==============================
+
+class TestDimensionnementResult:
+    def test_aller_retour_dict_complet(self, dim_complet):
+        assert DimensionnementResult.from_dict(dim_complet).to_dict() == dim_complet
+
+    def test_aller_retour_dict_minimal(self, dim_minimal):
+        assert DimensionnementResult.from_dict(dim_minimal).to_dict() == dim_minimal
+
+    def test_aller_retour_dict_profil_charge(self):
+        dim = calculer_dimensionnement_complet(
+            hsp=5.0,
+            equipements=[{"puissance_w": 150, "quantite": 1, "conso_jour_wh": 600.0,
+                          "plage_horaire": "18-22", "facteur_demarrage": 3}],
+        )
+        resultat = DimensionnementResult.from_dict(dim)
+        assert resultat.profil_charge.heure_pointe == 18
+        assert resultat.to_dict() == dim
+
+    def test_aller_retour_msgpack(self, dim_complet):
+        resultat = DimensionnementResult.from_dict(dim_complet)
+        assert DimensionnementResult.from_msgpack(resultat.to_msgpack()) == resultat
+
+    def test_acces_par_attribut(self, dim_complet):
+        resultat = DimensionnementResult.from_dict(dim_complet)
+        assert resultat.batterie.capacite_ah == dim_complet["batterie"]["capacite_ah"]
+        assert resultat.configuration_strings.strings[0].numero_string == 1
+
+    def test_immuable(self, dim_minimal):
+        resultat = DimensionnementResult.from_dict(dim_minimal)
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            resultat.nombre_panneaux = 0
+
+    def test_slots(self, dim_minimal):
+        assert not hasattr(DimensionnementResult.from_dict(dim_minimal), "__dict__")
+
+    def test_avertissements(self):
+        dim = calculer_dimensionnement_complet(
+            hsp=5.0, conso_journaliere_kwh=1,
+            batterie_unitaire={"tension_v": 12.0, "capacite_ah": 100.0},
+            onduleur={"tension_demarrage_batterie_v": 48.0},
+        )
+        dim["configuration_batterie"]["avertissement_tension"] = "⚠️ test"
+        assert DimensionnementResult.from_dict(dim).avertissements == ["⚠️ test"]
+
+    def test_comme_dimensionnement_accepte_les_deux(self, dim_minimal):
+        resultat = comme_dimensionnement(dim_minimal)
+        assert isinstance(resultat, DimensionnementResult)
+        assert comme_dimensionnement(resultat) is resultat
+        assert comme_dimensionnement(None) is None
+
+
+# ==============================
+# Rentabilite
+# ==============================
+
+class TestRentabiliteResult:
+    def test_aller_retour_dict(self):
+        rentabilite = calculer_rentabilite(2_000_000, 1825)
+        assert Rentabilite.from_dict(rentabilite).to_dict() == rentabilite
+
+    def test_aller_retour_msgpack(self):
+        resultat = Rentabilite.from_dict(calculer_rentabilite(2_000_000, 1825))
+        assert Rentabilite.from_msgpack(resultat.to_msgpack()) == resultat
+
+    def test_projection(self):
+        resultat = comme_rentabilite(calculer_rentabilite(1_000_000, 1000))
+        assert len(resultat.projection_10_ans) == 10
+        assert resultat.projection_10_ans[-1].annee == 10
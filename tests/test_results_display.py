@@ -0,0 +1,52 @@
+"""
+Tests unitaires pour ui/results_display.py
+Hypothèses transmises à la projection long terme (hors rendu Streamlit).
+"""
+import pytest
+import ui.results_display as results_display
+from config import PRIX_BATTERIE_KWH_FCFA
+from core.resultats import comme_dimensionnement
+from core.sizing import calculer_dimensionnement_complet
+
+
+# ==============================
+# FIXTURES
+# ==============================
+
+@pytest.fixture
+def projections(monkeypatch):
+    """Capture les appels à projeter_rentabilite_long_terme (toggle activé, rendu interrompu)."""
+    appels = []
+
+    def projeter(*args, **kwargs):
+        appels.append((args, kwargs))
+        raise ValueError("rendu non testé")
+
+    monkeypatch.setattr(results_display.st, "toggle", lambda *a, **k: True)
+    monkeypatch.setattr(results_display.st, "error", lambda *a, **k: None)
+    monkeypatch.setattr(results_display, "projeter_rentabilite_long_terme", projeter)
+    return appels
+
+
+# ==============================
+# Projection long terme
+# ==============================
+
+class TestProjectionLongTerme:
+    def test_cout_remplacement_batterie_transmis(self, projections):
+        results_display.afficher_projection_long_terme(2_000_000, 1800.0, 150, capacite_batterie_kwh=10.0)
+        args, kwargs = projections[0]
+        assert args == (2_000_000, 1800.0, 150)
+        assert kwargs["cout_remplacement_batterie"] == 10.0 * PRIX_BATTERIE_KWH_FCFA
+
+    def test_capacite_parc(self):
+        dim = comme_dimensionnement(calculer_dimensionnement_complet(hsp=5.0, conso_journaliere_kwh=4))
+        assert results_display.capacite_parc_kwh(dim) == dim.batterie.capacite_kwh
+
+    def test_capacite_parc_catalogue(self):
+        dim = comme_dimensionnement(calculer_dimensionnement_complet(
+            hsp=5.0, conso_journaliere_kwh=4,
+            batterie_unitaire={"tension_v": 12.0, "capacite_ah": 200.0},
+        ))
+        cb = dim.configuration_batterie
+        assert results_display.capacite_parc_kwh(dim) == pytest.approx(cb.capacite_reelle_ah * cb.tension_parc_v / 1000)
@@ -0,0 +1,123 @@
+"""
+Tests unitaires pour core/telemetrie_llm.py
+Mesure des appels LLM contre le faux serveur Groq local (aucun appel réseau externe).
+"""
+import json
+import time
+import pytest
+from benchmarks.faux_groq import Scenario
+from core.llm import creer_chat_groq
+from core.telemetrie_llm import (
+    AgregateurMetriques,
+    TelemetrieLLM,
+    config_llm,
+    estimer_cout,
+    resumer_fichier,
+)
+
+
+# ==============================
+# FIXTURES
+# ==============================
+
+@pytest.fixture
+def agregateur(tmp_path):
+    return AgregateurMetriques(chemin=str(tmp_path / "metriques.jsonl"), intervalle_s=3600, taille_max=1000)
+
+
+def _appeler(agregateur, modele="llama-3.1-8b-instant", pipeline="extraction", flux=False):
+    llm = creer_chat_groq(modele)
+    config = {"callbacks": [TelemetrieLLM(pipeline, "session-test", agregateur)]}
+    if flux:
+        return "".join(f.content for f in llm.stream("Bonjour", config=config))
+    return llm.invoke("Bonjour", config=config).content
+
+
+# ==============================
+# Mesures
+# ==============================
+
+class TestMesures:
+    def test_appel_mesure(self, faux_groq, agregateur):
+        _appeler(agregateur)
+        mesure = agregateur._tampon[0]
+        assert mesure["pipeline"] == "extraction" and mesure["session"] == "session-test"
+        assert mesure["modele"] == "llama-3.1-8b-instant"
+        assert mesure["duree_ms"] > 0
+        assert mesure["tokens_prompt"] > 0 and mesure["tokens_completion"] > 0
+        assert mesure["cout_usd"] > 0
+        assert mesure["erreur"] is None and mesure["ttft_ms"] is None
+
+    def test_premier_token_en_flux(self, faux_groq, agregateur):
+        _appeler(agregateur, flux=True)
+        mesure = agregateur._tampon[0]
+        assert 0 < mesure["ttft_ms"] <= mesure["duree_ms"]
+
+    def test_tentatives_echouees_et_erreur(self, faux_groq, agregateur):
+        faux_groq.scenario = Scenario(taux_429=1)
+        with pytest.raises(Exception):
+            _appeler(agregateur)
+        mesure = agregateur._tampon[0]
+        assert mesure["erreur"].startswith("RateLimitError")
+        assert mesure["tentatives_echouees"] == faux_groq.statistiques()["429"] == 3
+
+    def test_config_llm(self):
+        config = config_llm("agent", session="s1", metadata={"a": 1})
+        assert config["metadata"] == {"a": 1, "pipeline": "agent"}
+        assert isinstance(config["callbacks"][0], TelemetrieLLM)
+        assert config["callbacks"][0].session == "s1"
+
+    def test_cout(self):
+        assert estimer_cout("llama-3.3-70b-versatile", 1_000_000, 1_000_000) == pytest.approx(1.38)
+        assert estimer_cout("modele-inconnu", 10, 10) is None
+
+
+# ==============================
+# Agrégation et fichier
+# ==============================
+
+class TestAgregation:
+    def test_synthese(self, faux_groq, agregateur):
+        for _ in range(3):
+            _appeler(agregateur)
+        _appeler(agregateur, pipeline="agent", modele="llama-3.3-70b-versatile")
+        synthese = {(l["pipeline"], l["modele"]): l for l in agregateur.synthese()}
+        ligne = synthese[("extraction", "llama-3.1-8b-instant")]
+        assert ligne["appels"] == 3 and ligne["erreurs"] == 0
+        assert ligne["duree_p50_ms"] <= ligne["duree_p95_ms"]
+        assert synthese[("agent", "llama-3.3-70b-versatile")]["appels"] == 1
+
+    def test_flush_taille_max(self, faux_groq, tmp_path):
+        chemin = tmp_path / "metriques.jsonl"
+        agregateur = AgregateurMetriques(chemin=str(chemin), intervalle_s=3600, taille_max=2)
+        _appeler(agregateur)
+        assert not chemin.exists()
+        _appeler(agregateur)
+        lignes = chemin.read_text(encoding="utf-8").splitlines()
+        assert len(lignes) == 2
+        assert json.loads(lignes[0])["pipeline"] == "extraction"
+
+    def test_flush_periodique(self, faux_groq, tmp_path):
+        chemin = tmp_path / "metriques.jsonl"
+        agregateur = AgregateurMetriques(chemin=str(chemin), intervalle_s=0.05, taille_max=1000)
+        _appeler(agregateur)
+        limite = time.monotonic() + 5
+        while not chemin.exists() and time.monotonic() < limite:
+            time.sleep(0.02)
+        assert len(chemin.read_text(encoding="utf-8").splitlines()) == 1
+
+    def test_durees_bornees(self, faux_groq, tmp_path):
+        agregateur = AgregateurMetriques(chemin=str(tmp_path / "metriques.jsonl"), intervalle_s=3600,
+                                         taille_max=1000, nb_max_durees=2)
+        for _ in range(3):
+            _appeler(agregateur)
+        assert len(agregateur._durees[("extraction", "llama-3.1-8b-instant")]) == 2
+        assert agregateur.synthese()[0]["appels"] == 3
+
+    def test_resumer_fichier(self, faux_groq, agregateur):
+        _appeler(agregateur)
+        _appeler(agregateur)
+        assert agregateur.flush() == 2
+        assert agregateur.flush() == 0
+        synthese = resumer_fichier(agregateur.chemin)
+        assert synthese[0]["appels"] == 2
@@ -0,0 +1,55 @@
+"""
+Tests unitaires pour agent/tools.py
+Base SQLite temporaire (DB_PATH) : aucun appel LLM.
+"""
+import logging
+import pytest
+from core import storage
+from agent.tools import outil_comparatif, outil_dimensionnement
+
+
+# ==============================
+# FIXTURES
+# ==============================
+
+@pytest.fixture(autouse=True)
+def base_temporaire(tmp_path, monkeypatch):
+    monkeypatch.setenv("DB_PATH", str(tmp_path / "projet.db"))
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    storage.initialiser_stockage()
+
+
+@pytest.fixture
+def projet():
+    storage.sauvegarder_localisation("Lomé, Togo", 6.13, 1.22, 1900, 5.2, 1500)
+    storage.ajouter_equipement("Réfrigérateur", 150, 24, 1, 3600)
+    storage.ajouter_equipement("Éclairage", 10, 5, 8, 400)
+
+
+# ==============================
+# outil_comparatif
+# ==============================
+
+class TestOutilComparatif:
+    def test_matrice_complete(self, projet):
+        result = outil_comparatif.invoke({"puissances_panneau_wc": [400, 500], "tensions_batterie_v": [24, 48]})
+        assert len(result["comparatif"]["lignes"]) == 4
+        assert result["consommation_journaliere_wh"] == 4000
+
+    def test_identique_a_outil_dimensionnement(self, projet):
+        result = outil_comparatif.invoke({"puissances_panneau_wc": [450], "tensions_batterie_v": [48]})
+        ligne = dict(zip(result["comparatif"]["colonnes"], result["comparatif"]["lignes"][0]))
+        dim = outil_dimensionnement.invoke({"puissance_panneau_wc": 450, "tension_batterie_v": 48})
+        assert ligne["nombre_panneaux"] == dim["nombre_panneaux"]
+        assert ligne["puissance_installee_kwc"] == dim["puissance_installee_kwc"]
+        assert ligne["capacite_batterie_ah"] == dim["batterie"]["capacite_ah"]
+
+    def test_valeurs_par_defaut(self, projet):
+        assert len(outil_comparatif.invoke({})["comparatif"]["lignes"]) == 12
+
+    def test_sans_localisation(self):
+        assert "erreur" in outil_comparatif.invoke({})
+
+    def test_sans_consommation(self):
+        storage.sauvegarder_localisation("Lomé, Togo", 6.13, 1.22, 1900, 5.2, 1500)
+        assert "erreur" in outil_comparatif.invoke({})
@@ -5,7 +5,8 @@ import streamlit as st
 import pandas as pd
 from pathlib import Path
 
-from core.facture_extractor import extraire_donnees_facture
+from core.facture_extractor import extraire_lot_factures
+from core.profil_charge import analyser_profil_charge, equipements_avec_profil
 from core.storage import (
     ajouter_equipement, get_equipements,
     supprimer_equipement, effacer_equipements,
@@ -89,6 +90,8 @@ def afficher_formulaire_factures() -> None:
         if st.button("🔍 Analyser les factures", type="primary"):
             nb_succes = 0
             nb_echec = 0
+            a_analyser = []
+            chemins_temp = []
 
             for fichier in fichiers:
                 contenu = fichier.getbuffer()
@@ -99,35 +102,37 @@ def afficher_formulaire_factures() -> None:
                     continue
 
                 extension = Path(_securiser_nom_fichier(fichier.name)).suffix.lower()
-                chemin_temp = None
-
-                with st.spinner(f"Analyse de {fichier.name} en cours..."):
-                    try:
-                        with tempfile.NamedTemporaryFile(suffix=extension, delete=False) as tmp:
-                            tmp.write(contenu)
-                            chemin_temp = Path(tmp.name)
-
-                        donnees_validees, erreur = extraire_donnees_facture(str(chemin_temp), fichier.name)
-
-                        if donnees_validees:
-                            sauvegarder_facture(donnees_validees)
-                            st.success(
-                                f"✅ {fichier.name} → "
-                                f"{donnees_validees['consommation_kwh']} kWh "
-                                f"({donnees_validees['periode']})"
-                            )
-                            nb_succes += 1
-                        else:
-                            st.error(f"❌ {fichier.name} — {erreur}")
-                            nb_echec += 1
-
-                    except Exception as e:
-                        logger.error("Erreur traitement facture %s : %s", fichier.name, e)
-                        st.error(f"❌ Erreur inattendue pour {fichier.name}")
-                        nb_echec += 1
-                    finally:
-                        if chemin_temp and chemin_temp.exists():
-                            chemin_temp.unlink(missing_ok=True)
+                with tempfile.NamedTemporaryFile(suffix=extension, delete=False) as tmp:
+                    tmp.write(contenu)
+                    chemins_temp.append(Path(tmp.name))
+                a_analyser.append((str(chemins_temp[-1]), fichier.name))
+
+            try:
+                # Découpage des PDF multi-factures, PDF texte regroupés en une requête, repli en parallèle
+                with st.spinner(f"Analyse de {len(a_analyser)} fichier(s) en cours..."):
+                    lignes = extraire_lot_factures(a_analyser)
+            except Exception as e:
+                logger.error("Erreur traitement des factures : %s", e)
+                st.error("❌ Erreur inattendue pendant l'analyse des factures")
+                lignes = []
+                nb_echec += len(a_analyser)
+            finally:
+                for chemin_temp in chemins_temp:
+                    chemin_temp.unlink(missing_ok=True)
+
+            for ligne in lignes:
+                donnees_validees = ligne["donnees"]
+                if donnees_validees:
+                    sauvegarder_facture(donnees_validees)
+                    st.success(
+                        f"✅ {ligne['nom_fichier']} → "
+                        f"{donnees_validees['consommation_kwh']} kWh "
+                        f"({donnees_validees['periode']}) · {ligne['duree_ms'] / 1000:.1f} s"
+                    )
+                    nb_succes += 1
+                else:
+                    st.error(f"❌ {ligne['nom_fichier']} — {ligne['erreur']}")
+                    nb_echec += 1
 
             if nb_succes > 0:
                 st.info(f"📊 {nb_succes} facture(s) analysée(s) avec succès.")
@@ -136,6 +141,23 @@ def afficher_formulaire_factures() -> None:
                 st.warning(f"⚠️ {nb_echec} facture(s) n'ont pas pu être analysées. Vérifiez les fichiers et réessayez.")
 
 
+def afficher_profil_charge(equipements: list) -> None:
+    profil = analyser_profil_charge(equipements)
+    total_nominal = sum(e["puissance_w"] * e["quantite"] for e in equipements)
+
+    st.markdown("**Profil de charge journalier :**")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Pic coïncident", f"{profil['puissance_coincidente_w']:,.0f} W",
+                help=f"À {profil['heure_pointe']}h — somme des puissances : {total_nominal:,.0f} W")
+    col2.metric("Pic au démarrage", f"{profil['puissance_demarrage_w']:,.0f} W")
+    col3.metric("Énergie nocturne", f"{profil['energie_nocturne_wh']:,.0f} Wh/j",
+                help="Consommée hors production solaire : à couvrir par la batterie")
+    st.bar_chart(
+        pd.DataFrame({"Wh": profil["profil_horaire_wh"]}, index=pd.Index(range(24), name="Heure")),
+        height=180,
+    )
+
+
 def afficher_formulaire_equipements() -> None:
     if st.session_state.get("_equipement_added"):
         del st.session_state["_equipement_added"]
@@ -174,11 +196,24 @@ def afficher_formulaire_equipements() -> None:
         with col_btn:
             submit = st.form_submit_button("➕ Ajouter", use_container_width=True)
 
+        col_plage, col_demarrage, _ = st.columns([3, 1.5, 5])
+        with col_plage:
+            plage = st.text_input(
+                "Plage horaire (optionnel)", placeholder="Ex: 18-23 ou 6-8,18-22",
+                help="Heures de fonctionnement : permet de dimensionner l'onduleur sur le pic réel "
+                     "plutôt que sur la somme de tous les appareils."
+            )
+        with col_demarrage:
+            facteur_demarrage = st.number_input(
+                "Facteur démarrage", min_value=1.0, max_value=8.0, value=1.0, step=0.5,
+                help="Pic au démarrage / puissance nominale (ex: 3 pour un réfrigérateur, une pompe)."
+            )
+
         if submit:
             if nom and nom.strip() and puissance > 0:
                 conso = puissance * heures * quantite
                 try:
-                    ajouter_equipement(nom.strip(), puissance, heures, quantite, conso)
+                    ajouter_equipement(nom.strip(), puissance, heures, quantite, conso, plage, facteur_demarrage)
                     st.success(f"✅ {nom.strip()} ajouté !")
                     st.session_state["_equipement_added"] = True
                 except ValueError as e:
@@ -198,6 +233,13 @@ def afficher_formulaire_equipements() -> None:
         for e in equipements:
             row_cols = st.columns([3, 1.5, 1.5, 1, 1.5, 0.8])
             row_cols[0].write(e["nom"])
+            details = []
+            if e.get("plage_horaire"):
+                details.append(f"🕒 {e['plage_horaire']}")
+            if (e.get("facteur_demarrage") or 1) > 1:
+                details.append(f"×{e['facteur_demarrage']:g} au démarrage")
+            if details:
+                row_cols[0].caption(" · ".join(details))
             row_cols[1].write(str(e["puissance_w"]))
             row_cols[2].write(str(e["heures_par_jour"]))
             row_cols[3].write(str(e["quantite"]))
@@ -225,6 +267,9 @@ def afficher_formulaire_equipements() -> None:
                 </div>
                 """, unsafe_allow_html=True)
 
+        if equipements_avec_profil(equipements):
+            afficher_profil_charge(equipements)
+
         st.markdown("<br>", unsafe_allow_html=True)
         if st.button("🗑️ Effacer tous les équipements"):
             effacer_equipements()
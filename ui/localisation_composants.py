@@ -1,7 +1,13 @@
 import html
 import logging
+import numpy as np
 import streamlit as st
 from core.solar_data import geocoder_ville, get_solar_data
+from core.catalogue import (
+    charger_index, importer_catalogue_csv,
+    module_depuis_catalogue, batterie_depuis_catalogue, onduleur_depuis_catalogue,
+)
+from config import NB_RESULTATS_CATALOGUE
 from core.storage import (
     sauvegarder_localisation, get_localisation,
     sauvegarder_onduleur, get_onduleur, effacer_onduleur,
@@ -37,6 +43,60 @@ def _valeur_ou_defaut(data: dict, cle: str, defaut: float = 0.0) -> float:
     return defaut
 
 
+# ==============================
+# CATALOGUE DE COMPOSANTS
+# ==============================
+def _choisir_dans_catalogue(type_composant: str, filtres: dict, libelle) -> dict | None:
+    """
+    Sélecteur de fiche technique dans le catalogue partagé.
+    filtres : {colonne: libellé du curseur de plage}
+    libelle : fiche → texte affiché dans la liste
+    Retourne la fiche choisie quand l'utilisateur clique sur « Utiliser ».
+    """
+    with st.expander("📚 Choisir dans le catalogue"):
+        fichier = st.file_uploader(
+            "Importer des fiches techniques (CSV)", type=["csv"], key=f"import_catalogue_{type_composant}",
+            help="Une ligne par référence : reference, fabricant, puis les caractéristiques"
+        )
+        if fichier and st.button("📥 Importer", key=f"btn_import_{type_composant}"):
+            try:
+                nb = importer_catalogue_csv(type_composant, fichier)
+                st.success(f"✅ {nb} référence(s) importée(s)")
+            except ValueError as e:
+                st.error(f"❌ {e}")
+
+        index = charger_index(type_composant)
+        if not len(index):
+            st.caption("Catalogue vide — importez un fichier CSV de fiches techniques.")
+            return None
+
+        criteres = {}
+        for colonne, titre in filtres.items():
+            valeurs = index.valeurs[colonne]
+            valeurs = valeurs[~np.isnan(valeurs)]
+            if len(valeurs) == 0 or valeurs.min() == valeurs.max():
+                continue
+            criteres[colonne] = st.slider(
+                titre, float(valeurs.min()), float(valeurs.max()),
+                (float(valeurs.min()), float(valeurs.max())),
+                key=f"filtre_{type_composant}_{colonne}"
+            )
+
+        indices = index.rechercher(**criteres)
+        st.caption(f"{len(indices)} référence(s) sur {len(index)}")
+        if len(indices) == 0:
+            return None
+
+        fiches = index.lignes(indices[:NB_RESULTATS_CATALOGUE])
+        choix = st.selectbox(
+            "Référence", range(len(fiches)), format_func=lambda i: libelle(fiches[i]),
+            key=f"choix_{type_composant}"
+        )
+        if st.button("✅ Utiliser cette référence", key=f"utiliser_{type_composant}", use_container_width=True):
+            return fiches[choix]
+    return None
+
+
 # ==============================
 # LOCALISATION
 # ==============================
@@ -167,6 +227,20 @@ def _formulaire_onduleur() -> None:
     onduleur = get_onduleur()
     strings = get_strings()
 
+    fiche = _choisir_dans_catalogue(
+        "onduleurs",
+        {"tension_batterie_v": "Tension batterie (V)", "nb_mppt": "Nombre de MPPT",
+         "puissance_nominale_w": "Puissance nominale (W)"},
+        lambda f: f"{f['reference']} — {f['fabricant'] or '?'} — {f['tension_batterie_v']:g} V",
+    )
+    if fiche:
+        infos, entrees_pv = onduleur_depuis_catalogue(fiche)
+        effacer_onduleur()
+        sauvegarder_onduleur(**infos)
+        for entree in entrees_pv:
+            sauvegarder_strings(**entree)
+        st.rerun()
+
     # --- Infos générales ---
     st.markdown("**Informations générales**")
     st.caption("Tous les champs sont optionnels — plus vous en renseignez, plus les résultats seront précis.")
@@ -307,6 +381,15 @@ def _formulaire_module_pv() -> None:
             if module.get("longueur_m") and module.get("largeur_m") else "—"
         )
 
+    fiche = _choisir_dans_catalogue(
+        "modules",
+        {"puissance_crete_wc": "Puissance crête (Wc)", "vmp_v": "Vmp (V)"},
+        lambda f: f"{f['reference']} — {f['fabricant'] or '?'} — {f['puissance_crete_wc']:g} Wc",
+    )
+    if fiche:
+        sauvegarder_module_pv(**module_depuis_catalogue(fiche))
+        st.rerun()
+
     st.divider()
     st.write("**Renseignez les caractéristiques de vos modules :**")
     st.caption("Tous les champs sont optionnels.")
@@ -388,6 +471,15 @@ def _formulaire_batterie() -> None:
         col1.metric("Tension", f"{batterie.get('tension_v') or '—'} V")
         col2.metric("Capacité", f"{batterie.get('capacite_ah') or '—'} Ah")
 
+    fiche = _choisir_dans_catalogue(
+        "batteries",
+        {"tension_v": "Tension (V)", "capacite_ah": "Capacité (Ah)"},
+        lambda f: f"{f['reference']} — {f['fabricant'] or '?'} — {f['tension_v']:g} V / {f['capacite_ah']:g} Ah",
+    )
+    if fiche:
+        sauvegarder_batterie(**batterie_depuis_catalogue(fiche))
+        st.rerun()
+
     st.divider()
     st.write("**Renseignez les caractéristiques de vos batteries :**")
     st.caption("Tous les champs sont optionnels.")
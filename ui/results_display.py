@@ -1,11 +1,16 @@
 import html
 import logging
+import os
 from datetime import datetime
 import streamlit as st
 import plotly.graph_objects as go
 from core.storage import get_localisation, get_consommation_moyenne, get_parametres
 from core.sizing import calculer_rentabilite
-from export.pdf_generator import generer_pdf_dimensionnement
+from core.resultats import DimensionnementResult, Rentabilite, comme_dimensionnement, comme_rentabilite
+from core.monte_carlo import simuler_dimensionnement_probabiliste
+from core.finance import estimer_cout_remplacement_batterie, projeter_rentabilite_long_terme
+from export.pdf_generator import obtenir_pdf_dimensionnement
+from export.rapport_texte import generer_rapport_texte
 
 from config import PERFORMANCE_RATIO_DEFAULT
 
@@ -16,7 +21,7 @@ def afficher_metriques_dimensionnement() -> None:
     if "dim" not in st.session_state:
         return
 
-    dim = st.session_state.dim
+    dim = comme_dimensionnement(st.session_state.dim)
     localisation = get_localisation()
     moyenne = get_consommation_moyenne()
     parametres = get_parametres()
@@ -28,11 +33,20 @@ def afficher_metriques_dimensionnement() -> None:
     rentabilite = None
     if prix_installation > 0 and localisation:
         try:
-            rentabilite = calculer_rentabilite(
-                prix_total_installation=prix_installation,
-                production_annuelle_kwh=float(localisation["irradiation_annuelle_kwh"]) * dim["puissance_installee_kwc"],
-                tarif_kwh=tarif,
-            )
+            if "pipeline_dim" in st.session_state:
+                rentabilite = st.session_state.pipeline_dim.calculer_rentabilite(
+                    prix_total_installation=prix_installation,
+                    irradiation_annuelle_kwh=float(localisation["irradiation_annuelle_kwh"]),
+                    tarif_kwh=tarif,
+                    puissance_installee_kwc=dim.puissance_installee_kwc,
+                )
+            else:
+                rentabilite = calculer_rentabilite(
+                    prix_total_installation=prix_installation,
+                    production_annuelle_kwh=float(localisation["irradiation_annuelle_kwh"]) * dim.puissance_installee_kwc,
+                    tarif_kwh=tarif,
+                )
+            rentabilite = comme_rentabilite(rentabilite)
             st.session_state.rentabilite = rentabilite
         except (ValueError, KeyError, TypeError) as e:
             logger.error("Erreur calcul rentabilité : %s", e)
@@ -44,27 +58,31 @@ def afficher_metriques_dimensionnement() -> None:
     roi_value = "—"
     roi_sub = "Prix installation non renseigné"
     if rentabilite:
-        roi_ans = rentabilite["temps_retour_ans"]
+        roi_ans = rentabilite.temps_retour_ans
         roi_value = f"{roi_ans} ans"
-        roi_sub = f"Économies : {rentabilite['economies_annuelles']:,.0f} FCFA/an"
+        roi_sub = f"Économies : {rentabilite.economies_annuelles:,.0f} FCFA/an"
         roi_class = "green" if roi_ans <= 10 else "dark"
 
+    onduleur_sub = "Off-grid"
+    if dim.profil_charge:
+        onduleur_sub = f"Pic coïncident {dim.profil_charge.puissance_coincidente_w:,.0f} W à {dim.profil_charge.heure_pointe}h"
+
     st.markdown(f"""
     <div class='kpi-row'>
         <div class='kpi-card dark'>
             <div class='kpi-label'>Puissance installée</div>
-            <div class='kpi-value'>{dim['puissance_installee_kwc']} kWc</div>
-            <div class='kpi-sub'>{dim['nombre_panneaux']} × {dim['puissance_panneau_wc']} Wc</div>
+            <div class='kpi-value'>{dim.puissance_installee_kwc} kWc</div>
+            <div class='kpi-sub'>{dim.nombre_panneaux} × {dim.puissance_panneau_wc:g} Wc</div>
         </div>
         <div class='kpi-card light'>
             <div class='kpi-label'>Batterie</div>
-            <div class='kpi-value'>{dim['batterie']['capacite_ah']} Ah</div>
-            <div class='kpi-sub'>{dim['batterie']['tension_v']} V — {dim['batterie']['autonomie_jours']} jour(s)</div>
+            <div class='kpi-value'>{dim.batterie.capacite_ah} Ah</div>
+            <div class='kpi-sub'>{dim.batterie.tension_v} V — {dim.batterie.autonomie_jours} jour(s)</div>
         </div>
         <div class='kpi-card light'>
             <div class='kpi-label'>Onduleur recommandé</div>
-            <div class='kpi-value'>{dim['puissance_onduleur_recommandee_kva']} kVA</div>
-            <div class='kpi-sub'>Off-grid</div>
+            <div class='kpi-value'>{dim.puissance_onduleur_recommandee_kva} kVA</div>
+            <div class='kpi-sub'>{onduleur_sub}</div>
         </div>
         <div class='kpi-card {roi_class}'>
             <div class='kpi-label'>Retour investissement</div>
@@ -76,38 +94,38 @@ def afficher_metriques_dimensionnement() -> None:
 
     # ---- Zone 2 : Component Cards ----
     strings_html = ""
-    if dim.get("configuration_strings"):
-        for s in dim["configuration_strings"].get("strings", []):
-            if s.get("nb_panneaux_affectes", 0) > 0:
-                strings_html += f"<div class='cc-row'><span>Entrée PV {s['numero_string']}</span><span>{s['nb_serie_affecte']}S × {s['nb_parallele_affecte']}P</span></div>"
+    if dim.configuration_strings:
+        for s in dim.configuration_strings.strings:
+            if s.nb_panneaux_affectes > 0:
+                strings_html += f"<div class='cc-row'><span>Entrée PV {s.numero_string}</span><span>{s.nb_serie_affecte}S × {s.nb_parallele_affecte}P</span></div>"
 
     surface_html = ""
-    if dim.get("surface_champ"):
-        surface_html = f"<div class='cc-row'><span>Surface champ</span><span>{dim['surface_champ']['surface_totale_m2']} m²</span></div>"
+    if dim.surface_champ:
+        surface_html = f"<div class='cc-row'><span>Surface champ</span><span>{dim.surface_champ.surface_totale_m2} m²</span></div>"
 
     batterie_html = f"""
         <div class='cc-row'><span>Configuration</span><span>—</span></div>
         <div class='cc-row'><span>Nb batteries</span><span>—</span></div>
-        <div class='cc-row'><span>Tension parc</span><span>{dim['batterie']['tension_v']} V</span></div>
-        <div class='cc-row'><span>Capacité réelle</span><span>{dim['batterie']['capacite_ah']} Ah</span></div>
+        <div class='cc-row'><span>Tension parc</span><span>{dim.batterie.tension_v} V</span></div>
+        <div class='cc-row'><span>Capacité réelle</span><span>{dim.batterie.capacite_ah} Ah</span></div>
     """
-    if dim.get("configuration_batterie"):
-        cb = dim["configuration_batterie"]
+    if dim.configuration_batterie:
+        cb = dim.configuration_batterie
         batterie_html = f"""
-            <div class='cc-row'><span>Configuration</span><span>{cb['nb_batteries_serie']}S × {cb['nb_batteries_parallele']}P</span></div>
-            <div class='cc-row'><span>Nb batteries</span><span>{cb['nb_batteries_total']} unités</span></div>
-            <div class='cc-row'><span>Tension parc</span><span>{cb['tension_parc_v']} V</span></div>
-            <div class='cc-row'><span>Capacité réelle</span><span>{cb['capacite_reelle_ah']} Ah</span></div>
+            <div class='cc-row'><span>Configuration</span><span>{cb.nb_batteries_serie}S × {cb.nb_batteries_parallele}P</span></div>
+            <div class='cc-row'><span>Nb batteries</span><span>{cb.nb_batteries_total} unités</span></div>
+            <div class='cc-row'><span>Tension parc</span><span>{cb.tension_parc_v} V</span></div>
+            <div class='cc-row'><span>Capacité réelle</span><span>{cb.capacite_reelle_ah} Ah</span></div>
         """
 
-    source = "Équipements" if dim["source_consommation"] == "equipements" else "Factures"
+    source = "Équipements" if dim.source_consommation == "equipements" else "Factures"
 
     st.markdown(f"""
     <div class='component-cards-row'>
         <div class='component-card'>
             <div class='cc-title'>🔆 Panneaux PV</div>
-            <div class='cc-row'><span>Nb panneaux</span><span>{dim['nombre_panneaux']}</span></div>
-            <div class='cc-row'><span>Puissance unitaire</span><span>{dim['puissance_panneau_wc']} Wc</span></div>
+            <div class='cc-row'><span>Nb panneaux</span><span>{dim.nombre_panneaux}</span></div>
+            <div class='cc-row'><span>Puissance unitaire</span><span>{dim.puissance_panneau_wc:g} Wc</span></div>
             {strings_html}
             {surface_html}
         </div>
@@ -117,60 +135,178 @@ def afficher_metriques_dimensionnement() -> None:
         </div>
         <div class='component-card'>
             <div class='cc-title'>📄 Fiche technique</div>
-            <div class='cc-row'><span>Consommation</span><span>{dim['consommation_journaliere_kwh']} kWh/j</span></div>
+            <div class='cc-row'><span>Consommation</span><span>{dim.consommation_journaliere_kwh} kWh/j</span></div>
             <div class='cc-row'><span>Source</span><span>{source}</span></div>
-            <div class='cc-row'><span>HSP utilisé</span><span>{dim['hsp_utilise']} h/j</span></div>
+            <div class='cc-row'><span>HSP utilisé</span><span>{dim.hsp_utilise} h/j</span></div>
             <div class='cc-row'><span>Performance Ratio</span><span>{PERFORMANCE_RATIO_DEFAULT}</span></div>
-            <div class='cc-row'><span>DoD batterie</span><span>{int(dim['batterie']['profondeur_decharge'] * 100)} %</span></div>
+            <div class='cc-row'><span>DoD batterie</span><span>{int(dim.batterie.profondeur_decharge * 100)} %</span></div>
         </div>
     </div>
     """, unsafe_allow_html=True)
 
     # ---- Avertissements ----
-    avertissements = []
-    if dim.get("configuration_strings"):
-        avertissements.extend(dim["configuration_strings"].get("avertissements", []))
-        non_affectes = dim["configuration_strings"].get("panneaux_non_affectes", 0)
-        if non_affectes > 0:
-            avertissements.append(f"⚠️ {non_affectes} panneau(x) non affecté(s)")
-    if dim.get("configuration_batterie") and dim["configuration_batterie"].get("avertissement_tension"):
-        avertissements.append(dim["configuration_batterie"]["avertissement_tension"])
+    avertissements = dim.avertissements
+    if dim.configuration_strings and dim.configuration_strings.panneaux_non_affectes > 0:
+        # Même position qu'auparavant : après les avertissements strings, avant celui du parc batterie
+        non_affectes = f"⚠️ {dim.configuration_strings.panneaux_non_affectes} panneau(x) non affecté(s)"
+        avertissements.insert(len(dim.configuration_strings.avertissements), non_affectes)
     for avert in avertissements:
         st.warning(avert)
 
+    afficher_analyse_risque(dim)
+
     # ---- Zone 3 : Graphe + Export ----
     if rentabilite:
         st.subheader("💰 Projection rentabilité 10 ans")
         afficher_graphe_rentabilite(rentabilite)
+        afficher_projection_long_terme(
+            prix_installation,
+            float(localisation["irradiation_annuelle_kwh"]) * dim.puissance_installee_kwc,
+            tarif,
+            capacite_parc_kwh(dim),
+        )
     else:
         st.info("💡 Renseignez le prix total de l'installation dans **Configurations → Paramètres économiques** pour voir la rentabilité.")
 
     st.markdown("<br>", unsafe_allow_html=True)
+
+    def pdf_rapport() -> bytes:
+        # Appelé uniquement au clic sur le bouton (hors du rendu de la page) ; résultat en cache
+        try:
+            return obtenir_pdf_dimensionnement(
+                dim=dim,
+                localisation=localisation,
+                rentabilite=rentabilite,
+                moyenne=moyenne,
+                parametres=parametres
+            )
+        except Exception as e:
+            logger.error("Erreur génération PDF : %s", e)
+            raise
+
+    st.download_button(
+        label="📥 Exporter en PDF",
+        data=pdf_rapport,
+        file_name=f"raana_{ville}_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
+        mime="application/pdf",
+        use_container_width=True,
+        type="primary"
+    )
+
+
+def afficher_analyse_risque(dim: DimensionnementResult) -> None:
+    """Affiche la probabilité de perte de charge et les tailles P50/P90 (Monte Carlo)."""
+    if not st.toggle("🎲 Analyse de risque (Monte Carlo)", key="toggle_monte_carlo"):
+        return
+
     try:
-        pdf_bytes = generer_pdf_dimensionnement(
-            dim=dim,
-            localisation=localisation,
-            rentabilite=rentabilite,
-            moyenne=moyenne,
-            parametres=parametres
+        risque = simuler_dimensionnement_probabiliste(
+            hsp=dim.hsp_utilise,
+            conso_journaliere_wh=dim.consommation_journaliere_wh,
+            puissance_panneau_wc=dim.puissance_panneau_wc,
+            tension_batterie_v=dim.batterie.tension_v,
+            nombre_panneaux=dim.nombre_panneaux,
+            capacite_batterie_ah=dim.batterie.capacite_ah,
         )
-        st.download_button(
-            label="📥 Exporter en PDF",
-            data=pdf_bytes,
-            file_name=f"raana_{ville}_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
-            mime="application/pdf",
-            use_container_width=True,
-            type="primary"
+    except ValueError as e:
+        logger.error("Erreur simulation Monte Carlo : %s", e)
+        st.error("❌ Simulation impossible avec ces données.")
+        return
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric(
+        "Probabilité de perte de charge",
+        f"{risque['probabilite_perte_charge'] * 100:.1f} %",
+        help="Part des jours simulés où la consommation n'est pas entièrement couverte"
+    )
+    col2.metric(
+        "Panneaux P50 / P90",
+        f"{risque['nombre_panneaux']['p50']} / {risque['nombre_panneaux']['p90']}",
+        help="Nombre de panneaux couvrant 50 % / 90 % des jours simulés"
+    )
+    col3.metric(
+        "Batterie P50 / P90",
+        f"{risque['capacite_batterie_ah']['p50']:.0f} / {risque['capacite_batterie_ah']['p90']:.0f} Ah"
+    )
+    st.caption(
+        f"{risque['nb_scenarios']:,} jours simulés — graine {risque['graine']} "
+        f"— énergie non servie : {risque['fraction_energie_non_servie'] * 100:.2f} %"
+    )
+
+
+def capacite_parc_kwh(dim: DimensionnementResult) -> float:
+    """Capacité du parc batterie : parc réel si une batterie du catalogue est choisie, sinon besoin calculé."""
+    if dim.configuration_batterie:
+        cb = dim.configuration_batterie
+        return cb.capacite_reelle_ah * cb.tension_parc_v / 1000
+    return dim.batterie.capacite_kwh
+
+
+def afficher_projection_long_terme(
+    prix_installation: float,
+    production_annuelle_kwh: float,
+    tarif: float,
+    capacite_batterie_kwh: float = 0.0,
+) -> None:
+    """VAN, TRI, LCOE sur 25 ans (dégradation, inflation, O&M, remplacement batterie)."""
+    if not st.toggle("📈 Projection long terme (25 ans)", key="toggle_long_terme"):
+        return
+
+    try:
+        cout_batterie = estimer_cout_remplacement_batterie(capacite_batterie_kwh)
+        projection = projeter_rentabilite_long_terme(
+            prix_installation, production_annuelle_kwh, tarif,
+            cout_remplacement_batterie=cout_batterie,
         )
-    except Exception as e:
-        logger.error("Erreur génération PDF : %s", e)
-        st.error("❌ Erreur lors de la génération du PDF.")
+    except ValueError as e:
+        logger.error("Erreur projection long terme : %s", e)
+        st.error("❌ Projection impossible avec ces données.")
+        return
 
+    tri = f"{projection['tri'] * 100:.1f} %" if projection["tri"] is not None else "—"
+    retour = f"{projection['temps_retour_ans']} ans" if projection["temps_retour_ans"] is not None else "—"
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("VAN", f"{projection['van']:,.0f} FCFA")
+    col2.metric("TRI", tri)
+    col3.metric("LCOE", f"{projection['lcoe_fcfa_kwh']:,.0f} FCFA/kWh")
+    col4.metric("Retour", retour)
+    st.caption(
+        f"Remplacement batterie : {cout_batterie:,.0f} FCFA ({capacite_batterie_kwh:.1f} kWh), "
+        f"{projection['nb_remplacements_batterie']} fois sur {projection['duree_ans']} ans"
+    )
 
-def afficher_graphe_rentabilite(rentabilite: dict) -> None:
-    annees = [0] + [p["annee"] for p in rentabilite["projection_10_ans"]]
-    valeurs = [-rentabilite["cout_total_installation"]] + [
-        p["economies_cumulees"] for p in rentabilite["projection_10_ans"]
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=[0] + [p["annee"] for p in projection["projection"]],
+        y=[-projection["cout_total_installation"]] + [p["economies_cumulees"] for p in projection["projection"]],
+        mode="lines",
+        line=dict(color="#1B2A4A", width=2),
+        name="Cumul"
+    ))
+    fig.add_trace(go.Scatter(
+        x=[0] + [p["annee"] for p in projection["projection"]],
+        y=[-projection["cout_total_installation"]] + [p["economies_cumulees_actualisees"] for p in projection["projection"]],
+        mode="lines",
+        line=dict(color="#F4A300", width=2, dash="dot"),
+        name="Cumul actualisé"
+    ))
+    fig.add_hline(y=0, line_dash="dash", line_color="#E74C3C")
+    fig.update_layout(
+        xaxis_title="Années",
+        yaxis_title="Gain cumulé (FCFA)",
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        font=dict(color="#1B2A4A"),
+        height=280,
+        margin=dict(l=0, r=0, t=10, b=0)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def afficher_graphe_rentabilite(rentabilite: Rentabilite) -> None:
+    annees = [0] + [p.annee for p in rentabilite.projection_10_ans]
+    valeurs = [-rentabilite.cout_total_installation] + [
+        p.economies_cumulees for p in rentabilite.projection_10_ans
     ]
     couleurs = ["#E74C3C" if v < 0 else "#27AE60" for v in valeurs]
 
@@ -206,6 +342,49 @@ def afficher_graphe_rentabilite(rentabilite: dict) -> None:
     st.plotly_chart(fig, use_container_width=True)
 
 
+def afficher_rapport_instantane() -> None:
+    """
+    Rapport calculé sans LLM (template) : instantané et disponible hors ligne.
+    Seules les recommandations sont rédigées par l'IA, à la demande.
+    """
+    from agent.agent import MODELE_AGENT, VERSION_PROMPT, rediger_recommandations
+    from agent.cache import cle_reponse, lire_reponse, enregistrer_reponse
+
+    dim = comme_dimensionnement(st.session_state.dim)
+    rentabilite = st.session_state.get("rentabilite")
+    contexte_rapport = dict(
+        dim=dim,
+        localisation=get_localisation(),
+        rentabilite=rentabilite,
+        moyenne=get_consommation_moyenne(),
+        parametres=get_parametres(),
+    )
+    cle = cle_reponse(
+        "recommandations",
+        {"dim": dim.to_dict(), "rentabilite": rentabilite.to_dict() if rentabilite else None},
+        MODELE_AGENT,
+        VERSION_PROMPT,
+    )
+    recommandations = lire_reponse(cle)
+
+    with st.expander("📄 Rapport de dimensionnement", expanded=True):
+        rapport = generer_rapport_texte(**contexte_rapport, recommandations=recommandations)
+        st.markdown(rapport)
+
+        if recommandations is None:
+            if not os.getenv("GROQ_API_KEY"):
+                st.caption("Mode hors ligne : le rapport est complet, seules les recommandations IA sont indisponibles.")
+            elif st.button("✨ Ajouter les recommandations de l'IA", use_container_width=True):
+                with st.spinner("Rédaction des recommandations..."):
+                    try:
+                        recommandations = rediger_recommandations(rapport)
+                        enregistrer_reponse(cle, recommandations)
+                        st.rerun()
+                    except Exception as e:
+                        logger.error("Erreur recommandations IA : %s", e)
+                        st.error(f"❌ Recommandations indisponibles : {e}")
+
+
 def afficher_rapport_agent() -> None:
     if "dim" not in st.session_state:
         st.info("💡 Lancez d'abord une analyse depuis l'étape **Analyse** avant de consulter l'agent.")
@@ -214,6 +393,9 @@ def afficher_rapport_agent() -> None:
             st.rerun()
         return
 
+    afficher_rapport_instantane()
+
+    st.markdown("---")
     st.write("Posez une question à l'agent IA solaire. Il a accès à vos données de projet.")
     st.caption("Exemples : *Optimise ma configuration*, *Explique le calcul de batterie*, *Quel panneau recommandes-tu ?*")
 
@@ -225,24 +407,65 @@ def afficher_rapport_agent() -> None:
     )
 
     if st.button("🤖 Envoyer à l'agent", type="primary", use_container_width=True, disabled=not question.strip()):
-        with st.spinner("L'agent analyse votre projet..."):
+        from agent.agent import diffuser_analyse, cle_cache_reponse
+        from agent.cache import lire_reponse, enregistrer_reponse
+        from agent.contexte import contexte_execution
+
+        st.markdown("---")
+        st.markdown("**Réponse de l'agent :**")
+        cle, instantane = cle_cache_reponse(question)
+        reponse = lire_reponse(cle)
+        if reponse is not None:
+            st.markdown(reponse)
+            st.caption("⚡ Réponse identique déjà calculée pour ce projet (aucune donnée modifiée depuis).")
+            return
+
+        statut = st.status("L'agent analyse votre projet...", expanded=False)
+        zone_reponse = st.empty()
+        reponse = ""
+        # Mis en cache : le texte après le dernier résultat d'outil, comme le message final de lancer_analyse
+        reponse_finale = ""
+        with contexte_execution(instantane) as contexte:
             try:
-                from agent.agent import creer_agent
-                agent = creer_agent()
-                result = agent.invoke({"messages": [{"role": "user", "content": question.strip()}]})
-                messages = result.get("messages", [])
-                # Récupérer le dernier message de l'agent (pas un ToolMessage)
-                reponse = ""
-                for msg in reversed(messages):
-                    if hasattr(msg, "content") and msg.content and not hasattr(msg, "tool_call_id"):
-                        reponse = msg.content
-                        break
-                if reponse:
-                    st.markdown("---")
-                    st.markdown("**Réponse de l'agent :**")
-                    st.markdown(reponse)
-                else:
-                    st.warning("L'agent n'a pas retourné de réponse textuelle.")
+                for evenement in diffuser_analyse(question.strip()):
+                    if evenement["type"] == "texte":
+                        reponse += evenement["contenu"]
+                        reponse_finale += evenement["contenu"]
+                        zone_reponse.markdown(reponse + "▌")
+                    elif evenement["etat"] == "appel":
+                        statut.update(label=f"🛠️ Outil en cours : {evenement['nom']}")
+                        statut.write(f"⏳ {evenement['nom']}")
+                    else:
+                        statut.write(f"✅ {evenement['nom']}")
+                        reponse_finale = ""
+                        if reponse and not reponse.endswith("\n\n"):
+                            # Texte intermédiaire avant l'appel d'outil : séparé de la suite
+                            reponse += "\n\n"
+                statut.update(label="Analyse terminée", state="complete")
+                if reponse_finale.strip():
+                    enregistrer_reponse(cle, reponse_finale.strip())
             except Exception as e:
                 logger.error("Erreur agent IA : %s", e)
-                st.error(f"❌ Erreur de l'agent : {e}")
\ No newline at end of file
+                statut.update(label="Analyse interrompue", state="error")
+                st.error(f"❌ Erreur de l'agent : {e}")
+
+        # Réponse partielle conservée en cas d'erreur
+        if reponse.strip():
+            zone_reponse.markdown(reponse)
+        else:
+            zone_reponse.warning("L'agent n'a pas retourné de réponse textuelle.")
+        _afficher_temps_outils(contexte.rapport())
+
+
+def _afficher_temps_outils(rapport: dict) -> None:
+    """Temps passé dans les outils de l'agent (hors inférence LLM)."""
+    if not rapport["nb_appels"]:
+        return
+    st.caption(
+        f"🛠️ {rapport['nb_appels']} appel(s) d'outils en {rapport['duree_outils_ms']:.0f} ms "
+        f"dont {rapport['nb_cache']} servi(s) depuis le cache, ~{rapport['tokens_outils']} tokens · "
+        + " · ".join(
+            f"{outil} : {stats['appels']}× / {stats['duree_ms']:.0f} ms"
+            for outil, stats in rapport["par_outil"].items()
+        )
+    )